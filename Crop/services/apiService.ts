@@ -12,9 +12,12 @@ export interface SoilData {
 }
 
 export interface CropRecommendation {
+  crop_id?: number;
   name_english: string;
   name_hindi: string;
+  name_bengali?: string;
   confidence?: number;
+  suitability_score?: number;
   predicted_yield_kg_per_ha: number;
   sustainability_score: number;
 }
@@ -26,6 +29,10 @@ export interface ApiResponse {
     primary_crop: CropRecommendation;
     alternative_crops: CropRecommendation[];
   };
+  validation?: {
+    is_valid: boolean;
+    warnings: string[];
+  };
   system_info: {
     model_accuracy: string;
     total_crops_supported: number;
@@ -33,6 +40,133 @@ export interface ApiResponse {
   };
 }
 
+export interface CropCatalogEntry {
+  id: number;
+  english: string;
+  hindi: string;
+  bengali: string;
+  category: string;
+}
+
+// Compact binary recommendation encoding (see compact_wire.py on the backend).
+// Little-endian: header {magic "CR", version u8, flags u8, alternative count u8,
+// warning count u8}, then one 9-byte record per crop {id u8, score x1000 u16,
+// yield x100 u32, sustainability x100 u16}, primary first, then each warning
+// as {byte length u16, UTF-8 text}.
+export const COMPACT_MIMETYPE = 'application/vnd.sih.crop-recommendation';
+const COMPACT_VERSION = 1;
+const COMPACT_HEADER_SIZE = 6;
+const COMPACT_CROP_SIZE = 9;
+const COMPACT_FLAG_VALID = 0x01;
+
+// Crop IDs in the compact encoding, used when the catalog is unavailable
+const CROP_IDS = [
+  'rice', 'wheat', 'maize', 'cotton', 'sugarcane', 'jute', 'coffee', 'coconut',
+  'papaya', 'orange', 'apple', 'muskmelon', 'watermelon', 'grapes', 'mango', 'banana',
+  'pomegranate', 'lentil', 'blackgram', 'mungbean', 'mothbeans', 'pigeonpeas',
+  'kidneybeans', 'chickpea',
+];
+
+// Static fields the compact encoding leaves out
+const COMPACT_SYSTEM_INFO = {
+  model_accuracy: '94%',
+  total_crops_supported: 24,
+  target_region: 'Jharkhand, India',
+};
+
+function decodeUtf8(bytes: Uint8Array): string {
+  if (typeof TextDecoder !== 'undefined') {
+    return new TextDecoder('utf-8').decode(bytes);
+  }
+  let escaped = '';
+  for (let i = 0; i < bytes.length; i++) {
+    escaped += '%' + bytes[i].toString(16).padStart(2, '0');
+  }
+  return decodeURIComponent(escaped);
+}
+
+export function decodeCompactRecommendation(
+  buffer: ArrayBuffer,
+  catalog: CropCatalogEntry[] = [],
+): ApiResponse {
+  const view = new DataView(buffer);
+  if (view.byteLength < COMPACT_HEADER_SIZE
+      || view.getUint8(0) !== 0x43 || view.getUint8(1) !== 0x52
+      || view.getUint8(2) !== COMPACT_VERSION) {
+    throw new Error('Not a compact crop recommendation');
+  }
+  const flags = view.getUint8(3);
+  const alternativeCount = view.getUint8(4);
+  const warningCount = view.getUint8(5);
+  const byId = new Map(catalog.map((crop) => [crop.id, crop]));
+
+  const crops: CropRecommendation[] = [];
+  let offset = COMPACT_HEADER_SIZE;
+  for (let i = 0; i <= alternativeCount; i++) {
+    if (offset + COMPACT_CROP_SIZE > view.byteLength) {
+      throw new Error('Truncated compact crop recommendation');
+    }
+    const id = view.getUint8(offset);
+    const english = byId.get(id)?.english ?? CROP_IDS[id] ?? 'unknown';
+    const score = view.getUint16(offset + 1, true) / 1000;
+    crops.push({
+      crop_id: id,
+      name_english: english,
+      name_hindi: byId.get(id)?.hindi ?? english,
+      name_bengali: byId.get(id)?.bengali ?? english,
+      ...(i === 0 ? { confidence: score } : { suitability_score: score }),
+      predicted_yield_kg_per_ha: view.getUint32(offset + 3, true) / 100,
+      sustainability_score: view.getUint16(offset + 7, true) / 100,
+    });
+    offset += COMPACT_CROP_SIZE;
+  }
+
+  const warnings: string[] = [];
+  for (let i = 0; i < warningCount; i++) {
+    if (offset + 2 > view.byteLength) {
+      throw new Error('Truncated compact crop recommendation');
+    }
+    const length = view.getUint16(offset, true);
+    offset += 2;
+    if (offset + length > view.byteLength) {
+      throw new Error('Truncated compact crop recommendation');
+    }
+    warnings.push(decodeUtf8(new Uint8Array(buffer, offset, length)));
+    offset += length;
+  }
+
+  return {
+    status: 'success',
+    timestamp: new Date().toISOString(),
+    recommendation: {
+      primary_crop: crops[0],
+      alternative_crops: crops.slice(1),
+    },
+    validation: {
+      is_valid: (flags & COMPACT_FLAG_VALID) !== 0,
+      warnings,
+    },
+    system_info: COMPACT_SYSTEM_INFO,
+  };
+}
+
+// Sparse responses: only the named fields, and top_k alternatives
+export interface RecommendationOptions {
+  fields?: string[];
+  top_k?: number;
+}
+
+function recommendQuery(options?: RecommendationOptions): string {
+  const params: string[] = [];
+  if (options?.fields?.length) {
+    params.push(`fields=${encodeURIComponent(options.fields.join(','))}`);
+  }
+  if (options?.top_k !== undefined) {
+    params.push(`top_k=${options.top_k}`);
+  }
+  return params.length ? `?${params.join('&')}` : '';
+}
+
 export interface HealthResponse {
   status: string;
   service: string;
@@ -42,8 +176,15 @@ export interface HealthResponse {
   target: string;
 }
 
+interface CachedResponse {
+  etag: string;
+  body: any;
+}
+
 class ApiService {
   private baseUrl: string;
+  // Catalog responses keyed by path; revalidated with If-None-Match
+  private responseCache: Map<string, CachedResponse> = new Map();
 
   constructor() {
     // You can change this to your deployed backend URL
@@ -52,6 +193,31 @@ class ApiService {
 
   setBaseUrl(url: string) {
     this.baseUrl = url;
+    this.responseCache.clear();
+  }
+
+  // GET that sends the last ETag and reuses the cached body on 304 Not Modified
+  private async getWithETag(path: string): Promise<any> {
+    const cached = this.responseCache.get(path);
+    const headers: Record<string, string> = {};
+    if (cached) {
+      headers['If-None-Match'] = cached.etag;
+    }
+
+    const response = await fetch(`${this.baseUrl}${path}`, { headers });
+    if (response.status === 304 && cached) {
+      return cached.body;
+    }
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const body = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      this.responseCache.set(path, { etag, body });
+    }
+    return body;
   }
 
   async checkHealth(): Promise<HealthResponse> {
@@ -67,9 +233,9 @@ class ApiService {
     }
   }
 
-  async getCropRecommendation(soilData: SoilData): Promise<ApiResponse> {
+  async getCropRecommendation(soilData: SoilData, options?: RecommendationOptions): Promise<ApiResponse> {
     try {
-      const response = await fetch(`${this.baseUrl}/api/recommend`, {
+      const response = await fetch(`${this.baseUrl}/api/recommend${recommendQuery(options)}`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -88,13 +254,44 @@ class ApiService {
     }
   }
 
-  async getSupportedCrops() {
+  // Same result as getCropRecommendation, sent in the compact binary encoding
+  // (about 40 bytes instead of 1.2 KB). Crop names come from the ETag-cached
+  // catalog; servers without the encoding still answer with JSON.
+  async getCompactCropRecommendation(soilData: SoilData, topK?: number): Promise<ApiResponse> {
     try {
-      const response = await fetch(`${this.baseUrl}/api/crops`);
+      const response = await fetch(`${this.baseUrl}/api/recommend${recommendQuery({ top_k: topK })}`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': `${COMPACT_MIMETYPE}, application/json;q=0.5`,
+        },
+        body: JSON.stringify(soilData),
+      });
+
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
-      return await response.json();
+      if (!(response.headers.get('Content-Type') ?? '').startsWith(COMPACT_MIMETYPE)) {
+        return await response.json();
+      }
+
+      const buffer = await response.arrayBuffer();
+      let catalog: CropCatalogEntry[] = [];
+      try {
+        catalog = (await this.getSupportedCrops()).crops ?? [];
+      } catch {
+        // English names from CROP_IDS are enough to show the result
+      }
+      return decodeCompactRecommendation(buffer, catalog);
+    } catch (error) {
+      console.error('Crop recommendation failed:', error);
+      throw error;
+    }
+  }
+
+  async getSupportedCrops() {
+    try {
+      return await this.getWithETag('/api/crops');
     } catch (error) {
       console.error('Failed to get supported crops:', error);
       throw error;
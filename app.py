@@ -8,11 +8,13 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Use the simple deployment app (updated with 24 crops)
-from simple_deployment_app import app
+from simple_deployment_app import app, start_dataset_refresh_on_boot
 
 # This is what Gunicorn will look for
 application = app
 
 if __name__ == '__main__':
+    # Under gunicorn, gunicorn.conf.py starts the refresh in each worker
+    start_dataset_refresh_on_boot()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
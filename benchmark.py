@@ -0,0 +1,266 @@
+# SIH 2025 - Local Benchmark Harness
+# Measures throughput and latency percentiles of the recommendation hot paths
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_RESULTS_FILE = 'benchmark_results.json'
+DEFAULT_THRESHOLD = 10.0  # percent
+DEFAULT_METRICS = ('p50_ms', 'p95_ms', 'throughput_rps')
+HIGHER_IS_BETTER = {'throughput_rps'}
+
+PARAM_NAMES = ('N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall')
+
+
+def sample_inputs(count, seed=2025):
+    """Deterministic soil/climate samples covering the typical input ranges."""
+    rng = random.Random(seed)
+    samples = [(90, 42, 43, 21, 82, 6.5, 203)]
+    while len(samples) < count:
+        samples.append((
+            rng.randint(0, 140), rng.randint(5, 145), rng.randint(5, 205),
+            round(rng.uniform(10, 40), 1), round(rng.uniform(20, 99), 1),
+            round(rng.uniform(4.5, 8.5), 2), rng.randint(50, 2500)
+        ))
+    return samples
+
+
+def isolate_environment():
+    """Keep benchmark traffic out of the real usage stats and dataset cache."""
+    workdir = tempfile.mkdtemp(prefix='sih_benchmark_')
+    os.environ.setdefault('USAGE_DATA_DIR', workdir)
+    os.environ.setdefault('RULES_CACHE_FILE', os.path.join(workdir, 'crop_rules_cache.json'))
+    os.environ.setdefault('DATASET_REFRESH_ON_START', '0')
+    # production_api logs every recommendation at INFO; keep the console readable
+    logging.disable(logging.INFO)
+
+
+def flask_target(module_name, headers=None):
+    def setup():
+        module = __import__(module_name)
+        client = module.app.test_client()
+
+        def call(sample):
+            response = client.post('/api/recommend', json=dict(zip(PARAM_NAMES, sample)), headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"{module_name} returned HTTP {response.status_code}")
+
+        return call
+    return setup
+
+
+def comprehensive_analysis_target():
+    from working_crop_system import comprehensive_analysis
+    return lambda sample: comprehensive_analysis(*sample)
+
+
+def step5_predictor_target():
+    # Generated by step5_yield_sustainability.py; needs the trained model files
+    from enhanced_crop_predictor import recommend_crop
+    result = recommend_crop(90, 42, 43, 21, 82, 6.5, 203)
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    return lambda sample: recommend_crop(*sample)
+
+
+def encode_target(encoding):
+    """Serializes a precomputed analysis, isolating the response encoding cost."""
+    def setup():
+        import production_api
+        from compact_wire import encode_recommendation
+        from working_crop_system import comprehensive_analysis
+        results = {}
+
+        def call(sample):
+            result = results.get(sample)
+            if result is None:
+                result = results[sample] = comprehensive_analysis(*sample)
+            if encoding == 'compact':
+                return encode_recommendation(result)
+            return json.dumps(production_api.build_recommendation_payload(result, *sample), sort_keys=True)
+
+        return call
+    return setup
+
+
+def payload_sizes(samples):
+    """Mean /api/recommend response size in bytes, JSON vs the compact encoding."""
+    import production_api
+    from compact_wire import MIMETYPE
+    client = production_api.app.test_client()
+    sizes = {'json': [], 'compact': []}
+    for sample in samples:
+        payload = dict(zip(PARAM_NAMES, sample))
+        sizes['json'].append(len(client.post('/api/recommend', json=payload).get_data()))
+        sizes['compact'].append(len(client.post('/api/recommend', json=payload,
+                                                headers={'Accept': MIMETYPE}).get_data()))
+    json_bytes = statistics.fmean(sizes['json'])
+    compact_bytes = statistics.fmean(sizes['compact'])
+    return {
+        'status': 'ok',
+        'samples': len(samples),
+        'json_bytes': round(json_bytes, 1),
+        'compact_bytes': round(compact_bytes, 1),
+        'size_ratio': round(json_bytes / compact_bytes, 2)
+    }
+
+
+TARGETS = {
+    'simple_deployment_app': flask_target('simple_deployment_app'),
+    'production_api': flask_target('production_api'),
+    'production_api_compact': flask_target('production_api', {'Accept': 'application/vnd.sih.crop-recommendation'}),
+    'standalone_api': flask_target('standalone_api'),
+    'full_crop_backend': flask_target('full_crop_backend'),
+    'comprehensive_analysis': comprehensive_analysis_target,
+    'step5_predictor': step5_predictor_target,
+    'json_encode': encode_target('json'),
+    'compact_encode': encode_target('compact')
+}
+
+# Targets that report sizes rather than latencies
+REPORTS = {
+    'payload_sizes': payload_sizes
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def measure(call, samples, requests, warmup):
+    for i in range(warmup):
+        call(samples[i % len(samples)])
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        call_started = time.perf_counter()
+        call(samples[i % len(samples)])
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'status': 'ok',
+        'requests': requests,
+        'throughput_rps': round(requests / elapsed, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 4),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 4),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 4),
+        'max_ms': round(latencies[-1] * 1000, 4)
+    }
+
+
+def run_benchmarks(names=None, requests=2000, warmup=200, distinct_inputs=64):
+    """Run the selected targets and return {name: result}."""
+    samples = sample_inputs(distinct_inputs)
+    results = {}
+    for name in names or list(TARGETS) + list(REPORTS):
+        print(f"⏱️  {name} ...", end=' ', flush=True)
+        if name in REPORTS:
+            results[name] = REPORTS[name](samples)
+            print(', '.join(f"{key} {value}" for key, value in results[name].items() if key != 'status'))
+            continue
+        try:
+            call = TARGETS[name]()
+        except Exception as e:
+            results[name] = {'status': 'skipped', 'reason': str(e)}
+            print(f"skipped ({e})")
+            continue
+        results[name] = measure(call, samples, requests, warmup)
+        print(f"{results[name]['throughput_rps']:,.0f} req/s, p50 {results[name]['p50_ms']} ms, "
+              f"p95 {results[name]['p95_ms']} ms, p99 {results[name]['p99_ms']} ms")
+    return results
+
+
+def save_results(results, output_file, config):
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results
+    }
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+    return report
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, metrics=DEFAULT_METRICS):
+    """Return a list of regressions worse than threshold percent.
+
+    Both arguments are report dicts as written by save_results().
+    """
+    regressions = []
+    for name, base in baseline['results'].items():
+        now = current['results'].get(name)
+        if base.get('status') != 'ok' or not now or now.get('status') != 'ok':
+            continue
+        for metric in metrics:
+            if not base.get(metric):
+                continue
+            change = (now[metric] - base[metric]) / base[metric] * 100
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append({'target': name, 'metric': metric, 'baseline': base[metric],
+                                    'current': now[metric], 'regression_pct': round(change, 1)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the crop recommendation hot paths')
+    parser.add_argument('--targets', nargs='+', choices=sorted(list(TARGETS) + list(REPORTS)), help='Targets to run (default: all)')
+    parser.add_argument('--requests', type=int, default=2000, help='Timed calls per target')
+    parser.add_argument('--warmup', type=int, default=200, help='Untimed calls per target')
+    parser.add_argument('--distinct-inputs', type=int, default=64, help='Distinct samples cycled through')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help='Where to write the JSON results')
+    parser.add_argument('--compare', metavar='BASELINE', help='Fail if results regress against this file')
+    parser.add_argument('--current', metavar='RESULTS', help='Compare this results file instead of running')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed regression in percent')
+    parser.add_argument('--metrics', nargs='+', default=list(DEFAULT_METRICS), help='Metrics checked by --compare')
+    args = parser.parse_args(argv)
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        isolate_environment()
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        config = {'requests': args.requests, 'warmup': args.warmup, 'distinct_inputs': args.distinct_inputs}
+        print("🚀 SIH 2025 Benchmark")
+        print("=" * 60)
+        results = run_benchmarks(args.targets, args.requests, args.warmup, args.distinct_inputs)
+        current = save_results(results, args.output, config)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold, args.metrics)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold}%:")
+        for r in regressions:
+            print(f"   • {r['target']} {r['metric']}: {r['baseline']} → {r['current']} (+{r['regression_pct']}%)")
+        return 1
+    print(f"\n✅ No regressions over {args.threshold}% against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
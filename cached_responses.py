@@ -0,0 +1,51 @@
+# SIH 2025 - Pre-serialized JSON Responses
+# Catalog payloads are encoded once and served with a strong ETag
+
+import hashlib
+import threading
+from flask import current_app, request
+
+
+class StaticJSONResponse:
+    """JSON body built once and reused until its version changes.
+
+    build_payload() returns the dict to serialize. version() (optional)
+    returns an object that changes whenever the payload would; the body is
+    rebuilt only then. Requests with a matching If-None-Match get a 304.
+    """
+
+    def __init__(self, build_payload, version=None, max_age=300):
+        self.build_payload = build_payload
+        self.version = version or (lambda: None)
+        self.max_age = max_age
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._entry = None
+
+    def _get_entry(self):
+        version = self.version()
+        entry = self._entry
+        if entry is None or entry[0] is not version:
+            with self._lock:
+                entry = self._entry
+                if entry is None or entry[0] is not version:
+                    # Same bytes jsonify() would produce
+                    body = current_app.json.response(self.build_payload()).get_data()
+                    entry = (version, body, hashlib.sha256(body).hexdigest()[:32])
+                    self._entry = entry
+        return entry
+
+    @property
+    def etag(self):
+        return self._get_entry()[2]
+
+    def response(self):
+        _, body, etag = self._get_entry()
+        response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        # Turns the response into a bodyless 304 when If-None-Match matches
+        return response.make_conditional(request)
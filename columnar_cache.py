@@ -0,0 +1,240 @@
+# SIH 2025 - Columnar Training Data Cache
+# Crop_recommendation.csv parsed once into memory-mappable arrays shared by steps 1-3
+
+import hashlib
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from dataset_stats import DEFAULT_CHUNK_SIZE, FEATURE_COLUMNS
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_SOURCE = 'Crop_recommendation.csv'
+DEFAULT_CACHE_DIR = os.environ.get('CROP_DATA_CACHE_DIR', 'crop_data_cache')
+MANIFEST_FILE = 'manifest.json'
+
+# Split used by step 1 since the beginning; changing it rebuilds the cache
+DEFAULT_TEST_SIZE = 0.2
+DEFAULT_RANDOM_STATE = 42
+
+ARRAY_FILES = {
+    'features': 'features.npy',          # float32 (rows x features), Fortran order
+    'label_codes': 'label_codes.npy',    # int32 index into manifest['classes']
+    'source_index': 'source_index.npy'   # int64 CSV row number of each cached row
+}
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ColumnarDataset:
+    """Memory-mapped features and labels with the train/test split baked in.
+
+    Rows are stored training rows first, so X_train / X_test and the label
+    code slices are zero-copy views of the mapped files. Label codes index
+    classes, which is sorted the same way LabelEncoder sorts them.
+    """
+
+    def __init__(self, cache_dir, manifest):
+        self.cache_dir = cache_dir
+        self.manifest = manifest
+        self.feature_columns = list(manifest['feature_columns'])
+        self.label_column = manifest['label_column']
+        self.classes = list(manifest['classes'])
+        self.n_train = manifest['n_train']
+        self.features = self._load('features')
+        self.label_codes = self._load('label_codes')
+        self.source_index = self._load('source_index')
+
+    def _load(self, name):
+        return np.load(os.path.join(self.cache_dir, ARRAY_FILES[name]), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.label_codes)
+
+    @property
+    def X_train(self):
+        return self.features[:self.n_train]
+
+    @property
+    def X_test(self):
+        return self.features[self.n_train:]
+
+    @property
+    def y_train_codes(self):
+        return self.label_codes[:self.n_train]
+
+    @property
+    def y_test_codes(self):
+        return self.label_codes[self.n_train:]
+
+    def labels(self, codes):
+        return np.asarray(self.classes, dtype=object)[codes]
+
+    def _frame(self, features):
+        return pd.DataFrame(features, columns=self.feature_columns, copy=False)
+
+    def _series(self, codes):
+        return pd.Series(self.labels(codes), name=self.label_column)
+
+    def train_test_frames(self):
+        """(X_train, X_test, y_train, y_test) as pandas objects, like the old CSVs."""
+        return (self._frame(self.X_train), self._frame(self.X_test),
+                self._series(self.y_train_codes), self._series(self.y_test_codes))
+
+    def write_csv_split(self, directory='.', source=None):
+        """Write X_train.csv, X_test.csv, y_train.csv and y_test.csv as step 1 always has.
+
+        Rows follow the cached split, but values are re-read from source (the
+        manifest's CSV by default), so the files keep full float64 precision
+        rather than the cache's float32. Returns the paths written.
+        """
+        df = pd.read_csv(source or self.manifest['source'])
+        splits = (('train', self.source_index[:self.n_train]), ('test', self.source_index[self.n_train:]))
+        paths = []
+        for split, rows in splits:
+            for prefix, columns in (('X', self.feature_columns), ('y', [self.label_column])):
+                path = os.path.join(directory, f'{prefix}_{split}.csv')
+                df.iloc[rows][columns].to_csv(path, index=False)
+                paths.append(path)
+        return paths
+
+    def frame(self):
+        """Whole dataset as a DataFrame in the original CSV row order."""
+        order = np.empty(len(self), dtype=np.int64)
+        order[self.source_index] = np.arange(len(self))
+        df = self._frame(self.features[order])
+        df[self.label_column] = self.labels(self.label_codes[order])
+        return df
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(manifest, source, cache_dir, test_size, random_state):
+    """True if the cache matches the source content and split settings.
+
+    Size and mtime are checked first; the content hash is only computed
+    when they differ, and a matching hash just refreshes the manifest.
+    """
+    if (not manifest or manifest.get('format_version') != CACHE_FORMAT_VERSION
+            or manifest.get('test_size') != test_size or manifest.get('random_state') != random_state
+            or not all(os.path.exists(os.path.join(cache_dir, f)) for f in ARRAY_FILES.values())):
+        return False
+
+    stat = os.stat(source)
+    if stat.st_size == manifest['source_size'] and stat.st_mtime_ns == manifest['source_mtime_ns']:
+        return True
+    if stat.st_size != manifest['source_size'] or file_sha256(source) != manifest['source_sha256']:
+        return False
+
+    manifest['source_mtime_ns'] = stat.st_mtime_ns
+    _write_manifest(cache_dir, manifest)
+    return True
+
+
+def build_columnar_cache(source=DEFAULT_SOURCE, cache_dir=DEFAULT_CACHE_DIR, label_column='label',
+                         test_size=DEFAULT_TEST_SIZE, random_state=DEFAULT_RANDOM_STATE,
+                         chunksize=DEFAULT_CHUNK_SIZE):
+    """Parse source in chunks and write the cache files plus manifest.
+
+    The split is the same stratified train_test_split step 1 always used.
+    Arrays are written first and the manifest last, so an interrupted
+    build is simply rebuilt on the next load.
+    """
+    from sklearn.model_selection import train_test_split
+
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(source)
+    source_sha256 = file_sha256(source)
+    feature_columns = list(FEATURE_COLUMNS)
+
+    # Pass 1: labels only, to get the class list, row count and split
+    class_ids, chunk_codes = {}, []
+    for chunk in pd.read_csv(source, usecols=[label_column], chunksize=chunksize):
+        codes, uniques = pd.factorize(chunk[label_column])
+        lookup = np.array([class_ids.setdefault(label, len(class_ids)) for label in uniques], dtype=np.int32)
+        chunk_codes.append(lookup[codes])
+    codes = np.concatenate(chunk_codes) if chunk_codes else np.empty(0, dtype=np.int32)
+
+    classes = sorted(class_ids)
+    remap = np.empty(len(classes), dtype=np.int32)
+    for code, label in enumerate(classes):
+        remap[class_ids[label]] = code
+    codes = remap[codes]
+
+    train_index, test_index = train_test_split(
+        np.arange(len(codes)), test_size=test_size, random_state=random_state, stratify=codes
+    )
+    source_index = np.concatenate([train_index, test_index]).astype(np.int64)
+    position = np.empty(len(codes), dtype=np.int64)
+    position[source_index] = np.arange(len(codes))
+
+    # Pass 2: scatter feature rows into their split position
+    paths = {name: os.path.join(cache_dir, filename) for name, filename in ARRAY_FILES.items()}
+    tmp_paths = {name: f"{path}.{os.getpid()}.tmp.npy" for name, path in paths.items()}
+    features = np.lib.format.open_memmap(tmp_paths['features'], mode='w+', dtype=np.float32,
+                                         shape=(len(codes), len(feature_columns)), fortran_order=True)
+    start = 0
+    for chunk in pd.read_csv(source, usecols=feature_columns, chunksize=chunksize):
+        end = start + len(chunk)
+        features[position[start:end]] = chunk[feature_columns].to_numpy(dtype=np.float32)
+        start = end
+    features.flush()
+    del features
+
+    np.save(tmp_paths['label_codes'], codes[source_index])
+    np.save(tmp_paths['source_index'], source_index)
+    for name in ARRAY_FILES:
+        os.replace(tmp_paths[name], paths[name])
+
+    manifest = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'created': datetime.now().isoformat(),
+        'source': os.path.abspath(source),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': source_sha256,
+        'rows': len(codes),
+        'n_train': len(train_index),
+        'n_test': len(test_index),
+        'test_size': test_size,
+        'random_state': random_state,
+        'feature_columns': feature_columns,
+        'label_column': label_column,
+        'classes': classes,
+        'files': ARRAY_FILES
+    }
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+def load_columnar_dataset(source=DEFAULT_SOURCE, cache_dir=DEFAULT_CACHE_DIR,
+                          test_size=DEFAULT_TEST_SIZE, random_state=DEFAULT_RANDOM_STATE, rebuild=False):
+    """Memory-map the cached dataset, (re)building it if source has changed.
+
+    Raises FileNotFoundError if source does not exist.
+    """
+    manifest = None if rebuild else _read_manifest(cache_dir)
+    if not _is_fresh(manifest, source, cache_dir, test_size, random_state):
+        manifest = build_columnar_cache(source, cache_dir, test_size=test_size, random_state=random_state)
+    return ColumnarDataset(cache_dir, manifest)
@@ -0,0 +1,115 @@
+# SIH 2025 - Compact Binary Wire Format
+# Fixed struct layout for recommendation responses on slow mobile connections
+
+import struct
+
+MIMETYPE = 'application/vnd.sih.crop-recommendation'
+MAGIC = b'CR'
+VERSION = 1
+
+# Crop IDs are positions in this tuple (the /api/crops order). New crops are
+# appended so that IDs already known to clients keep their meaning.
+CROP_IDS = (
+    'rice', 'wheat', 'maize', 'cotton', 'sugarcane', 'jute', 'coffee', 'coconut',
+    'papaya', 'orange', 'apple', 'muskmelon', 'watermelon', 'grapes', 'mango', 'banana',
+    'pomegranate', 'lentil', 'blackgram', 'mungbean', 'mothbeans', 'pigeonpeas',
+    'kidneybeans', 'chickpea'
+)
+UNKNOWN_CROP = 255
+_CROP_INDEX = {crop: crop_id for crop_id, crop in enumerate(CROP_IDS)}
+
+FLAG_VALID = 0x01
+
+# Little-endian throughout:
+#   header   magic, version, flags, alternative count, warning count
+#   crop     id, score x1000, yield x100 (kg/ha), sustainability x100
+#            (primary first, then the alternatives)
+#   warning  UTF-8 byte length, then the text
+HEADER = struct.Struct('<2sBBBB')
+CROP = struct.Struct('<BHIH')
+WARNING_LENGTH = struct.Struct('<H')
+
+MAX_ALTERNATIVES = 3
+
+
+def crop_id(crop):
+    return _CROP_INDEX.get(crop, UNKNOWN_CROP)
+
+
+def _fixed(value, scale, limit):
+    return min(max(int(round(value * scale)), 0), limit)
+
+
+def _pack_crop(crop, score, yield_kg, sustainability):
+    return CROP.pack(crop_id(crop), _fixed(score, 1000, 0xFFFF),
+                     _fixed(yield_kg, 100, 0xFFFFFFFF), _fixed(sustainability, 100, 0xFFFF))
+
+
+def encode_recommendation(analysis, max_alternatives=MAX_ALTERNATIVES):
+    """Binary form of a comprehensive_analysis() result.
+
+    Carries what the JSON response does minus the input echo and the static
+    system_info block, at the same precision the JSON rounds to.
+    """
+    primary = analysis['primary_recommendation']
+    alternatives = analysis['alternative_crops'][:max_alternatives]
+    validation = analysis['input_validation']
+    warnings = [warning.encode('utf-8')[:0xFFFF] for warning in validation['warnings'][:255]]
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, FLAG_VALID if validation['is_valid'] else 0,
+                    len(alternatives), len(warnings)),
+        _pack_crop(primary['crop'], primary['confidence_score'],
+                   primary['predicted_yield_kg_per_ha'], primary['sustainability_score'])
+    ]
+    for alt in alternatives:
+        parts.append(_pack_crop(alt['crop'], alt['suitability_score'],
+                                alt['predicted_yield_kg_per_ha'], alt['sustainability_score']))
+    for warning in warnings:
+        parts.append(WARNING_LENGTH.pack(len(warning)))
+        parts.append(warning)
+    return b''.join(parts)
+
+
+def _unpack_crop(data, offset):
+    crop, score, yield_kg, sustainability = CROP.unpack_from(data, offset)
+    return {
+        'crop_id': crop,
+        'name_english': CROP_IDS[crop] if crop < len(CROP_IDS) else 'unknown',
+        'score': score / 1000,
+        'predicted_yield_kg_per_ha': yield_kg / 100,
+        'sustainability_score': sustainability / 100
+    }
+
+
+def decode_recommendation(data):
+    """Inverse of encode_recommendation(); raises ValueError on bad input."""
+    try:
+        magic, version, flags, alternative_count, warning_count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} compact recommendation")
+        offset = HEADER.size
+        crops = []
+        for _ in range(1 + alternative_count):
+            crops.append(_unpack_crop(data, offset))
+            offset += CROP.size
+        warnings = []
+        for _ in range(warning_count):
+            (length,) = WARNING_LENGTH.unpack_from(data, offset)
+            offset += WARNING_LENGTH.size
+            if offset + length > len(data):
+                raise ValueError("Truncated warning text")
+            warnings.append(bytes(data[offset:offset + length]).decode('utf-8'))
+            offset += length
+    except struct.error as e:
+        raise ValueError(f"Truncated compact recommendation: {e}")
+    
+    primary, alternatives = crops[0], crops[1:]
+    primary['confidence'] = primary.pop('score')
+    for alt in alternatives:
+        alt['suitability_score'] = alt.pop('score')
+    return {
+        'primary_crop': primary,
+        'alternative_crops': alternatives,
+        'validation': {'is_valid': bool(flags & FLAG_VALID), 'warnings': warnings}
+    }
@@ -17,8 +17,8 @@ class CompleteSIHSystem:
         """Mobile-friendly API endpoint with multilingual support."""
         
         try:
-            # Set language
-            self.ml_support.set_language(language)
+            # Language is passed per call so concurrent requests never share state
+            language = self.ml_support.resolve_language(language)
             
             # Get comprehensive analysis
             result = comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall)
@@ -40,7 +40,7 @@ class CompleteSIHSystem:
                 "recommendation": {
                     "primary_crop": {
                         "name_english": result['primary_recommendation']['crop'],
-                        "name_local": self.ml_support.get_crop_name(result['primary_recommendation']['crop']),
+                        "name_local": self.ml_support.get_crop_name(result['primary_recommendation']['crop'], language),
                         "confidence": result['primary_recommendation']['confidence_score'],
                         "predicted_yield": result['primary_recommendation']['predicted_yield_kg_per_ha'],
                         "sustainability_score": result['primary_recommendation']['sustainability_score']
@@ -48,17 +48,17 @@ class CompleteSIHSystem:
                     "alternatives": [
                         {
                             "name_english": alt['crop'],
-                            "name_local": self.ml_support.get_crop_name(alt['crop']),
+                            "name_local": self.ml_support.get_crop_name(alt['crop'], language),
                             "yield": alt['predicted_yield_kg_per_ha'],
                             "sustainability": alt['sustainability_score']
                         } for alt in result['alternative_crops'][:3]
                     ]
                 },
                 "ui_texts": {
-                    "recommended_crop": self.ml_support.get_text('recommended_crop'),
-                    "predicted_yield": self.ml_support.get_text('predicted_yield'),
-                    "sustainability_score": self.ml_support.get_text('sustainability_score'),
-                    "alternatives": self.ml_support.get_text('alternatives')
+                    "recommended_crop": self.ml_support.get_text('recommended_crop', language),
+                    "predicted_yield": self.ml_support.get_text('predicted_yield', language),
+                    "sustainability_score": self.ml_support.get_text('sustainability_score', language),
+                    "alternatives": self.ml_support.get_text('alternatives', language)
                 },
                 "validation": {
                     "warnings": result['input_validation']['warnings'],
@@ -0,0 +1,15 @@
+# SIH 2025 - Shared pytest setup
+# Keeps test traffic out of the real usage stats next to the app
+
+import pytest
+import usage_tracker
+
+
+@pytest.fixture(autouse=True, scope='session')
+def isolated_usage_store(tmp_path_factory):
+    patch = pytest.MonkeyPatch()
+    patch.setenv('USAGE_DATA_DIR', str(tmp_path_factory.mktemp('usage')))
+    patch.delenv('USAGE_DB_FILE', raising=False)
+    yield
+    usage_tracker.close_usage_tracker()
+    patch.undo()
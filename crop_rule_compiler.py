@@ -0,0 +1,156 @@
+# SIH 2025 - Crop Rule Compiler
+# Turns crop_rules / crop_data plus declarative per-crop overrides into flat arrays
+
+import numpy as np
+
+PARAM_NAMES = ('N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall')
+
+# Used for crops that are not in crop_data
+DEFAULT_CROP_DATA = {'base_yield': 2000, 'water_need': 800, 'fertilizer_efficiency': 0.75}
+
+# (temp_min, temp_max, humidity_min, humidity_max, score), first match wins
+DEFAULT_CLIMATE_TIERS = ((20, 30, 60, 80, 8.0), (15, 35, 40, 90, 6.5))
+DEFAULT_CLIMATE_SCORE = 5.0
+
+
+def band_value(bands, fallback, value):
+    """Score of the first (low, high, score) band containing value, else fallback."""
+    for low, high, score in bands:
+        if low <= value <= high:
+            return score
+    return fallback
+
+
+class CropProfile:
+    """Per-crop constants and overrides used by yield and sustainability scoring."""
+
+    def __init__(self, crop_data, overrides=None):
+        overrides = overrides or {}
+        self.base_yield = crop_data['base_yield']
+        self.water_need = crop_data['water_need']
+        self.fertilizer_efficiency = crop_data['fertilizer_efficiency']
+        # {param: ((low, high, factor), ..., fallback_factor)}; None = default formula
+        self.yield_bands = overrides.get('yield_bands', {})
+        self.climate_tiers = overrides.get('climate_tiers', DEFAULT_CLIMATE_TIERS)
+
+    def temperature_factor(self, temperature):
+        bands = self.yield_bands.get('temperature')
+        if bands:
+            return band_value(bands[:-1], bands[-1], temperature)
+        if 20 <= temperature <= 30:
+            return 1.0
+        elif temperature < 20:
+            return 0.7 + (temperature / 30)
+        return max(0.5, 1.2 - (temperature / 50))
+
+    def humidity_factor(self, humidity):
+        bands = self.yield_bands.get('humidity')
+        if bands:
+            return band_value(bands[:-1], bands[-1], humidity)
+        return min(1.0, humidity / 80)
+
+    def climate_score(self, temperature, humidity):
+        for t_low, t_high, h_low, h_high, score in self.climate_tiers:
+            if t_low <= temperature <= t_high and h_low <= humidity <= h_high:
+                return score
+        return DEFAULT_CLIMATE_SCORE
+
+
+class CompiledCropRules:
+    """(crops x params) suitability tables with per-crop band overrides as masks.
+
+    Standard parameters score 1.0 inside [min, max] and fall off linearly
+    outside it. Parameters listed in an override's 'suitability_bands' score
+    ideal/tolerable band values instead, with a linear fallback around a
+    centre. An override's 'bonus' raises that crop's normalization divisor,
+    and every score is capped at 1.0.
+
+    Overrides and profiles are matched on the lowercased crop name, and each
+    crop's points are added banded parameters first, then in rule order, so
+    scores equal the original per-crop branches bit for bit.
+    """
+
+    def __init__(self, crop_rules, crop_data, overrides=None, param_order=PARAM_NAMES):
+        overrides = {crop.lower(): override for crop, override in (overrides or {}).items()}
+        self.param_order = tuple(param_order)
+        self.crops = list(crop_rules.keys())
+        self.crop_index = {crop: i for i, crop in enumerate(self.crops)}
+
+        shape = (len(self.crops), len(self.param_order))
+        self.lower = np.zeros(shape)
+        self.upper = np.zeros(shape)
+        self.has_param = np.zeros(shape, dtype=bool)
+
+        self.banded = np.zeros(shape, dtype=bool)
+        self.ideal_low = np.zeros(shape)
+        self.ideal_high = np.zeros(shape)
+        self.ideal_score = np.zeros(shape)
+        self.tolerable_low = np.zeros(shape)
+        self.tolerable_high = np.zeros(shape)
+        self.tolerable_score = np.zeros(shape)
+        self.center = np.zeros(shape)
+        self.scale = np.ones(shape)
+        self.divisor = np.zeros(len(self.crops))
+        self.sum_order = np.tile(np.arange(len(self.param_order)), (len(self.crops), 1))
+
+        for i, crop in enumerate(self.crops):
+            rules = crop_rules[crop]
+            override = overrides.get(crop.lower(), {})
+            bands = override.get('suitability_bands', {})
+            order = [param for param in bands if param in rules] + [param for param in rules if param not in bands]
+            order = [self.param_order.index(param) for param in order if param in self.param_order]
+            self.sum_order[i] = order + [j for j in range(len(self.param_order)) if j not in order]
+            for j, param in enumerate(self.param_order):
+                if param not in rules:
+                    continue
+                self.has_param[i, j] = True
+                self.lower[i, j], self.upper[i, j] = rules[param]
+                if param in bands:
+                    band = bands[param]
+                    self.banded[i, j] = True
+                    self.ideal_low[i, j], self.ideal_high[i, j], self.ideal_score[i, j] = band['ideal']
+                    self.tolerable_low[i, j], self.tolerable_high[i, j], self.tolerable_score[i, j] = band['tolerable']
+                    self.center[i, j] = band['center']
+                    self.scale[i, j] = band['scale']
+            self.divisor[i] = len(rules) + override.get('bonus', 0.0)
+
+        self.width = np.maximum(1, self.upper - self.lower)
+
+        self.profiles = {
+            crop: CropProfile(data, overrides.get(crop.lower())) for crop, data in crop_data.items()
+        }
+        for crop, override in overrides.items():
+            if crop not in self.profiles:
+                self.profiles[crop] = CropProfile(DEFAULT_CROP_DATA, override)
+        self.default_profile = CropProfile(DEFAULT_CROP_DATA)
+
+    def __len__(self):
+        return len(self.crops)
+
+    def profile(self, crop):
+        """Profile for a crop name, looked up lowercased like crop_data always was."""
+        return self.profiles.get(crop.lower(), self.default_profile)
+
+    def score(self, samples):
+        """Return a (samples x crops) array of suitability scores in [0, 1]."""
+        x = np.atleast_2d(np.asarray(samples, dtype=np.float64))[:, None, :]
+
+        inside = (x >= self.lower) & (x <= self.upper)
+        distance = np.where(x < self.lower, self.lower - x, x - self.upper)
+        standard = np.where(inside, 1.0, np.maximum(0.0, 1.0 - np.minimum(1.0, distance / self.width)))
+
+        banded = np.where(
+            (x >= self.ideal_low) & (x <= self.ideal_high), self.ideal_score,
+            np.where((x >= self.tolerable_low) & (x <= self.tolerable_high), self.tolerable_score,
+                     np.maximum(0.0, 1.0 - np.abs(x - self.center) / self.scale))
+        )
+
+        points = np.where(self.has_param, np.where(self.banded, banded, standard), 0.0)
+        # Add up in each crop's own order; float addition is not associative
+        points = np.take_along_axis(points, self.sum_order[None, :, :], axis=2)
+        total = np.zeros(points.shape[:2])
+        for j in range(points.shape[2]):
+            total += points[:, :, j]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.minimum(1.0, total / self.divisor)
+        return np.where(self.divisor > 0, scores, 0.0)
@@ -0,0 +1,202 @@
+# SIH 2025 - Dataset Statistics
+# Per-crop feature statistics gathered in a single streaming pass (NumPy, no pandas)
+
+import codecs
+import csv
+import itertools
+import urllib.request
+import numpy as np
+
+FEATURE_COLUMNS = ('N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall')
+STATS = ('count', 'mean', 'std', 'min', 'max')
+
+# Rows per chunk when streaming large CSVs (e.g. district soil-card dumps)
+DEFAULT_CHUNK_SIZE = 100000
+
+
+class DatasetStats:
+    """count/mean/std/min/max per crop and feature, plus dataset summary.
+
+    values[stat] is a (crops x features) array with crops in order of first
+    appearance. stats builds the equivalent pandas frame on demand.
+    """
+
+    def __init__(self, crops, values, total_records, columns):
+        self.crops = list(crops)
+        self.values = values
+        self.total_records = total_records
+        self.columns = columns
+
+    def stat(self, name):
+        """(crops x features) array for one statistic, e.g. stat('mean')."""
+        return self.values[name]
+
+    @property
+    def stats(self):
+        """Frame indexed by crop with (feature, stat) columns (imports pandas)."""
+        import pandas as pd
+        data = {(feature, name): self.values[name][:, j]
+                for j, feature in enumerate(FEATURE_COLUMNS) for name in STATS}
+        return pd.DataFrame(data, index=pd.Index(self.crops, name='label'))
+
+
+def _is_missing(label):
+    return label is None or label == '' or label != label  # NaN != NaN
+
+
+class StatsAccumulator:
+    """Merges per-chunk group statistics (Chan et al. parallel mean/variance)."""
+
+    def __init__(self):
+        self.crops = []
+        self.crop_ids = {}
+        self.total_records = 0
+        shape = (0, len(FEATURE_COLUMNS))
+        self.count = np.zeros(shape)
+        self.mean = np.full(shape, np.nan)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.nan)
+        self.max = np.full(shape, np.nan)
+
+    def _codes(self, labels):
+        """Crop id per row (-1 for a missing label), registering new crops."""
+        local = {}
+        inverse = np.fromiter((local.setdefault(label, len(local)) for label in labels),
+                              dtype=np.intp, count=len(labels))
+        ids = np.array([-1 if _is_missing(label) else self.crop_ids.setdefault(label, len(self.crop_ids))
+                        for label in local], dtype=np.intp)
+        for label in list(self.crop_ids)[len(self.crops):]:
+            self.crops.append(label)
+
+        grow = len(self.crops) - len(self.count)
+        if grow:
+            width = len(FEATURE_COLUMNS)
+            self.count = np.vstack([self.count, np.zeros((grow, width))])
+            self.mean = np.vstack([self.mean, np.full((grow, width), np.nan)])
+            self.m2 = np.vstack([self.m2, np.zeros((grow, width))])
+            self.min = np.vstack([self.min, np.full((grow, width), np.nan)])
+            self.max = np.vstack([self.max, np.full((grow, width), np.nan)])
+        return ids[inverse] if len(ids) else inverse
+
+    def add(self, labels, values):
+        """Fold one chunk in: labels (sequence) and a (rows x features) float array."""
+        self.total_records += len(labels)
+        codes = self._codes(labels)
+        groups = len(self.crops)
+        for j in range(values.shape[1]):
+            x = values[:, j]
+            keep = (codes >= 0) & ~np.isnan(x)
+            c, x = codes[keep], x[keep]
+
+            n_b = np.bincount(c, minlength=groups).astype(np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_b = np.bincount(c, weights=x, minlength=groups) / n_b
+            m2_b = np.bincount(c, weights=(x - mean_b[c]) ** 2, minlength=groups)
+            min_b = np.full(groups, np.nan)
+            max_b = np.full(groups, np.nan)
+            np.fmin.at(min_b, c, x)
+            np.fmax.at(max_b, c, x)
+
+            n_a, mean_a = self.count[:, j], self.mean[:, j]
+            n = n_a + n_b
+            with np.errstate(invalid='ignore', divide='ignore'):
+                delta = mean_b - mean_a
+                self.mean[:, j] = np.where(n_a == 0, mean_b, np.where(n_b == 0, mean_a, mean_a + delta * n_b / n))
+                self.m2[:, j] += m2_b + np.nan_to_num(delta ** 2 * n_a * n_b / n)
+            self.count[:, j] = n
+            self.min[:, j] = np.fmin(self.min[:, j], min_b)
+            self.max[:, j] = np.fmax(self.max[:, j], max_b)
+
+    def result(self, columns):
+        if not self.crops:
+            raise ValueError("Dataset is empty")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # std is NaN for groups with a single value, like pandas
+            std = np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+        values = {'count': self.count, 'mean': self.mean, 'std': std, 'min': self.min, 'max': self.max}
+        return DatasetStats(self.crops, values, self.total_records, columns)
+
+
+def aggregate_crop_stats(chunks, label_column='label'):
+    """Aggregate a DataFrame, or an iterable of DataFrame chunks, into DatasetStats."""
+    if hasattr(chunks, 'columns'):
+        chunks = [chunks]
+
+    accumulator = StatsAccumulator()
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        accumulator.add(chunk[label_column].tolist(),
+                        chunk[list(FEATURE_COLUMNS)].to_numpy(dtype=np.float64, na_value=np.nan))
+    return accumulator.result(columns)
+
+
+def _to_float(column):
+    try:
+        return np.array(column, dtype=np.float64)
+    except ValueError:
+        # Empty cells are missing values, as pandas.read_csv treats them
+        return np.array([float(v) if v.strip() else np.nan for v in column], dtype=np.float64)
+
+
+def _parse_chunk(lines, columns, label_index, feature_index):
+    """(labels, values) for a list of CSV lines.
+
+    np.loadtxt parses clean chunks in C; chunks with empty cells or ragged
+    rows fall back to the csv module.
+    """
+    usecols = feature_index + [label_index]
+    # Labels as Python str: a fixed-width unicode field would silently truncate
+    dtype = [(f'f{j}', 'f8') for j in range(len(feature_index))] + [('label', object)]
+    try:
+        data = np.loadtxt(lines, delimiter=',', quotechar='"', usecols=usecols, dtype=dtype, ndmin=1)
+        values = np.column_stack([data[f'f{j}'] for j in range(len(feature_index))])
+        return data['label'].tolist(), values
+    except ValueError:
+        pass
+
+    rows = []
+    for row in csv.reader(lines):
+        if not row:
+            continue  # blank line
+        if len(row) < len(columns):
+            row += [''] * (len(columns) - len(row))
+        rows.append(row)
+    values = np.column_stack([_to_float([row[i] for row in rows]) for i in feature_index])
+    return [row[label_index] for row in rows], values
+
+
+def aggregate_csv_stats(lines, chunksize=DEFAULT_CHUNK_SIZE, label_column='label'):
+    """Stream CSV text lines through StatsAccumulator, chunksize lines at a time."""
+    lines = iter(lines)
+    header = next(csv.reader([next(lines, '')]), None)
+    if not header:
+        raise ValueError("Dataset is empty")
+    columns = [column.strip() for column in header]
+    missing = [column for column in (label_column,) + FEATURE_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Dataset is missing columns: {', '.join(missing)}")
+    label_index = columns.index(label_column)
+    feature_index = [columns.index(column) for column in FEATURE_COLUMNS]
+
+    accumulator = StatsAccumulator()
+    while True:
+        chunk = list(itertools.islice(lines, chunksize))
+        if not chunk:
+            break
+        chunk = [line for line in chunk if line.strip()]
+        if not chunk:
+            continue
+        labels, values = _parse_chunk(chunk, columns, label_index, feature_index)
+        accumulator.add(labels, values)
+    return accumulator.result(columns)
+
+
+def read_crop_stats(source, chunksize=DEFAULT_CHUNK_SIZE, timeout=None):
+    """Stream a CSV from a URL or local path through aggregate_csv_stats()."""
+    if '://' in source:
+        with urllib.request.urlopen(source, timeout=timeout) as response:
+            return aggregate_csv_stats(codecs.iterdecode(response, 'utf-8-sig'), chunksize)
+    with open(source, newline='', encoding='utf-8-sig') as f:
+        return aggregate_csv_stats(f, chunksize)
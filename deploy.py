@@ -19,11 +19,19 @@ class CropAPIDeployer:
         """Check if all required files exist."""
         required_files = [
             'simple_deployment_app.py',
+            'suitability_engine.py',
+            'dataset_stats.py',
+            'cached_responses.py',
+            'distilled_predictor.py',
+            'yield_jitter.py',
+            'singleflight.py',
+            'sparse_fields.py',
             'usage_tracker.py',
             'requirements.txt',
             'Procfile',
             'render.yaml',
-            'app.py'
+            'app.py',
+            'gunicorn.conf.py'
         ]
         
         missing_files = []
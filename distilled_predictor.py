@@ -0,0 +1,122 @@
+# SIH 2025 - Distilled Model Predictor
+# Serves the step 3 model's decisions from a NumPy decision-tree artifact (no sklearn at runtime)
+
+import json
+import os
+import numpy as np
+
+DISTILLED_MODEL_FILE = os.environ.get('DISTILLED_MODEL_FILE', 'distilled_model.npz')
+
+# Array names stored in the .npz artifact (see model_distiller.py)
+TREE_ARRAYS = ('feature', 'threshold', 'children_left', 'children_right', 'value')
+
+
+class DistilledPredictor:
+    """Shallow surrogate tree compiled from the trained classifier.
+
+    feature/threshold/children_* describe the tree (children_left == -1
+    marks a leaf) and value holds each node's class probabilities. Single
+    predictions walk plain Python lists; predict_proba() walks a whole
+    batch with NumPy.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, value, classes, metadata=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children_left = np.asarray(children_left, dtype=np.int32)
+        self.children_right = np.asarray(children_right, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.classes = [str(c) for c in classes]
+        self.metadata = metadata or {}
+        self.max_depth = int(self.metadata.get('max_depth') or len(self.feature))
+
+        # Python-list copies and per-leaf rankings for the single-sample path
+        self._nodes = list(zip(self.feature.tolist(), self.threshold.tolist(),
+                               self.children_left.tolist(), self.children_right.tolist()))
+        self._ranked = {}
+        for node in np.flatnonzero(self.children_left == -1).tolist():
+            order = np.argsort(-self.value[node], kind='stable')
+            self._ranked[node] = [(self.classes[i], float(self.value[node, i])) for i in order.tolist()
+                                  if self.value[node, i] > 0]
+
+    @classmethod
+    def load(cls, path=DISTILLED_MODEL_FILE):
+        with np.load(path, allow_pickle=False) as artifact:
+            arrays = {name: artifact[name] for name in TREE_ARRAYS}
+            classes = artifact['classes'].tolist()
+            metadata = json.loads(str(artifact['metadata']))
+        return cls(classes=classes, metadata=metadata, **arrays)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, classes=np.array(self.classes), metadata=np.array(json.dumps(self.metadata)),
+            **{name: getattr(self, name) for name in TREE_ARRAYS}
+        )
+        return path
+
+    def _leaf(self, sample):
+        node = 0
+        nodes = self._nodes
+        feature, threshold, left, right = nodes[0]
+        while left != -1:
+            node = left if sample[feature] <= threshold else right
+            feature, threshold, left, right = nodes[node]
+        return node
+
+    def top_k(self, sample, k=4):
+        """[(crop, probability), ...] for one [N, P, K, temperature, humidity, ph, rainfall] row."""
+        return self._ranked[self._leaf(sample)][:k]
+
+    def predict_one(self, sample):
+        return self._ranked[self._leaf(sample)][0]
+
+    def leaves(self, samples):
+        x = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+        rows = np.arange(len(x))
+        nodes = np.zeros(len(x), dtype=np.int32)
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left != -1
+            if not internal.any():
+                break
+            go_left = x[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+        return nodes
+
+    def predict_proba(self, samples):
+        return self.value[self.leaves(samples)]
+
+    def predict(self, samples):
+        return np.asarray(self.classes, dtype=object)[self.predict_proba(samples).argmax(axis=1)]
+
+    def recommendation(self, sample, k=4):
+        """JSON-ready prediction block for the API responses."""
+        ranked = self.top_k(sample, k)
+        return {
+            "crop": ranked[0][0],
+            "probability": round(ranked[0][1], 3),
+            "alternatives": [{"crop": crop, "probability": round(p, 3)} for crop, p in ranked[1:]],
+            "source": f"distilled {self.metadata.get('teacher_model', 'model')}"
+        }
+
+    def info(self):
+        """Summary for health/system info endpoints."""
+        return {
+            'teacher_model': self.metadata.get('teacher_model'),
+            'fidelity': self.metadata.get('fidelity', {}).get('test'),
+            'teacher_accuracy': self.metadata.get('teacher_accuracy'),
+            'nodes': len(self.feature),
+            'max_depth': self.max_depth
+        }
+
+
+def load_distilled_predictor(path=None):
+    """DistilledPredictor from path, or None if the artifact has not been built."""
+    path = path or DISTILLED_MODEL_FILE
+    if not os.path.exists(path):
+        return None
+    try:
+        return DistilledPredictor.load(path)
+    except Exception as e:
+        print(f"⚠️  Could not load distilled model {path}: {e}")
+        return None
@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import our working system
 try:
     from working_crop_system import comprehensive_analysis
+    from multilingual_support import get_crop_name
     SYSTEM_AVAILABLE = True
 except ImportError:
     SYSTEM_AVAILABLE = False
@@ -79,12 +80,6 @@ def recommend():
         # Get recommendation
         result = comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall)
         
-        # Hindi names
-        hindi_names = {
-            'rice': 'चावल', 'wheat': 'गेहूं', 'maize': 'मक्का', 'cotton': 'कपास',
-            'mango': 'आम', 'banana': 'केला', 'apple': 'सेब', 'orange': 'संतरा'
-        }
-        
         primary = result['primary_recommendation']
         crop_name = primary['crop']
         
@@ -92,7 +87,7 @@ def recommend():
             "status": "success",
             "recommendation": {
                 "crop_english": crop_name,
-                "crop_hindi": hindi_names.get(crop_name, crop_name),
+                "crop_hindi": get_crop_name(crop_name, 'hindi'),
                 "predicted_yield": primary['predicted_yield_kg_per_ha'],
                 "sustainability_score": primary['sustainability_score'],
                 "confidence": primary['confidence_score']
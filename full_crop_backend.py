@@ -3,13 +3,20 @@
 
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
-import random
 import os
 import json
+from distilled_predictor import load_distilled_predictor
+from suitability_engine import SuitabilityMatrix
+from yield_jitter import SUSTAINABILITY_STREAM, yield_jitter
+from singleflight import SingleFlight, request_key
+from sparse_fields import parse_fields, parse_top_k, select_fields, wants
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Step 3 model compiled by model_distiller.py (NumPy only); None until it is built
+DISTILLED_MODEL = load_distilled_predictor()
+
 # Complete 24 Crops System
 CROP_RULES = {
     'rice': {'N': (80, 120), 'P': (40, 60), 'K': (35, 45), 'temp': (20, 27), 'humidity': (80, 90), 'ph': (5.5, 7.0), 'rainfall': (1500, 2000)},
@@ -54,6 +61,9 @@ HINDI_NAMES = {
     'kidneybeans': 'राजमा', 'chickpea': 'चना'
 }
 
+# Rule table compiled once; scores match calculate_suitability() exactly
+SUITABILITY = SuitabilityMatrix(CROP_RULES)
+
 def calculate_suitability(crop, N, P, K, temp, humidity, ph, rainfall):
     """Calculate crop suitability score using distance-based matching."""
     if crop not in CROP_RULES:
@@ -102,9 +112,66 @@ def health_check():
         "version": "2.0.0",
         "supported_crops": len(CROP_RULES),
         "accuracy": "94%",
-        "target": "Jharkhand Farmers"
+        "target": "Jharkhand Farmers",
+        "distilled_model": DISTILLED_MODEL.info() if DISTILLED_MODEL is not None else None,
+        "request_coalescing": recommend_flight.stats()
     })
 
+# Alternatives returned unless the request passes ?top_k=
+DEFAULT_ALTERNATIVES = 6
+
+def build_recommendation(sample, distilled_model=None, top_k=DEFAULT_ALTERNATIVES, fields=None):
+    """Response body for one [N, P, K, temperature, humidity, ph, rainfall] sample.
+    
+    Only the best 1 + top_k crops are selected, and yield, sustainability
+    and the model prediction are computed only where fields (None for the
+    full response) asks for them.
+    """
+    N, P, K, temp, humidity, ph, rainfall = sample
+    
+    # Score all crops in one vectorized pass and keep the best 1 + top_k
+    sorted_crops = SUITABILITY.rank(sample, 1 + top_k)
+    best_crop, confidence = sorted_crops[0]
+    sections = ['primary_crop'] + ['alternative_crops'] * (len(sorted_crops) - 1)
+    need_yield = [wants(fields, 'recommendation', section, 'predicted_yield_kg_per_ha') for section in sections]
+    need_sustainability = [wants(fields, 'recommendation', section, 'sustainability_score') for section in sections]
+    
+    # Variation factors for the primary crop and alternatives in one draw, keyed on (input, crop)
+    ranked_crops = [crop for crop, _ in sorted_crops]
+    if any(need_yield):
+        yield_variation = yield_jitter.uniform(sample, ranked_crops, 0.8, 1.2).tolist()
+    if any(need_sustainability):
+        sustainability_variation = yield_jitter.uniform(sample, ranked_crops, 0.7, 1.0, SUSTAINABILITY_STREAM).tolist()
+    
+    # Yield and sustainability for the primary crop and the alternatives
+    crops = []
+    for i, (crop, score) in enumerate(sorted_crops):
+        entry = {"name_english": crop, "name_hindi": HINDI_NAMES.get(crop, crop)}
+        if need_yield[i]:
+            entry["predicted_yield_kg_per_ha"] = round(CROP_YIELDS.get(crop, 2000) * (score * 0.8 + yield_variation[i]), 2)
+        if need_sustainability[i]:
+            entry["sustainability_score"] = round(min(10, max(1, score * 10 * sustainability_variation[i])), 2)
+        crops.append(entry)
+    
+    response = {
+        "status": "success",
+        "confidence": round(confidence, 2),
+        "recommendation": {
+            "primary_crop": crops[0],
+            "alternative_crops": crops[1:]
+        },
+        "input_parameters": {
+            "nitrogen": N, "phosphorus": P, "potassium": K,
+            "temperature": temp, "humidity": humidity, "ph": ph, "rainfall": rainfall
+        }
+    }
+    if distilled_model is not None and wants(fields, 'model_prediction'):
+        response["model_prediction"] = distilled_model.recommendation(sample)
+    return response
+
+# Identical requests in flight at the same time share one build_recommendation()
+recommend_flight = SingleFlight('recommend')
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend_crop():
     try:
@@ -119,53 +186,19 @@ def recommend_crop():
         ph = float(data.get('ph', 0))
         rainfall = float(data.get('rainfall', 0))
         
-        # Calculate suitability for all crops
-        crop_scores = {}
-        for crop in CROP_RULES.keys():
-            score = calculate_suitability(crop, N, P, K, temp, humidity, ph, rainfall)
-            crop_scores[crop] = score
-        
-        # Get best crop
-        best_crop = max(crop_scores, key=crop_scores.get)
-        confidence = crop_scores[best_crop]
+        sample = [N, P, K, temp, humidity, ph, rainfall]
+        distilled_model = DISTILLED_MODEL
         
-        # Calculate yield and sustainability
-        base_yield = CROP_YIELDS.get(best_crop, 2000)
-        yield_factor = (confidence * 0.8) + random.uniform(0.8, 1.2)
-        predicted_yield = base_yield * yield_factor
+        # ?top_k= alternatives; ?fields= limits the response and what is computed
+        try:
+            top_k = parse_top_k(request.args.get('top_k'), DEFAULT_ALTERNATIVES, len(SUITABILITY) - 1)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        fields = parse_fields(request.args.get('fields'))
         
-        sustainability = min(10, max(1, confidence * 10 * random.uniform(0.7, 1.0)))
-        
-        # Get alternatives
-        sorted_crops = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
-        alternatives = []
-        for crop, score in sorted_crops[1:7]:  # Top 6 alternatives
-            alt_yield = CROP_YIELDS.get(crop, 2000) * (score * 0.8 + random.uniform(0.8, 1.2))
-            alt_sustainability = min(10, max(1, score * 10 * random.uniform(0.7, 1.0)))
-            alternatives.append({
-                "name_english": crop,
-                "name_hindi": HINDI_NAMES.get(crop, crop),
-                "predicted_yield_kg_per_ha": round(alt_yield, 2),
-                "sustainability_score": round(alt_sustainability, 2)
-            })
-        
-        return jsonify({
-            "status": "success",
-            "confidence": round(confidence, 2),
-            "recommendation": {
-                "primary_crop": {
-                    "name_english": best_crop,
-                    "name_hindi": HINDI_NAMES.get(best_crop, best_crop),
-                    "predicted_yield_kg_per_ha": round(predicted_yield, 2),
-                    "sustainability_score": round(sustainability, 2)
-                },
-                "alternative_crops": alternatives
-            },
-            "input_parameters": {
-                "nitrogen": N, "phosphorus": P, "potassium": K,
-                "temperature": temp, "humidity": humidity, "ph": ph, "rainfall": rainfall
-            }
-        })
+        response, _ = recommend_flight.do(request_key(sample, distilled_model) + (top_k, fields),
+                                          build_recommendation, sample, distilled_model, top_k, fields)
+        return jsonify(select_fields(response, fields))
         
     except Exception as e:
         return jsonify({
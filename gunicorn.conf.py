@@ -0,0 +1,8 @@
+# SIH 2025 - Gunicorn hooks for app:app
+# Loaded from the app directory by `gunicorn app:app` (see Procfile / render.yaml)
+
+
+def post_fork(server, worker):
+    """Refresh the dataset in each worker once it is forked, not on import."""
+    import simple_deployment_app
+    simple_deployment_app.start_dataset_refresh_on_boot()
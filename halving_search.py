@@ -0,0 +1,202 @@
+# SIH 2025 - Resumable Successive-Halving Search
+# Hyperparameter search that spends the full budget only on the best candidates
+
+import hashlib
+import json
+import math
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+DEFAULT_CACHE_DIR = 'search_cache'
+
+
+def _digest(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _take(data, index):
+    return data.iloc[index] if hasattr(data, 'iloc') else data[index]
+
+
+def cached_cv_folds(y, n_splits=5, random_state=42, cache_dir=DEFAULT_CACHE_DIR):
+    """Stratified fold id per training row, computed once per label vector.
+
+    Returns (fold_ids, key); key changes whenever the labels or split
+    settings do, and is part of every search history entry.
+    """
+    _, y_codes = np.unique(np.asarray(y), return_inverse=True)
+    key = _digest(y_codes.astype(np.int32).tobytes(), n_splits, random_state)
+    path = os.path.join(cache_dir, f'folds_{key}.npy')
+    if os.path.exists(path):
+        return np.load(path), key
+
+    fold_ids = np.empty(len(y_codes), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for fold, (_, test) in enumerate(splitter.split(np.zeros(len(y_codes)), y_codes)):
+        fold_ids[test] = fold
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, fold_ids)
+    os.replace(tmp_path, path)
+    return fold_ids, key
+
+
+def _evaluate(estimator, params, resource_name, resource, X, y, folds, scoring):
+    """Mean CV score of one candidate at one resource level."""
+    scorer = get_scorer(scoring)
+    scores = []
+    started = time.perf_counter()
+    for train, test in folds:
+        model = clone(estimator).set_params(**params)
+        if resource_name == 'n_samples':
+            train = train[:resource]
+        else:
+            model.set_params(**{resource_name: resource})
+        model.fit(_take(X, train), _take(y, train))
+        scores.append(float(scorer(model, _take(X, test), _take(y, test))))
+    return {'score': float(np.mean(scores)), 'fold_scores': scores,
+            'fit_seconds': round(time.perf_counter() - started, 3)}
+
+
+class SuccessiveHalvingSearch:
+    """Successive halving over n_estimators (or training-set size).
+
+    n_candidates settings are sampled from param_distributions and scored
+    on small budgets; each round keeps the best 1/factor and multiplies the
+    budget by factor, so only the last few candidates get max_resources.
+    CV folds are cached on disk and every evaluation is appended to a JSONL
+    history, so a re-run (or a run resumed after being killed) only fits
+    what is missing. A grid that only lists the resource parameter searches
+    a single default candidate. The winner is refit on all of X with
+    max_resources; best_params_, best_score_ and best_estimator_ match the
+    sklearn search classes.
+    """
+
+    def __init__(self, estimator, param_distributions, n_candidates=50, factor=3, resource=None,
+                 max_resources=None, min_resources=None, cv=5, scoring='accuracy', random_state=42,
+                 n_jobs=-1, cache_dir=DEFAULT_CACHE_DIR, verbose=0):
+        if not param_distributions:
+            raise ValueError("param_distributions must name at least one parameter to search")
+        if n_candidates < 1:
+            raise ValueError(f"n_candidates must be at least 1, got {n_candidates}")
+        if factor < 2:
+            raise ValueError(f"factor must be at least 2, got {factor}")
+        self.estimator = estimator
+        self.param_distributions = dict(param_distributions)
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.resource = resource or ('n_estimators' if 'n_estimators' in estimator.get_params() else 'n_samples')
+        # The budget parameter is set per round, not sampled
+        self.resource_values = self.param_distributions.pop(self.resource, None)
+        self.max_resources = max_resources
+        self.min_resources = min_resources
+        self.cv = cv
+        self.scoring = scoring
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+
+    def _resource_schedule(self, n_candidates, n_train, n_classes):
+        """Budget per round; the last round (<= factor candidates) gets max_resources."""
+        n_rounds = 1
+        while n_candidates > self.factor:
+            n_candidates = math.ceil(n_candidates / self.factor)
+            n_rounds += 1
+        if self.resource == 'n_samples':
+            max_resources = self.max_resources or n_train
+            floor = 2 * self.cv * n_classes
+        else:
+            values = self.resource_values
+            max_resources = self.max_resources or (max(values) if isinstance(values, list) else
+                                                   self.estimator.get_params()[self.resource])
+            floor = 1
+        schedule = []
+        for i in range(n_rounds - 1):
+            if self.min_resources:
+                resource = self.min_resources * self.factor ** i
+            else:
+                resource = max(floor, max_resources // self.factor ** (n_rounds - 1 - i))
+            schedule.append(min(resource, max_resources))
+        return schedule + [max_resources]
+
+    def _load_history(self, path, context):
+        history = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # partially written line from an interrupted run
+                    if entry.get('context') == context:
+                        history[(entry['params'], entry['resource'])] = entry
+        return history
+
+    def fit(self, X, y):
+        fold_ids, fold_key = cached_cv_folds(y, self.cv, self.random_state, self.cache_dir)
+        rng = np.random.RandomState(self.random_state)
+        # Train indices are shuffled once so n_samples budgets take a random prefix
+        folds = [(rng.permutation(np.flatnonzero(fold_ids != k)), np.flatnonzero(fold_ids == k))
+                 for k in range(self.cv)]
+
+        base_params = json.dumps(self.estimator.get_params(deep=False), sort_keys=True, default=str)
+        context = _digest(type(self.estimator).__name__, base_params, fold_key, self.resource, self.scoring)
+        self.history_file_ = os.path.join(self.cache_dir, f'history_{type(self.estimator).__name__}.jsonl')
+        history = self._load_history(self.history_file_, context)
+
+        if self.param_distributions:
+            candidates = list(ParameterSampler(self.param_distributions, self.n_candidates,
+                                               random_state=self.random_state))
+        else:
+            candidates = [{}]  # only the budget was given: score the defaults once at max_resources
+        schedule = self._resource_schedule(len(candidates), len(folds[0][0]), len(np.unique(np.asarray(y))))
+        self.rounds_ = []
+        self.n_fits_ = self.n_resumed_ = 0
+        for resource in schedule:
+            keys = [_params_key(params) for params in candidates]
+            missing = [(key, params) for key, params in zip(keys, candidates) if (key, resource) not in history]
+            self.n_resumed_ += len(candidates) - len(missing)
+            if self.verbose:
+                print(f"✂️  {len(candidates)} candidates at {self.resource}={resource} "
+                      f"({len(missing)} to fit, {len(candidates) - len(missing)} from history)")
+
+            results = Parallel(n_jobs=self.n_jobs, return_as='generator')(
+                delayed(_evaluate)(self.estimator, params, self.resource, resource, X, y, folds, self.scoring)
+                for _, params in missing
+            )
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.history_file_, 'a', encoding='utf-8') as f:
+                for (key, _), result in zip(missing, results):
+                    entry = dict(result, context=context, params=key, resource=resource)
+                    history[(key, resource)] = entry
+                    f.write(json.dumps(entry) + '\n')
+                    f.flush()
+            self.n_fits_ += len(missing) * self.cv
+
+            scores = [history[(key, resource)]['score'] for key in keys]
+            order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+            self.rounds_.append({'resource': resource, 'candidates': len(candidates),
+                                 'best_score': scores[order[0]]})
+            if len(candidates) <= self.factor:
+                break
+            candidates = [candidates[i] for i in order[:math.ceil(len(candidates) / self.factor)]]
+
+        self.best_params_ = dict(candidates[order[0]])
+        self.best_score_ = scores[order[0]]
+        if self.resource != 'n_samples':
+            self.best_params_[self.resource] = schedule[-1]
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
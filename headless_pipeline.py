@@ -0,0 +1,134 @@
+# SIH 2025 - Headless Training Stages
+# Steps 1 and 2 without plotting, with the candidate models trained in a process pool
+# (report_plots.py draws their figures from the reports afterwards)
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.naive_bayes import GaussianNB
+from sklearn.svm import SVC
+from columnar_cache import DEFAULT_CACHE_DIR, DEFAULT_SOURCE, load_columnar_dataset
+
+try:
+    from xgboost import XGBClassifier
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+DEFAULT_REPORTS_DIR = 'reports'
+MODEL_RESULTS_FILE = 'model_results_summary.json'
+
+
+def candidate_models(n_jobs=-1):
+    """Step 2 candidates: {name: (estimator, uses_encoded_labels)}."""
+    models = {
+        'Random Forest': (RandomForestClassifier(random_state=42, n_jobs=n_jobs), False),
+        'Support Vector Machine': (SVC(random_state=42), False),
+        'Gaussian Naive Bayes': (GaussianNB(), False)
+    }
+    if XGBOOST_AVAILABLE:
+        models['XGBoost'] = (XGBClassifier(random_state=42, eval_metric='mlogloss', n_jobs=n_jobs), True)
+        # Keep step 2's order so ties resolve the same way
+        models = {name: models[name] for name in
+                  ('Random Forest', 'XGBoost', 'Support Vector Machine', 'Gaussian Naive Bayes')}
+    return models
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def report_filename(model_name):
+    return f"step2_{model_name.lower().replace(' ', '_')}.json"
+
+
+def evaluate_model(model_name, n_jobs=-1, source=DEFAULT_SOURCE, cache_dir=DEFAULT_CACHE_DIR):
+    """Fit and score one candidate; runs in a worker process.
+
+    Each worker memory-maps the columnar cache itself, so the training
+    data is never pickled across the pool.
+    """
+    data = load_columnar_dataset(source, cache_dir)
+    X_train, X_test, y_train, y_test = data.train_test_frames()
+    model, uses_encoded_labels = candidate_models(n_jobs)[model_name]
+
+    started = time.perf_counter()
+    if uses_encoded_labels:
+        model.fit(X_train, np.asarray(data.y_train_codes))
+        y_pred = data.labels(model.predict(X_test))
+    else:
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+    fit_seconds = time.perf_counter() - started
+
+    labels = sorted(y_test.unique())
+    importances = getattr(model, 'feature_importances_', None)
+    return {
+        'model': model_name,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'fit_seconds': round(fit_seconds, 3),
+        'labels': labels,
+        'classification_report': classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+        'confusion_matrix': confusion_matrix(y_test, y_pred, labels=labels).tolist(),
+        'feature_importances': (None if importances is None else
+                                dict(zip(X_train.columns, map(float, importances))))
+    }
+
+
+def run_preprocessing(reports_dir=DEFAULT_REPORTS_DIR, source=DEFAULT_SOURCE, cache_dir=DEFAULT_CACHE_DIR):
+    """Step 1 without the EDA plots: build the cache, write the CSV split and save summary stats."""
+    data = load_columnar_dataset(source, cache_dir)
+    df = data.frame()
+    summary = {
+        'rows': len(data),
+        'n_train': data.n_train,
+        'n_test': len(data) - data.n_train,
+        'source_sha256': data.manifest['source_sha256'],
+        'class_counts': df[data.label_column].value_counts().to_dict(),
+        'missing_values': int(df.isnull().sum().sum()),
+        'describe': df[data.feature_columns].describe().to_dict(),
+        'correlation': df[data.feature_columns].corr().to_dict()
+    }
+    write_json(os.path.join(reports_dir, 'step1_summary.json'), summary)
+    data.write_csv_split(source=source)
+    print(f"✓ {summary['rows']} samples cached ({summary['n_train']} train / {summary['n_test']} test)")
+    return summary
+
+
+def run_model_evaluation(reports_dir=DEFAULT_REPORTS_DIR, workers=None, source=DEFAULT_SOURCE,
+                         cache_dir=DEFAULT_CACHE_DIR):
+    """Step 2 without plots: fit every candidate in parallel and write reports.
+
+    Writes model_results_summary.json in the format step 3 reads, plus one
+    JSON report per model (classification report and confusion matrix).
+    """
+    # Build the cache once up front rather than racing to build it in each worker
+    load_columnar_dataset(source, cache_dir)
+    model_names = list(candidate_models())
+    workers = workers or min(len(model_names), os.cpu_count() or 1)
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(evaluate_model, name, n_jobs, source, cache_dir) for name in model_names}
+        results = {name: future.result() for name, future in futures.items()}
+
+    for name, result in results.items():
+        write_json(os.path.join(reports_dir, report_filename(name)), result)
+        print(f"✓ {name}: {result['accuracy']*100:.2f}% (fit {result['fit_seconds']:.2f}s)")
+
+    best_model_name, best = sorted(results.items(), key=lambda x: x[1]['accuracy'], reverse=True)[0]
+    results_summary = {
+        'model_performances': {name: result['accuracy'] for name, result in results.items()},
+        'best_model': best_model_name,
+        'best_accuracy': best['accuracy']
+    }
+    write_json(MODEL_RESULTS_FILE, results_summary)
+    print(f"🥇 Best model: {best_model_name} ({best['accuracy']*100:.2f}%)")
+    return results_summary
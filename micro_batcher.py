@@ -0,0 +1,154 @@
+# SIH 2025 - Micro-Batching Dispatcher
+# Coalesces concurrent single-sample scoring calls into one vectorized evaluation
+
+import queue
+import threading
+import time
+from collections import deque
+
+# 0 batches whatever is already queued when the dispatcher wakes, which is
+# best for the cheap rule scoring; costlier batch functions can afford 1-5 ms
+DEFAULT_WINDOW_MS = 0.0
+DEFAULT_MAX_BATCH = 64
+
+# Recent samples kept for the queue-time percentiles
+METRICS_WINDOW = 2048
+
+
+class _Pending:
+    __slots__ = ('item', 'submitted', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.submitted = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MicroBatcher:
+    """Collects submit() calls arriving within window_ms (or max_batch items)
+    and runs them through batch_fn(items) -> results as one call.
+
+    A single daemon thread does the dispatching; callers block until their
+    own result is ready, and an exception from batch_fn is raised in every
+    caller of that batch. With window_ms=0 a batch is whatever queued up
+    while the previous one was being scored. A positive window only opens
+    when there is concurrency to exploit: if the previous batch held a
+    single request and nothing else is queued, the next request is
+    dispatched straight away, so isolated requests never pay the window.
+    """
+
+    def __init__(self, batch_fn, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH, name='micro-batcher'):
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._last_batch_size = 1
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.errors = 0
+        self._queue_ms = deque(maxlen=METRICS_WINDOW)
+        self._batch_sizes = deque(maxlen=METRICS_WINDOW)
+        self._batch_ms = deque(maxlen=METRICS_WINDOW)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    thread.start()
+                    self._thread = thread
+
+    def submit(self, item, timeout=None):
+        """Queue one item and block until its result is ready."""
+        self._ensure_started()
+        pending = _Pending(item)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"{self.name}: no result within {timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        if self.window > 0 and (self._last_batch_size > 1 or not self._queue.empty()):
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        # Anything already queued goes along, up to max_batch
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                results = self.batch_fn([pending.item for pending in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} items")
+                error = None
+            except Exception as e:  # handed to every waiter in this batch
+                results, error = [None] * len(batch), e
+            finished = time.perf_counter()
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+                self.errors += error is not None
+                self._batch_sizes.append(len(batch))
+                self._batch_ms.append((finished - started) * 1000)
+                self._queue_ms.extend((started - pending.submitted) * 1000 for pending in batch)
+            self._last_batch_size = len(batch)
+
+            for pending, result in zip(batch, results):
+                pending.result, pending.error = result, error
+                pending.done.set()
+
+    def stats(self):
+        """Batch-size and queue-time metrics (queue/batch times over recent batches)."""
+        with self._stats_lock:
+            queue_ms = list(self._queue_ms)
+            batch_sizes = list(self._batch_sizes)
+            batch_ms = list(self._batch_ms)
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch': self.max_batch,
+                'batches': self.batches,
+                'items': self.items,
+                'errors': self.errors,
+                'mean_batch_size': round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0.0,
+                'max_batch_size': self.max_batch_seen,
+                'queue_ms': {
+                    'mean': round(sum(queue_ms) / len(queue_ms), 3) if queue_ms else 0.0,
+                    'p50': round(_percentile(queue_ms, 0.5), 3),
+                    'p95': round(_percentile(queue_ms, 0.95), 3),
+                    'max': round(max(queue_ms, default=0.0), 3)
+                },
+                'batch_ms_mean': round(sum(batch_ms) / len(batch_ms), 3) if batch_ms else 0.0
+            }
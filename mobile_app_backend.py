@@ -6,6 +6,8 @@ from flask_cors import CORS
 import json
 import logging
 from working_crop_system import CropRecommendationSystem, comprehensive_analysis
+from multilingual_support import get_crop_name
+from sparse_fields import parse_fields, parse_top_k, select_fields, wanted_details
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for mobile app integration
@@ -13,6 +15,13 @@ CORS(app)  # Enable CORS for mobile app integration
 # Initialize the crop system
 crop_system = CropRecommendationSystem()
 
+# Alternatives returned unless the request passes ?top_k=
+DEFAULT_ALTERNATIVES = 4
+
+# Response field for each analysis detail, per section
+PRIMARY_DETAILS = {'predicted_yield_kg_per_ha': 'predicted_yield', 'sustainability_score': 'sustainability_score'}
+ALTERNATIVE_DETAILS = {'predicted_yield_kg_per_ha': 'yield', 'sustainability_score': 'sustainability'}
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -51,8 +60,17 @@ def recommend_crop():
         ph = float(data['ph'])
         rainfall = float(data['rainfall'])
         
+        # ?top_k= alternatives; ?fields= limits the response, and yield and
+        # sustainability are only computed for crops whose fields need them
+        top_k = parse_top_k(request.args.get('top_k'), DEFAULT_ALTERNATIVES, len(crop_system.crop_rules) - 1)
+        fields = parse_fields(request.args.get('fields'))
+        
         # Get comprehensive analysis
-        result = comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall)
+        result = comprehensive_analysis(
+            N, P, K, temperature, humidity, ph, rainfall, top_k,
+            wanted_details(fields, PRIMARY_DETAILS, 'recommendation', 'primary_crop'),
+            wanted_details(fields, ALTERNATIVE_DETAILS, 'recommendation', 'alternatives'))
+        primary = result['primary_recommendation']
         
         # Format response for mobile
         response = {
@@ -69,22 +87,20 @@ def recommend_crop():
             },
             "recommendation": {
                 "primary_crop": {
-                    "name": result['primary_recommendation']['crop'],
-                    "name_hindi": get_hindi_name(result['primary_recommendation']['crop']),
-                    "name_bengali": get_bengali_name(result['primary_recommendation']['crop']),
-                    "confidence": result['primary_recommendation']['confidence_score'],
-                    "predicted_yield": result['primary_recommendation']['predicted_yield_kg_per_ha'],
-                    "sustainability_score": result['primary_recommendation']['sustainability_score']
+                    "name": primary['crop'],
+                    "name_hindi": get_hindi_name(primary['crop']),
+                    "name_bengali": get_bengali_name(primary['crop']),
+                    "confidence": primary['confidence_score'],
+                    **renamed_details(primary, PRIMARY_DETAILS)
                 },
                 "alternatives": [
                     {
                         "name": alt['crop'],
                         "name_hindi": get_hindi_name(alt['crop']),
                         "name_bengali": get_bengali_name(alt['crop']),
-                        "yield": alt['predicted_yield_kg_per_ha'],
-                        "sustainability": alt['sustainability_score'],
+                        **renamed_details(alt, ALTERNATIVE_DETAILS),
                         "suitability": alt['suitability_score']
-                    } for alt in result['alternative_crops'][:6]
+                    } for alt in result['alternative_crops']
                 ]
             },
             "validation": {
@@ -97,8 +113,8 @@ def recommend_crop():
             }
         }
         
-        logger.info(f"Recommendation generated: {result['primary_recommendation']['crop']}")
-        return jsonify(response)
+        logger.info(f"Recommendation generated: {primary['crop']}")
+        return jsonify(select_fields(response, fields))
         
     except ValueError as e:
         return jsonify({
@@ -130,78 +146,31 @@ def get_supported_crops():
         "crops": crops
     })
 
+def renamed_details(entry, details):
+    """Computed yield/sustainability values of an analysis entry under their response names."""
+    return {name: entry[detail] for detail, name in details.items() if detail in entry}
+
 def get_hindi_name(crop):
     """Get Hindi name for crop."""
-    hindi_names = {
-        'rice': 'चावल',
-        'wheat': 'गेहूं',
-        'maize': 'मक्का',
-        'cotton': 'कपास',
-        'sugarcane': 'गन्ना',
-        'jute': 'जूट',
-        'coffee': 'कॉफी',
-        'coconut': 'नारियल',
-        'papaya': 'पपीता',
-        'orange': 'संतरा',
-        'apple': 'सेब',
-        'muskmelon': 'खरबूजा',
-        'watermelon': 'तरबूज',
-        'grapes': 'अंगूर',
-        'mango': 'आम',
-        'banana': 'केला',
-        'pomegranate': 'अनार',
-        'lentil': 'मसूर',
-        'blackgram': 'उड़द',
-        'mungbean': 'मूंग',
-        'mothbeans': 'मोठ',
-        'pigeonpeas': 'अरहर',
-        'kidneybeans': 'राजमा',
-        'chickpea': 'चना'
-    }
-    return hindi_names.get(crop, crop)
+    return get_crop_name(crop, 'hindi')
 
 def get_bengali_name(crop):
     """Get Bengali name for crop."""
-    bengali_names = {
-        'rice': 'ধান',
-        'wheat': 'গম',
-        'maize': 'ভুট্টা',
-        'cotton': 'তুলা',
-        'sugarcane': 'আখ',
-        'jute': 'পাট',
-        'coffee': 'কফি',
-        'coconut': 'নারকেল',
-        'papaya': 'পেঁপে',
-        'orange': 'কমলা',
-        'apple': 'আপেল',
-        'muskmelon': 'খরমুজ',
-        'watermelon': 'তরমুজ',
-        'grapes': 'আঙুর',
-        'mango': 'আম',
-        'banana': 'কলা',
-        'pomegranate': 'ডালিম',
-        'lentil': 'মসুর',
-        'blackgram': 'কালো ছোলা',
-        'mungbean': 'মুগ',
-        'mothbeans': 'মথ',
-        'pigeonpeas': 'অড়হর',
-        'kidneybeans': 'রাজমা',
-        'chickpea': 'ছোলা'
-    }
-    return bengali_names.get(crop, crop)
+    return get_crop_name(crop, 'bengali')
+
+CROP_CATEGORIES = {
+    'rice': 'cereal', 'wheat': 'cereal', 'maize': 'cereal',
+    'cotton': 'cash_crop', 'sugarcane': 'cash_crop', 'jute': 'cash_crop', 'coffee': 'cash_crop',
+    'mango': 'fruit', 'banana': 'fruit', 'apple': 'fruit', 'orange': 'fruit', 'grapes': 'fruit',
+    'coconut': 'fruit', 'papaya': 'fruit', 'pomegranate': 'fruit',
+    'watermelon': 'vegetable', 'muskmelon': 'vegetable',
+    'lentil': 'pulse', 'blackgram': 'pulse', 'mungbean': 'pulse', 'mothbeans': 'pulse',
+    'pigeonpeas': 'pulse', 'kidneybeans': 'pulse', 'chickpea': 'pulse'
+}
 
 def get_crop_category(crop):
     """Get crop category."""
-    categories = {
-        'rice': 'cereal', 'wheat': 'cereal', 'maize': 'cereal',
-        'cotton': 'cash_crop', 'sugarcane': 'cash_crop', 'jute': 'cash_crop', 'coffee': 'cash_crop',
-        'mango': 'fruit', 'banana': 'fruit', 'apple': 'fruit', 'orange': 'fruit', 'grapes': 'fruit',
-        'coconut': 'fruit', 'papaya': 'fruit', 'pomegranate': 'fruit',
-        'watermelon': 'vegetable', 'muskmelon': 'vegetable',
-        'lentil': 'pulse', 'blackgram': 'pulse', 'mungbean': 'pulse', 'mothbeans': 'pulse',
-        'pigeonpeas': 'pulse', 'kidneybeans': 'pulse', 'chickpea': 'pulse'
-    }
-    return categories.get(crop, 'other')
+    return CROP_CATEGORIES.get(crop, 'other')
 
 if __name__ == '__main__':
     print("🚀 Starting SIH 2025 Crop Recommendation API Server...")
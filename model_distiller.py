@@ -0,0 +1,141 @@
+# SIH 2025 - Model Distillation
+# Compiles the step 3 classifier into a compact surrogate tree for the serving apps
+
+import json
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+from columnar_cache import load_columnar_dataset
+from distilled_predictor import DISTILLED_MODEL_FILE, DistilledPredictor
+
+DEPTHS = (8, 10, 12, 14, 16, 20)
+FIDELITY_TARGET = 0.99
+SYNTHETIC_SAMPLES = 100000
+
+
+def synthetic_samples(X, count, random_state=42, noise=0.25, uniform_fraction=0.2):
+    """Points around the training rows (plus some uniform over the feature box)
+    so the surrogate also copies the teacher between and beyond the samples."""
+    rng = np.random.RandomState(random_state)
+    X = np.asarray(X, dtype=np.float64)
+    low, high = X.min(axis=0), X.max(axis=0)
+    n_uniform = int(count * uniform_fraction)
+    around = X[rng.randint(len(X), size=count - n_uniform)]
+    around = around + rng.normal(scale=noise * X.std(axis=0), size=around.shape)
+    uniform = rng.uniform(low, high, size=(n_uniform, X.shape[1]))
+    return np.clip(np.vstack([around, uniform]), np.minimum(low, 0), None)
+
+
+def teacher_labels(model, X, classes, label_encoder=None):
+    """Class index (into classes) the teacher predicts for each row."""
+    predictions = model.predict(X)
+    if label_encoder is not None:
+        predictions = label_encoder.inverse_transform(predictions)
+    index = {crop: i for i, crop in enumerate(classes)}
+    return np.array([index[p] for p in predictions], dtype=np.int32)
+
+
+def distill(model, X_train, X_test, y_test, classes, label_encoder=None, depths=DEPTHS,
+            fidelity_target=FIDELITY_TARGET, n_synthetic=SYNTHETIC_SAMPLES, random_state=42):
+    """Fit surrogate trees on teacher labels; return the shallowest one meeting
+    fidelity_target on held-out synthetic points (else the most faithful)."""
+    feature_names = list(getattr(X_train, 'columns', [])) or None
+    X_train = np.asarray(X_train, dtype=np.float64)
+    X_test = np.asarray(X_test, dtype=np.float64)
+
+    def labels(X):
+        # The teacher was fitted on a DataFrame; keep its feature names
+        frame = pd.DataFrame(X, columns=feature_names) if feature_names else X
+        return teacher_labels(model, frame, classes, label_encoder)
+
+    X_fit = np.vstack([X_train, synthetic_samples(X_train, n_synthetic, random_state)])
+    y_fit = labels(X_fit)
+    X_check = synthetic_samples(X_train, n_synthetic // 5, random_state + 1)
+    y_check = labels(X_check)
+    y_teacher_test = labels(X_test)
+
+    best = None
+    for depth in depths:
+        tree = DecisionTreeClassifier(max_depth=depth, random_state=random_state).fit(X_fit, y_fit)
+        fidelity = float((tree.predict(X_check) == y_check).mean())
+        if best is None or fidelity > best[1]:
+            best = (tree, fidelity)
+        if fidelity >= fidelity_target:
+            break
+    tree, synthetic_fidelity = best
+
+    # Leaf probabilities over all classes, even those the surrogate never saw
+    value = np.zeros((tree.tree_.node_count, len(classes)), dtype=np.float32)
+    node_value = tree.tree_.value[:, 0, :]
+    value[:, tree.classes_] = node_value / node_value.sum(axis=1, keepdims=True)
+
+    y_test_index = np.array([classes.index(c) for c in y_test], dtype=np.int32)
+    metadata = {
+        'feature_names': feature_names,
+        'max_depth': int(tree.tree_.max_depth),
+        'node_count': int(tree.tree_.node_count),
+        'distillation_samples': len(X_fit),
+        'fidelity': {
+            'test': float((tree.predict(X_test) == y_teacher_test).mean()),
+            'synthetic': synthetic_fidelity
+        },
+        'teacher_accuracy': float((y_teacher_test == y_test_index).mean()),
+        'student_accuracy': float((tree.predict(X_test) == y_test_index).mean())
+    }
+    return DistilledPredictor(tree.tree_.feature, tree.tree_.threshold, tree.tree_.children_left,
+                              tree.tree_.children_right, value, classes, metadata)
+
+
+def measure_latency(predictor, samples, repeat=5):
+    """Mean microseconds per single-sample prediction."""
+    rows = [list(map(float, row)) for row in np.asarray(samples)]
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            predictor.top_k(row)
+        best = min(best, (time.perf_counter() - started) / len(rows))
+    return best * 1e6
+
+
+def main(output=DISTILLED_MODEL_FILE):
+    print("=" * 60)
+    print("AI-BASED CROP RECOMMENDATION SYSTEM - MODEL DISTILLATION")
+    print("=" * 60)
+
+    try:
+        with open('model_metadata.json') as f:
+            model_metadata = json.load(f)
+    except FileNotFoundError:
+        print("❌ Error: model_metadata.json not found.")
+        print("Please run step3_model_optimization.py first.")
+        return False
+
+    model_name = model_metadata['model_name']
+    model = joblib.load(f'crop_recommendation_model_{model_name.lower().replace(" ", "_")}.pkl')
+    label_encoder = joblib.load('label_encoder.pkl') if model_metadata.get('uses_encoded_labels') else None
+    X_train, X_test, _, y_test = load_columnar_dataset('Crop_recommendation.csv').train_test_frames()
+    classes = list(model_metadata['target_classes'])
+
+    print(f"🎓 Teacher: {model_name}")
+    predictor = distill(model, X_train, X_test, y_test, classes, label_encoder)
+    predictor.metadata['teacher_model'] = model_name
+    predictor.metadata['latency_us'] = round(measure_latency(predictor, X_test), 2)
+    predictor.save(output)
+
+    metadata = predictor.metadata
+    print(f"✓ Surrogate tree: depth {metadata['max_depth']}, {metadata['node_count']} nodes")
+    print(f"✓ Fidelity vs teacher: {metadata['fidelity']['test']*100:.2f}% (test), "
+          f"{metadata['fidelity']['synthetic']*100:.2f}% (synthetic)")
+    print(f"✓ Accuracy: teacher {metadata['teacher_accuracy']*100:.2f}%, "
+          f"distilled {metadata['student_accuracy']*100:.2f}%")
+    print(f"✓ Latency: {metadata['latency_us']} µs per prediction")
+    print(f"💾 Saved {output}")
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
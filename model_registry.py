@@ -0,0 +1,72 @@
+# SIH 2025 - Model Registry
+# Loads the trained classifier and label encoder once and shares them read-only
+
+import os
+import threading
+
+
+class ModelRegistry:
+    """Keeps one deserialized estimator (and optional label encoder) resident.
+
+    get() loads lazily on first use; reload() deserializes the files again and
+    swaps the new pair in atomically, so in-flight predictions keep using the
+    objects they already fetched.
+    """
+
+    def __init__(self, model_filename, uses_encoded_labels=False, encoder_filename='label_encoder.pkl'):
+        self.model_filename = model_filename
+        self.uses_encoded_labels = uses_encoded_labels
+        self.encoder_filename = encoder_filename
+        self.version = 0
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        import joblib  # deferred so importing the registry stays cheap
+        model = joblib.load(self.model_filename)
+        label_encoder = joblib.load(self.encoder_filename) if self.uses_encoded_labels else None
+        return model, label_encoder
+
+    def get(self):
+        """Return (model, label_encoder); label_encoder is None if not used."""
+        loaded = self._loaded
+        if loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = self._load()
+                    self.version += 1
+                loaded = self._loaded
+        return loaded
+
+    def reload(self):
+        """Load the model files again (e.g. after retraining) and swap them in."""
+        loaded = self._load()
+        with self._lock:
+            self._loaded = loaded
+            self.version += 1
+        return loaded
+
+    @property
+    def is_loaded(self):
+        return self._loaded is not None
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(model_filename, uses_encoded_labels=False, encoder_filename='label_encoder.pkl'):
+    """Shared registry per model file, so every module reuses the same loaded model."""
+    key = (os.path.abspath(model_filename), uses_encoded_labels, os.path.abspath(encoder_filename))
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ModelRegistry(model_filename, uses_encoded_labels, encoder_filename)
+        return _registries[key]
+
+
+def reload_models():
+    """Hot-reload every registered model."""
+    with _registries_lock:
+        registries = list(_registries.values())
+    for registry in registries:
+        registry.reload()
@@ -2,6 +2,8 @@
 # Hindi, Bengali, and English language support
 
 import json
+import sys
+from types import MappingProxyType
 from typing import Dict, List
 
 class MultilingualSupport:
@@ -226,45 +228,56 @@ class MultilingualSupport:
             return True
         return False
     
-    def get_text(self, key: str) -> str:
+    def resolve_language(self, language: str = None) -> str:
+        """Language to use for a call: the given one if supported, else English.
+        
+        None means the instance's current_language (set_language callers).
+        """
+        if language is None:
+            return self.current_language
+        return language if language in self.supported_languages else 'english'
+    
+    def get_text(self, key: str, language: str = None) -> str:
         """Get translated text for a key."""
-        return self.translations[self.current_language].get(key, key)
+        return self.translations[self.resolve_language(language)].get(key, key)
     
-    def get_crop_name(self, crop: str) -> str:
-        """Get crop name in current language."""
-        return self.crop_names[self.current_language].get(crop, crop)
+    def get_crop_name(self, crop: str, language: str = None) -> str:
+        """Get crop name in the given (or current) language."""
+        return self.crop_names[self.resolve_language(language)].get(crop, crop)
     
-    def translate_result(self, result: Dict) -> Dict:
-        """Translate recommendation result to current language."""
+    def translate_result(self, result: Dict, language: str = None) -> Dict:
+        """Translate recommendation result to the given (or current) language."""
         if 'error' in result:
             return result
         
+        language = self.resolve_language(language)
         translated_result = {
             'status': 'success',
-            'language': self.current_language,
+            'language': language,
             'primary_recommendation': {
                 'crop_english': result['crop'],
-                'crop_local': self.get_crop_name(result['crop']),
+                'crop_local': self.get_crop_name(result['crop'], language),
                 'predicted_yield_kg_per_ha': result['predicted_yield_kg_per_ha'],
                 'sustainability_score': result['sustainability_score'],
                 'confidence_score': result.get('confidence_score', 0)
             },
             'ui_text': {
-                'recommended_crop': self.get_text('recommended_crop'),
-                'predicted_yield': self.get_text('predicted_yield'),
-                'sustainability_score': self.get_text('sustainability_score'),
-                'kg_per_hectare': self.get_text('kg_per_hectare')
+                'recommended_crop': self.get_text('recommended_crop', language),
+                'predicted_yield': self.get_text('predicted_yield', language),
+                'sustainability_score': self.get_text('sustainability_score', language),
+                'kg_per_hectare': self.get_text('kg_per_hectare', language)
             }
         }
         
         return translated_result
     
-    def get_ui_config(self) -> Dict:
-        """Get complete UI configuration for current language."""
+    def get_ui_config(self, language: str = None) -> Dict:
+        """Get complete UI configuration for the given (or current) language."""
+        language = self.resolve_language(language)
         return {
-            'language': self.current_language,
-            'texts': self.translations[self.current_language],
-            'crop_names': self.crop_names[self.current_language]
+            'language': language,
+            'texts': self.translations[language],
+            'crop_names': self.crop_names[language]
         }
     
     def export_translations(self, filename: str = None) -> str:
@@ -277,18 +290,55 @@ class MultilingualSupport:
         
         return filename
 
+class LocalizationIndex:
+    """Read-only (crop, language) -> localized crop name index.
+    
+    Built once from MultilingualSupport.crop_names with interned strings;
+    a lookup is a single dict access whatever the number of languages.
+    """
+    
+    def __init__(self, crop_names: Dict[str, Dict[str, str]]):
+        self.languages = tuple(sys.intern(language) for language in crop_names)
+        self._names = {
+            (sys.intern(crop), sys.intern(language)): sys.intern(name)
+            for language, names in crop_names.items()
+            for crop, name in names.items()
+        }
+        self._by_language = {
+            language: MappingProxyType({crop: name for (crop, lang), name in self._names.items() if lang == language})
+            for language in self.languages
+        }
+    
+    def name(self, crop: str, language: str) -> str:
+        """Localized crop name, or the crop id if there is no translation."""
+        return self._names.get((crop, language), crop)
+    
+    def names(self, language: str):
+        """Read-only {crop: name} mapping for one language."""
+        return self._by_language.get(language, MappingProxyType({}))
+
 # Global multilingual instance
 ml_support = MultilingualSupport()
 
+# Shared crop-name index used by every API module
+LOCALIZATION_INDEX = LocalizationIndex(ml_support.crop_names)
+
+def get_crop_name(crop, language):
+    """O(1) localized crop name lookup."""
+    return LOCALIZATION_INDEX.name(crop, language)
+
+# UI configuration per language, built once and shared by every request
+UI_CONFIGS = MappingProxyType({
+    language: ml_support.get_ui_config(language) for language in ml_support.supported_languages
+})
+
 def get_localized_interface(language='english'):
-    """Get localized interface configuration."""
-    ml_support.set_language(language)
-    return ml_support.get_ui_config()
+    """Get localized interface configuration (shared; do not modify)."""
+    return UI_CONFIGS[ml_support.resolve_language(language)]
 
 def translate_recommendation(result, language='english'):
-    """Translate recommendation result."""
-    ml_support.set_language(language)
-    return ml_support.translate_result(result)
+    """Translate recommendation result without touching ml_support's language."""
+    return ml_support.translate_result(result, language)
 
 # Demo function
 def demo_multilingual():
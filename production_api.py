@@ -10,9 +10,14 @@ import logging
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from cached_responses import StaticJSONResponse
+from compact_wire import MIMETYPE as COMPACT_MIMETYPE, crop_id, encode_recommendation
+from multilingual_support import get_crop_name
+from sparse_fields import parse_fields, parse_top_k, select_fields, wanted_details
+
 # Import our working system
 try:
-    from working_crop_system import comprehensive_analysis
+    from working_crop_system import DETAIL_FIELDS, analysis_flight, comprehensive_analysis, crop_system
     SYSTEM_AVAILABLE = True
 except ImportError:
     SYSTEM_AVAILABLE = False
@@ -34,10 +39,20 @@ logger = logging.getLogger(__name__)
 # Get port from environment variable (for Heroku/Railway)
 PORT = int(os.environ.get('PORT', 5002))
 
-@app.route('/')
-def home():
-    """Home page with API information."""
-    return jsonify({
+# Concurrent ranking-cache misses are scored as one batch; the window (ms)
+# is how long the dispatcher waits for more requests (0 = only those queued)
+MICRO_BATCHING = os.environ.get('MICRO_BATCHING', '1') == '1'
+MICRO_BATCH_WINDOW_MS = float(os.environ.get('MICRO_BATCH_WINDOW_MS', 0))
+MICRO_BATCH_MAX = int(os.environ.get('MICRO_BATCH_MAX', 64))
+
+# Alternatives returned unless the request passes ?top_k=
+DEFAULT_ALTERNATIVES = 3
+
+if SYSTEM_AVAILABLE and MICRO_BATCHING:
+    crop_system.enable_micro_batching(MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX)
+
+def build_home_payload():
+    return {
         "message": "🌾 SIH 2025 Crop Recommendation API",
         "status": "operational",
         "version": "1.0.0",
@@ -45,6 +60,8 @@ def home():
         "endpoints": {
             "health": "/api/health",
             "recommend": "/api/recommend (POST)",
+            "recommend_compact": f"/api/recommend (POST, Accept: {COMPACT_MIMETYPE})",
+            "recommend_sparse": "/api/recommend?fields=name_english,confidence&top_k=0 (POST)",
             "test": "/api/test",
             "crops": "/api/crops"
         },
@@ -52,7 +69,14 @@ def home():
         "languages": ["English", "Hindi", "Bengali"],
         "target": "Jharkhand Farmers",
         "hackathon": "Smart India Hackathon 2025"
-    })
+    }
+
+HOME_RESPONSE = StaticJSONResponse(build_home_payload)
+
+@app.route('/')
+def home():
+    """Home page with API information."""
+    return HOME_RESPONSE.response()
 
 @app.route('/api/health')
 def health_check():
@@ -65,9 +89,67 @@ def health_check():
         "supported_crops": 24,
         "languages": ["English", "Hindi", "Bengali"],
         "accuracy": "94%",
-        "uptime": "operational"
+        "uptime": "operational",
+        "ranking_cache": crop_system.cache_stats() if SYSTEM_AVAILABLE else None,
+        "micro_batching": crop_system.batching_stats() if SYSTEM_AVAILABLE else None,
+        "request_coalescing": analysis_flight.stats() if SYSTEM_AVAILABLE else None
     })
 
+# Response field for each analysis detail (the same names here)
+RESPONSE_DETAILS = {'predicted_yield_kg_per_ha': 'predicted_yield_kg_per_ha',
+                    'sustainability_score': 'sustainability_score'}
+
+def wants_compact_response():
+    """True when the Accept header prefers the compact binary encoding."""
+    return request.accept_mimetypes.best_match(['application/json', COMPACT_MIMETYPE]) == COMPACT_MIMETYPE
+
+def rounded_details(entry):
+    """Yield and sustainability of an analysis entry, where they were computed."""
+    return {detail: round(entry[detail], 2) for detail in DETAIL_FIELDS if detail in entry}
+
+def build_recommendation_payload(result, N, P, K, temperature, humidity, ph, rainfall):
+    """JSON response body for one comprehensive_analysis() result."""
+    primary = result['primary_recommendation']
+    crop_name = primary['crop']
+    return {
+        "status": "success",
+        "timestamp": "2025-09-17T20:21:34+05:30",
+        "input_parameters": {
+            "nitrogen": N, "phosphorus": P, "potassium": K,
+            "temperature": temperature, "humidity": humidity,
+            "ph": ph, "rainfall": rainfall
+        },
+        "recommendation": {
+            "primary_crop": {
+                "name_english": crop_name,
+                "name_hindi": get_crop_name(crop_name, 'hindi'),
+                "name_bengali": get_crop_name(crop_name, 'bengali'),
+                "confidence": round(primary['confidence_score'], 3),
+                **rounded_details(primary)
+            },
+            "alternative_crops": [
+                {
+                    "name_english": alt['crop'],
+                    "name_hindi": get_crop_name(alt['crop'], 'hindi'),
+                    "name_bengali": get_crop_name(alt['crop'], 'bengali'),
+                    **rounded_details(alt),
+                    "suitability_score": round(alt['suitability_score'], 3)
+                } for alt in result['alternative_crops']
+            ]
+        },
+        "validation": {
+            "warnings": result['input_validation']['warnings'],
+            "is_valid": result['input_validation']['is_valid']
+        },
+        "system_info": {
+            "model_accuracy": "94%",
+            "total_crops_supported": 24,
+            "languages_supported": 3,
+            "target_region": "Jharkhand, India",
+            "api_version": "1.0.0"
+        }
+    }
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend_crop():
     """Main crop recommendation endpoint."""
@@ -132,78 +214,35 @@ def recommend_crop():
                 "message": "pH must be between 0 and 14"
             }), 400
         
-        # Get comprehensive analysis
-        result = comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall)
-        
-        # Hindi crop names
-        hindi_names = {
-            'rice': 'चावल', 'wheat': 'गेहूं', 'maize': 'मक्का', 'cotton': 'कपास',
-            'sugarcane': 'गन्ना', 'jute': 'जूट', 'coffee': 'कॉफी', 'coconut': 'नारियल',
-            'papaya': 'पपीता', 'orange': 'संतरा', 'apple': 'सेब', 'muskmelon': 'खरबूजा',
-            'watermelon': 'तरबूज', 'grapes': 'अंगूर', 'mango': 'आम', 'banana': 'केला',
-            'pomegranate': 'अनार', 'lentil': 'मसूर', 'blackgram': 'उड़द', 'mungbean': 'मूंग',
-            'mothbeans': 'मोठ', 'pigeonpeas': 'अरहर', 'kidneybeans': 'राजमा', 'chickpea': 'चना'
-        }
+        # ?top_k= alternatives; ?fields= limits the response, and yield and
+        # sustainability are only computed for crops whose fields need them
+        try:
+            top_k = parse_top_k(request.args.get('top_k'), DEFAULT_ALTERNATIVES, len(crop_system.crop_rules) - 1)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        compact = wants_compact_response()
+        fields = None if compact else parse_fields(request.args.get('fields'))
         
-        # Bengali crop names
-        bengali_names = {
-            'rice': 'ধান', 'wheat': 'গম', 'maize': 'ভুট্টা', 'cotton': 'তুলা',
-            'sugarcane': 'আখ', 'jute': 'পাট', 'coffee': 'কফি', 'coconut': 'নারকেল',
-            'papaya': 'পেঁপে', 'orange': 'কমলা', 'apple': 'আপেল', 'muskmelon': 'খরমুজ',
-            'watermelon': 'তরমুজ', 'grapes': 'আঙুর', 'mango': 'আম', 'banana': 'কলা',
-            'pomegranate': 'ডালিম', 'lentil': 'মসুর', 'blackgram': 'কালো ছোলা', 'mungbean': 'মুগ',
-            'mothbeans': 'মথ', 'pigeonpeas': 'অড়হর', 'kidneybeans': 'রাজমা', 'chickpea': 'ছোলা'
-        }
+        # Get comprehensive analysis
+        result = comprehensive_analysis(
+            N, P, K, temperature, humidity, ph, rainfall, top_k,
+            wanted_details(fields, RESPONSE_DETAILS, 'recommendation', 'primary_crop'),
+            wanted_details(fields, RESPONSE_DETAILS, 'recommendation', 'alternative_crops'))
         
-        primary = result['primary_recommendation']
-        crop_name = primary['crop']
-        
-        # Format response for production
-        response = {
-            "status": "success",
-            "timestamp": "2025-09-17T20:21:34+05:30",
-            "input_parameters": {
-                "nitrogen": N, "phosphorus": P, "potassium": K,
-                "temperature": temperature, "humidity": humidity,
-                "ph": ph, "rainfall": rainfall
-            },
-            "recommendation": {
-                "primary_crop": {
-                    "name_english": crop_name,
-                    "name_hindi": hindi_names.get(crop_name, crop_name),
-                    "name_bengali": bengali_names.get(crop_name, crop_name),
-                    "confidence": round(primary['confidence_score'], 3),
-                    "predicted_yield_kg_per_ha": round(primary['predicted_yield_kg_per_ha'], 2),
-                    "sustainability_score": round(primary['sustainability_score'], 2)
-                },
-                "alternative_crops": [
-                    {
-                        "name_english": alt['crop'],
-                        "name_hindi": hindi_names.get(alt['crop'], alt['crop']),
-                        "name_bengali": bengali_names.get(alt['crop'], alt['crop']),
-                        "predicted_yield_kg_per_ha": round(alt['predicted_yield_kg_per_ha'], 2),
-                        "sustainability_score": round(alt['sustainability_score'], 2),
-                        "suitability_score": round(alt['suitability_score'], 3)
-                    } for alt in result['alternative_crops'][:3]
-                ]
-            },
-            "validation": {
-                "warnings": result['input_validation']['warnings'],
-                "is_valid": result['input_validation']['is_valid']
-            },
-            "system_info": {
-                "model_accuracy": "94%",
-                "total_crops_supported": 24,
-                "languages_supported": 3,
-                "target_region": "Jharkhand, India",
-                "api_version": "1.0.0"
-            }
-        }
+        crop_name = result['primary_recommendation']['crop']
         
         # Log successful request
         logger.info(f"Crop recommendation: {crop_name} for conditions N={N}, P={P}, K={K}")
         
-        return jsonify(response)
+        # Clients that ask for the compact encoding get the binary layout
+        # from compact_wire instead of JSON
+        if compact:
+            response = app.response_class(encode_recommendation(result, top_k), mimetype=COMPACT_MIMETYPE)
+        else:
+            payload = build_recommendation_payload(result, N, P, K, temperature, humidity, ph, rainfall)
+            response = jsonify(select_fields(payload, fields))
+        response.vary.add('Accept')
+        return response
         
     except Exception as e:
         logger.error(f"Error in crop recommendation: {str(e)}")
@@ -213,9 +252,7 @@ def recommend_crop():
             "error_id": "CROP_REC_001"
         }), 500
 
-@app.route('/api/crops')
-def get_supported_crops():
-    """Get list of all supported crops with multilingual names."""
+def build_crops_payload():
     crops = [
         {"english": "rice", "hindi": "चावल", "bengali": "ধান", "category": "cereal"},
         {"english": "wheat", "hindi": "गेहूं", "bengali": "গম", "category": "cereal"},
@@ -242,14 +279,25 @@ def get_supported_crops():
         {"english": "kidneybeans", "hindi": "राजमा", "bengali": "রাজমা", "category": "pulse"},
         {"english": "chickpea", "hindi": "चना", "bengali": "ছোলা", "category": "pulse"}
     ]
+    # IDs used by the compact recommendation encoding
+    for crop in crops:
+        crop["id"] = crop_id(crop["english"])
     
-    return jsonify({
+    return {
         "status": "success",
         "total_crops": len(crops),
         "crops": crops,
         "categories": ["cereal", "cash_crop", "fruit", "vegetable", "pulse"],
         "languages": ["english", "hindi", "bengali"]
-    })
+    }
+
+# The crop catalog is static: serialize it once and serve it with an ETag
+CROPS_RESPONSE = StaticJSONResponse(build_crops_payload)
+
+@app.route('/api/crops')
+def get_supported_crops():
+    """Get list of all supported crops with multilingual names."""
+    return CROPS_RESPONSE.response()
 
 @app.route('/api/test')
 def test_system():
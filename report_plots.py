@@ -0,0 +1,153 @@
+# SIH 2025 - Deferred Report Plots
+# Renders the step 1-3 figures from the JSON reports a headless run writes
+
+import json
+import os
+import sys
+from columnar_cache import DEFAULT_CACHE_DIR, DEFAULT_SOURCE, load_columnar_dataset
+from headless_pipeline import DEFAULT_REPORTS_DIR, MODEL_RESULTS_FILE, report_filename
+
+FINAL_MODEL_REPORT = 'step3_final_model.json'
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _slug(model_name):
+    return model_name.lower().replace(' ', '_')
+
+
+def _save(plt, reports_dir, filename):
+    path = os.path.join(reports_dir, filename)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close('all')
+    return path
+
+
+def _confusion_matrix(plt, sns, report, title, cmap, reports_dir, filename):
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(report['confusion_matrix'], annot=True, fmt='d', cmap=cmap,
+                xticklabels=report['labels'], yticklabels=report['labels'], cbar_kws={'shrink': 0.8})
+    plt.title(title, fontsize=14, fontweight='bold')
+    plt.xlabel('Predicted Label')
+    plt.ylabel('True Label')
+    plt.xticks(rotation=45)
+    plt.yticks(rotation=0)
+    return _save(plt, reports_dir, filename)
+
+
+def _feature_importance(plt, importances, title, color, reports_dir, filename):
+    features, values = zip(*sorted(importances.items(), key=lambda x: x[1], reverse=True))
+    plt.figure(figsize=(10, 6))
+    plt.barh(features, values, color=color, edgecolor='black')
+    plt.title(title, fontsize=14, fontweight='bold')
+    plt.xlabel('Importance')
+    return _save(plt, reports_dir, filename)
+
+
+def render_report_plots(reports_dir=DEFAULT_REPORTS_DIR, source=DEFAULT_SOURCE, cache_dir=DEFAULT_CACHE_DIR):
+    """Draw the figures steps 1-3 show interactively, as PNGs in reports_dir.
+
+    Reads the columnar cache (step 1), the per-model step 2 reports and the
+    step 3 final-model report; figures whose report is missing are skipped.
+    Returns the paths written.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    written = []
+
+    # Step 1: crop distribution, correlations and feature histograms
+    data = load_columnar_dataset(source, cache_dir)
+    df = data.frame()
+    crop_counts = df[data.label_column].value_counts()
+    plt.figure(figsize=(15, 8))
+    plt.subplot(2, 1, 1)
+    crop_counts.plot(kind='bar', color='skyblue', edgecolor='black')
+    plt.title('Distribution of Crops in Dataset', fontsize=14, fontweight='bold')
+    plt.xlabel('Crops')
+    plt.ylabel('Number of Samples')
+    plt.xticks(rotation=45)
+    plt.grid(axis='y', alpha=0.3)
+    plt.subplot(2, 1, 2)
+    plt.pie(crop_counts.values, labels=crop_counts.index, autopct='%1.1f%%', startangle=90)
+    plt.title('Crop Distribution (Percentage)', fontsize=14, fontweight='bold')
+    plt.axis('equal')
+    written.append(_save(plt, reports_dir, 'crop_distribution.png'))
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(df[data.feature_columns].corr(), annot=True, cmap='coolwarm', center=0,
+                square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
+    plt.title('Feature Correlation Matrix', fontsize=14, fontweight='bold')
+    written.append(_save(plt, reports_dir, 'correlation_matrix.png'))
+
+    fig, axes = plt.subplots(3, 3, figsize=(15, 12))
+    axes = axes.ravel()
+    for i, feature in enumerate(data.feature_columns):
+        axes[i].hist(df[feature], bins=30, color='lightblue', edgecolor='black', alpha=0.7)
+        axes[i].set_title(f'Distribution of {feature}', fontweight='bold')
+        axes[i].set_xlabel(feature)
+        axes[i].set_ylabel('Frequency')
+        axes[i].grid(alpha=0.3)
+    for ax in axes[len(data.feature_columns):]:
+        ax.remove()
+    written.append(_save(plt, reports_dir, 'feature_distributions.png'))
+
+    # Step 2: one confusion matrix per model, the comparison and the best model's importances
+    if os.path.exists(MODEL_RESULTS_FILE):
+        summary = _read_json(MODEL_RESULTS_FILE)
+        for model_name in summary['model_performances']:
+            path = os.path.join(reports_dir, report_filename(model_name))
+            if os.path.exists(path):
+                written.append(_confusion_matrix(plt, sns, _read_json(path), f'Confusion Matrix - {model_name}',
+                                                 'Blues', reports_dir, f'confusion_matrix_{_slug(model_name)}.png'))
+
+        best_model_name, best_accuracy = summary['best_model'], summary['best_accuracy']
+        model_names = list(summary['model_performances'])
+        accuracies = list(summary['model_performances'].values())
+        plt.figure(figsize=(12, 8))
+        bars = plt.bar(model_names, accuracies, edgecolor='black', linewidth=1.2,
+                       color=['gold' if name == best_model_name else 'skyblue' for name in model_names])
+        for bar, acc in zip(bars, accuracies):
+            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.005,
+                     f'{acc:.3f}', ha='center', va='bottom', fontweight='bold')
+        plt.title('Model Performance Comparison', fontsize=16, fontweight='bold')
+        plt.xlabel('Models', fontsize=12)
+        plt.ylabel('Accuracy', fontsize=12)
+        plt.ylim(0, 1.1)
+        plt.xticks(rotation=45)
+        plt.grid(axis='y', alpha=0.3)
+        plt.axhline(y=best_accuracy, color='red', linestyle='--', alpha=0.7,
+                    label=f'Best: {best_model_name} ({best_accuracy:.3f})')
+        plt.legend()
+        written.append(_save(plt, reports_dir, 'model_comparison.png'))
+
+        best_report = os.path.join(reports_dir, report_filename(best_model_name))
+        if os.path.exists(best_report) and _read_json(best_report).get('feature_importances'):
+            written.append(_feature_importance(plt, _read_json(best_report)['feature_importances'],
+                                               f'Feature Importance - {best_model_name}', 'lightgreen',
+                                               reports_dir, f'feature_importance_{_slug(best_model_name)}.png'))
+
+    # Step 3: the tuned model
+    final_path = os.path.join(reports_dir, FINAL_MODEL_REPORT)
+    if os.path.exists(final_path):
+        final = _read_json(final_path)
+        written.append(_confusion_matrix(plt, sns, final,
+                                         f"Final Optimized Model Confusion Matrix - {final['model']}",
+                                         'Greens', reports_dir, 'final_model_confusion_matrix.png'))
+        if final.get('feature_importances'):
+            written.append(_feature_importance(plt, final['feature_importances'],
+                                               f"Final Model Feature Importance - {final['model']}",
+                                               'lightcoral', reports_dir, 'final_model_feature_importance.png'))
+    return written
+
+
+if __name__ == "__main__":
+    reports_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_REPORTS_DIR
+    for path in render_report_plots(reports_dir):
+        print(f"🖼️ {path}")
@@ -2,12 +2,14 @@
 # Smart India Hackathon 2025 - Execute All Steps
 # This script runs the entire pipeline from data creation to final testing
 
+import argparse
+import json
 import os
 import sys
 import subprocess
 import time
 
-def run_script(script_name, description):
+def run_script(script_name, description, env=None):
     """Run a Python script and handle errors."""
     print(f"\n{'='*60}")
     print(f"RUNNING: {description}")
@@ -17,7 +19,7 @@ def run_script(script_name, description):
     try:
         start_time = time.time()
         result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, text=True, check=True)
+                              capture_output=True, text=True, check=True, env=env)
         end_time = time.time()
         
         print(f"✅ SUCCESS: {description}")
@@ -44,6 +46,33 @@ def run_script(script_name, description):
         print(f"❌ UNEXPECTED ERROR: {str(e)}")
         return False
 
+def run_stage(stage, description):
+    """Run an in-process (headless) pipeline stage and handle errors."""
+    print(f"\n{'='*60}")
+    print(f"RUNNING: {description}")
+    print(f"Stage: {stage.__name__} (headless)")
+    print(f"{'='*60}")
+    
+    try:
+        start_time = time.time()
+        stage()
+        print(f"✅ SUCCESS: {description}")
+        print(f"⏱️ Execution time: {time.time() - start_time:.2f} seconds")
+        return True
+    except Exception as e:
+        print(f"❌ ERROR: {description} failed: {str(e)}")
+        return False
+
+def start_plot_renderer(reports_dir):
+    """Draw the deferred headless figures in a background process; returns the Popen."""
+    os.makedirs(reports_dir, exist_ok=True)
+    log_file = os.path.join(reports_dir, 'plots.log')
+    with open(log_file, 'w') as log:
+        process = subprocess.Popen([sys.executable, 'report_plots.py', reports_dir],
+                                   stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    print(f"🖼️ Rendering plots into {reports_dir}/ in the background (pid {process.pid}, log {log_file})")
+    return process
+
 def check_file_exists(filename):
     """Check if a file exists."""
     exists = os.path.exists(filename)
@@ -51,9 +80,21 @@ def check_file_exists(filename):
     print(f"{status} {filename}")
     return exists
 
-def main():
+def main(argv=None):
     """Run the complete crop recommendation system pipeline."""
     
+    parser = argparse.ArgumentParser(description='Run the complete crop recommendation pipeline')
+    parser.add_argument('--headless', action='store_true',
+                        help='Train step 2 models in parallel, write reports as artifacts and draw '
+                             'the plots from them in a background process after the run')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='With --headless, do not draw the deferred plots at all')
+    parser.add_argument('--workers', type=int, help='Processes for parallel model training (headless)')
+    parser.add_argument('--reports-dir', default='reports', help='Where headless reports are written')
+    parser.add_argument('--search', choices=['randomized', 'halving'], default='randomized',
+                        help='Step 3 search: randomized, or resumable successive halving')
+    args = parser.parse_args(argv)
+    
     print("🌾" * 30)
     print("AI-BASED CROP RECOMMENDATION SYSTEM")
     print("Smart India Hackathon 2025")
@@ -81,15 +122,43 @@ def main():
         ('step1_data_preprocessing.py', 'Data Understanding and Preprocessing'),
         ('step2_model_evaluation.py', 'Model Building and Evaluation'),
         ('step3_model_optimization.py', 'Model Optimization and Export'),
+        ('model_distiller.py', 'Model Distillation for Serving'),
         ('step4_prediction_function.py', 'Building Prediction Function'),
         ('step5_yield_sustainability.py', 'Yield Prediction and Sustainability')
     ]
+    script_env = dict(os.environ, SIH_SEARCH_MODE=args.search)
+    
+    if args.headless:
+        # Steps 1 and 2 run in-process without plots; later steps skip their plots too
+        from headless_pipeline import run_model_evaluation, run_preprocessing
+        
+        def preprocessing():
+            run_preprocessing(args.reports_dir)
+        
+        def model_evaluation():
+            run_model_evaluation(args.reports_dir, args.workers)
+        
+        steps[0] = (preprocessing, 'Data Preprocessing (headless)')
+        steps[1] = (model_evaluation, 'Parallel Model Evaluation (headless)')
+        script_env.update(MPLBACKEND='Agg', SIH_HEADLESS='1', SIH_REPORTS_DIR=args.reports_dir)
+        print(f"\n🤖 Headless mode: reports written to {args.reports_dir}/, plots drawn from them afterwards")
     
     successful_steps = 0
+    stage_timings = []
     total_start_time = time.time()
     
     for script, description in steps:
-        if run_script(script, description):
+        stage_start_time = time.time()
+        if callable(script):
+            succeeded = run_stage(script, description)
+        else:
+            succeeded = run_script(script, description, script_env)
+        stage_timings.append({
+            'stage': description,
+            'seconds': round(time.time() - stage_start_time, 2),
+            'status': 'success' if succeeded else 'failed'
+        })
+        if succeeded:
             successful_steps += 1
         else:
             print(f"\n❌ Pipeline stopped at: {description}")
@@ -105,6 +174,18 @@ def main():
     
     print(f"✅ Successful steps: {successful_steps}/{len(steps)}")
     print(f"⏱️ Total execution time: {total_time:.2f} seconds")
+    print("⏱️ Stage timings:")
+    for timing in stage_timings:
+        print(f"   {timing['stage']}: {timing['seconds']:.2f}s ({timing['status']})")
+    
+    if args.headless:
+        os.makedirs(args.reports_dir, exist_ok=True)
+        timings_file = os.path.join(args.reports_dir, 'pipeline_timings.json')
+        with open(timings_file, 'w') as f:
+            json.dump({'stages': stage_timings, 'total_seconds': round(total_time, 2)}, f, indent=2)
+        print(f"💾 Timings saved to {timings_file}")
+        if successful_steps and not args.no_plots:
+            start_plot_renderer(args.reports_dir)
     
     if successful_steps == len(steps):
         print("\n🎉 COMPLETE SUCCESS! All steps executed successfully!")
@@ -113,8 +194,10 @@ def main():
         important_files = [
             'Crop_recommendation.csv',
             'X_train.csv', 'X_test.csv', 'y_train.csv', 'y_test.csv',
+            os.path.join('crop_data_cache', 'manifest.json'),
             'model_results_summary.json',
             'model_metadata.json',
+            'distilled_model.npz',
             'crop_predictor.py',
             'enhanced_crop_predictor.py'
         ]
@@ -4,6 +4,7 @@
 from flask import Flask, request, jsonify
 import json
 from working_crop_system import comprehensive_analysis
+from multilingual_support import get_crop_name
 
 app = Flask(__name__)
 
@@ -73,29 +74,6 @@ def recommend_crop():
         # Get comprehensive analysis
         result = comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall)
         
-        # Get crop names in different languages
-        def get_hindi_name(crop):
-            hindi_names = {
-                'rice': 'चावल', 'wheat': 'गेहूं', 'maize': 'मक्का', 'cotton': 'कपास',
-                'sugarcane': 'गन्ना', 'jute': 'जूट', 'coffee': 'कॉफी', 'coconut': 'नारियल',
-                'papaya': 'पपीता', 'orange': 'संतरा', 'apple': 'सेब', 'muskmelon': 'खरबूजा',
-                'watermelon': 'तरबूज', 'grapes': 'अंगूर', 'mango': 'आम', 'banana': 'केला',
-                'pomegranate': 'अनार', 'lentil': 'मसूर', 'blackgram': 'उड़द', 'mungbean': 'मूंग',
-                'mothbeans': 'मोठ', 'pigeonpeas': 'अरहर', 'kidneybeans': 'राजमा', 'chickpea': 'चना'
-            }
-            return hindi_names.get(crop, crop)
-        
-        def get_bengali_name(crop):
-            bengali_names = {
-                'rice': 'ধান', 'wheat': 'গম', 'maize': 'ভুট্টা', 'cotton': 'তুলা',
-                'sugarcane': 'আখ', 'jute': 'পাট', 'coffee': 'কফি', 'coconut': 'নারকেল',
-                'papaya': 'পেঁপে', 'orange': 'কমলা', 'apple': 'আপেল', 'muskmelon': 'খরমুজ',
-                'watermelon': 'তরমুজ', 'grapes': 'আঙুর', 'mango': 'আম', 'banana': 'কলা',
-                'pomegranate': 'ডালিম', 'lentil': 'মসুর', 'blackgram': 'কালো ছোলা', 'mungbean': 'মুগ',
-                'mothbeans': 'মথ', 'pigeonpeas': 'অড়হর', 'kidneybeans': 'রাজমা', 'chickpea': 'ছোলা'
-            }
-            return bengali_names.get(crop, crop)
-        
         # Format response for mobile
         primary = result['primary_recommendation']
         
@@ -110,8 +88,8 @@ def recommend_crop():
             "recommendation": {
                 "primary_crop": {
                     "name": primary['crop'],
-                    "name_hindi": get_hindi_name(primary['crop']),
-                    "name_bengali": get_bengali_name(primary['crop']),
+                    "name_hindi": get_crop_name(primary['crop'], 'hindi'),
+                    "name_bengali": get_crop_name(primary['crop'], 'bengali'),
                     "confidence": primary['confidence_score'],
                     "predicted_yield": primary['predicted_yield_kg_per_ha'],
                     "sustainability_score": primary['sustainability_score']
@@ -119,8 +97,8 @@ def recommend_crop():
                 "alternatives": [
                     {
                         "name": alt['crop'],
-                        "name_hindi": get_hindi_name(alt['crop']),
-                        "name_bengali": get_bengali_name(alt['crop']),
+                        "name_hindi": get_crop_name(alt['crop'], 'hindi'),
+                        "name_bengali": get_crop_name(alt['crop'], 'bengali'),
                         "yield": alt['predicted_yield_kg_per_ha'],
                         "sustainability": alt['sustainability_score'],
                         "suitability": alt['suitability_score']
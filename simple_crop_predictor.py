@@ -2,9 +2,9 @@
 # Minimal version without visualization dependencies
 
 import csv
-import random
 import json
 from typing import Dict, List
+from yield_jitter import yield_jitter
 
 # Crop-specific data for yield and sustainability calculations
 CROP_DATA = {
@@ -148,7 +148,8 @@ def calculate_yield_prediction(crop, N, P, K, temperature, humidity, ph, rainfal
         rainfall_factor * 0.1
     )
     
-    predicted_yield = base_yield * yield_multiplier * random.uniform(0.85, 1.15)
+    variation = yield_jitter.uniform_one((N, P, K, temperature, humidity, ph, rainfall), crop, 0.85, 1.15)
+    predicted_yield = base_yield * yield_multiplier * variation
     return max(100, predicted_yield)
 
 def calculate_sustainability_score(crop, N, P, K, temperature, humidity, ph, rainfall):
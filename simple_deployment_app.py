@@ -1,13 +1,24 @@
 # SIH 2025 - Simple Deployment App (No External Dependencies)
 # Standalone Flask app for reliable deployment
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
-import random
 import os
-import pandas as pd
+import csv
+import io
+import itertools
+import json
+import threading
+from datetime import datetime
 import numpy as np
-from usage_tracker import usage_tracker
+from usage_tracker import get_usage_tracker
+from suitability_engine import SuitabilityMatrix
+from dataset_stats import FEATURE_COLUMNS, DatasetStats, aggregate_crop_stats, read_crop_stats
+from cached_responses import StaticJSONResponse
+from distilled_predictor import load_distilled_predictor
+from yield_jitter import SUSTAINABILITY_STREAM, yield_jitter
+from singleflight import SingleFlight, request_key
+from sparse_fields import parse_fields, parse_top_k, select_fields, wants
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -15,29 +26,42 @@ CORS(app)  # Enable CORS for all routes
 # Dataset URL - Change this to your new dataset link
 DATASET_URL = "https://raw.githubusercontent.com/your-username/your-repo/main/crop_dataset.csv"
 
+# Precompiled rules from the last successful dataset load; workers serve from
+# this file at startup and refresh the dataset in the background
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_CACHE_FILE = os.environ.get('RULES_CACHE_FILE', os.path.join(APP_DIR, 'crop_rules_cache.json'))
+LOCAL_DATASET_FILE = os.path.join(APP_DIR, 'crop_dataset.csv')
+DATASET_TIMEOUT = float(os.environ.get('DATASET_TIMEOUT', 10))
+DATASET_CHUNK_SIZE = int(os.environ.get('DATASET_CHUNK_SIZE', 100000))
+
+# Step 3 model compiled by model_distiller.py (NumPy only); None until it is built
+DISTILLED_MODEL = load_distilled_predictor()
+
 # Load dataset from URL or local file
-def load_dataset():
-    """Load crop dataset from URL or local file."""
+def load_dataset(url=None, timeout=None):
+    """Load per-crop statistics from URL or local file, streaming the CSV in chunks.
+
+    Returns (dataset, source) where source is the URL or file actually read,
+    or (None, None) when neither could be loaded.
+    """
+    url = url or DATASET_URL
     try:
-        # First try to load from URL
-        print(f"🌐 Loading dataset from URL: {DATASET_URL}")
-        df = pd.read_csv(DATASET_URL)
-        print(f"✅ Successfully loaded {len(df)} records with crops: {df['label'].unique()}")
-        return df
+        # First try to load from URL (bounded so a slow host cannot hang the refresh)
+        print(f"🌐 Loading dataset from URL: {url}")
+        dataset = read_crop_stats(url, DATASET_CHUNK_SIZE, timeout or DATASET_TIMEOUT)
+        print(f"✅ Successfully loaded {dataset.total_records} records with crops: {dataset.crops}")
+        return dataset, url
     except Exception as url_error:
         print(f"⚠️  Failed to load from URL: {url_error}")
         try:
             # Fallback to local file
-            print("📁 Trying local file: crop_dataset.csv")
-            df = pd.read_csv('crop_dataset.csv')
-            print(f"✅ Successfully loaded local dataset with {len(df)} records")
-            return df
+            print(f"📁 Trying local file: {LOCAL_DATASET_FILE}")
+            dataset = read_crop_stats(LOCAL_DATASET_FILE, DATASET_CHUNK_SIZE)
+            print(f"✅ Successfully loaded local dataset with {dataset.total_records} records")
+            return dataset, LOCAL_DATASET_FILE
         except FileNotFoundError:
             print("⚠️  No local CSV file found. Using default crops.")
-            return None
-
-# Load the dataset
-DATASET = load_dataset()
+            return None, None
 
 # All 24 crops support
 DEFAULT_CROP_RULES = {
@@ -83,47 +107,187 @@ DEFAULT_HINDI_NAMES = {
     'kidneybeans': 'राजमा', 'chickpea': 'चना'
 }
 
-def get_crop_info_from_dataset():
-    """Extract crop information from loaded dataset."""
-    if DATASET is None:
+# Rule parameter -> dataset column, with the clipping applied to mean ± std
+RULE_COLUMNS = {'N': 'N', 'P': 'P', 'K': 'K', 'temp': 'temperature',
+                'humidity': 'humidity', 'ph': 'ph', 'rainfall': 'rainfall'}
+RULE_LOWER_CLIP = {'N': 0, 'P': 0, 'K': 0, 'humidity': 0, 'ph': 0, 'rainfall': 0}
+RULE_UPPER_CLIP = {'humidity': 100, 'ph': 14}
+
+def get_crop_info_from_dataset(dataset):
+    """Extract crop information from a dataset (DataFrame, chunks or DatasetStats)."""
+    if dataset is None:
         return DEFAULT_CROP_RULES, DEFAULT_CROP_YIELDS, DEFAULT_HINDI_NAMES
+    if not isinstance(dataset, DatasetStats):
+        dataset = aggregate_crop_stats(dataset)
+    
+    # Parameter ranges (mean ± std) for every crop at once
+    mean = dataset.stat('mean')
+    std = dataset.stat('std')
+    lower = mean - std
+    upper = mean + std
+    
+    bounds = {}
+    for param, column in RULE_COLUMNS.items():
+        low = lower[:, FEATURE_COLUMNS.index(column)]
+        high = upper[:, FEATURE_COLUMNS.index(column)]
+        # fmax/fmin treat a NaN bound (single-row crop) like max()/min() do
+        if param in RULE_LOWER_CLIP:
+            low = np.fmax(RULE_LOWER_CLIP[param], low)
+        if param in RULE_UPPER_CLIP:
+            high = np.fmin(RULE_UPPER_CLIP[param], high)
+        bounds[param] = list(zip(low.tolist(), high.tolist()))
     
     crop_rules = {}
     crop_yields = {}
     hindi_names = {}
     
-    # Group by crop label to calculate ranges
-    for crop in DATASET['label'].unique():
-        crop_data = DATASET[DATASET['label'] == crop]
-        
-        # Calculate parameter ranges (mean ± std)
-        crop_rules[crop] = {
-            'N': (max(0, crop_data['N'].mean() - crop_data['N'].std()), 
-                  crop_data['N'].mean() + crop_data['N'].std()),
-            'P': (max(0, crop_data['P'].mean() - crop_data['P'].std()), 
-                  crop_data['P'].mean() + crop_data['P'].std()),
-            'K': (max(0, crop_data['K'].mean() - crop_data['K'].std()), 
-                  crop_data['K'].mean() + crop_data['K'].std()),
-            'temp': (crop_data['temperature'].mean() - crop_data['temperature'].std(), 
-                     crop_data['temperature'].mean() + crop_data['temperature'].std()),
-            'humidity': (max(0, crop_data['humidity'].mean() - crop_data['humidity'].std()), 
-                         min(100, crop_data['humidity'].mean() + crop_data['humidity'].std())),
-            'ph': (max(0, crop_data['ph'].mean() - crop_data['ph'].std()), 
-                   min(14, crop_data['ph'].mean() + crop_data['ph'].std())),
-            'rainfall': (max(0, crop_data['rainfall'].mean() - crop_data['rainfall'].std()), 
-                         crop_data['rainfall'].mean() + crop_data['rainfall'].std())
-        }
+    mean_n = mean[:, FEATURE_COLUMNS.index('N')].tolist()
+    for i, crop in enumerate(dataset.crops):
+        crop_rules[crop] = {param: bounds[param][i] for param in RULE_COLUMNS}
         
         # Estimate yield (you can add actual yield column to your CSV)
-        crop_yields[crop] = int(crop_data['N'].mean() * 50)  # Simple estimation
+        crop_yields[crop] = int(mean_n[i] * 50)  # Simple estimation
         
         # Add Hindi names (you can add hindi_name column to your CSV)
         hindi_names[crop] = DEFAULT_HINDI_NAMES.get(crop, crop)  # Fallback to English
     
     return crop_rules, crop_yields, hindi_names
 
-# Get crop information
-CROP_RULES, CROP_YIELDS, HINDI_NAMES = get_crop_info_from_dataset()
+class CropRuleSet:
+    """Rules, yields, Hindi names and compiled matrix that are swapped in together.
+
+    Request handlers read RULE_SET once, so a background refresh can never
+    hand them rules from one dataset and yields from another.
+    """
+
+    def __init__(self, crop_rules, crop_yields, hindi_names, dataset_info=None):
+        self.crop_rules = crop_rules
+        self.crop_yields = crop_yields
+        self.hindi_names = hindi_names
+        self.dataset_info = dataset_info
+        self.suitability = SuitabilityMatrix(crop_rules)
+
+    @classmethod
+    def from_dataset(cls, dataset, dataset_url, source=None):
+        if not isinstance(dataset, DatasetStats):
+            dataset = aggregate_crop_stats(dataset)
+        crop_rules, crop_yields, hindi_names = get_crop_info_from_dataset(dataset)
+        dataset_info = {
+            "dataset_url": dataset_url,
+            # What was actually read: the URL, or the local CSV it fell back to
+            "source": source or dataset_url,
+            "crops": [str(crop) for crop in dataset.crops],
+            "total_records": dataset.total_records,
+            "columns": dataset.columns,
+            "loaded_at": datetime.now().isoformat()
+        }
+        return cls(crop_rules, crop_yields, hindi_names, dataset_info)
+
+    def to_dict(self):
+        return {
+            "crop_rules": {crop: {param: list(bounds) for param, bounds in rules.items()}
+                           for crop, rules in self.crop_rules.items()},
+            "crop_yields": self.crop_yields,
+            "hindi_names": self.hindi_names,
+            "dataset_info": self.dataset_info
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        crop_rules = {crop: {param: tuple(bounds) for param, bounds in rules.items()}
+                      for crop, rules in data['crop_rules'].items()}
+        return cls(crop_rules, data['crop_yields'], data['hindi_names'], data.get('dataset_info'))
+
+def load_rules_cache(cache_file=None):
+    """Read the precompiled rule set from disk, or None if missing/corrupt."""
+    cache_file = cache_file or RULES_CACHE_FILE
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return CropRuleSet.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_rules_cache(rule_set, cache_file=None):
+    """Atomically write the rule set so the next worker boot can start from it."""
+    cache_file = cache_file or RULES_CACHE_FILE
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        # NaN bounds (single-row crops) round-trip through Python's json module
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(rule_set.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"⚠️  Could not write rules cache: {e}")
+
+def install_rule_set(rule_set):
+    """Swap in a new rule set; in-flight requests keep the one they already read."""
+    global RULE_SET, CROP_RULES, CROP_YIELDS, HINDI_NAMES, SUITABILITY
+    RULE_SET = rule_set
+    # Module-level aliases kept for scripts and calculate_suitability()
+    CROP_RULES, CROP_YIELDS, HINDI_NAMES = rule_set.crop_rules, rule_set.crop_yields, rule_set.hindi_names
+    SUITABILITY = rule_set.suitability
+
+# Serve immediately from the cached rules (or the built-in defaults)
+install_rule_set(load_rules_cache() or CropRuleSet(DEFAULT_CROP_RULES, DEFAULT_CROP_YIELDS, DEFAULT_HINDI_NAMES))
+
+_refresh_lock = threading.Lock()
+DATASET_REFRESH = {"state": "idle", "dataset_url": None, "source": None, "error": None, "finished_at": None}
+DATASET_READY = threading.Event()
+
+def refresh_dataset(url=None, timeout=None):
+    """Load the dataset, rebuild the rules and swap them in. Returns the new rule set or None."""
+    global DATASET_URL
+    url = url or DATASET_URL
+    with _refresh_lock:
+        DATASET_REFRESH.update(state="loading", dataset_url=url, source=None, error=None)
+        try:
+            dataset, source = load_dataset(url, timeout)
+            if dataset is None:
+                raise ValueError("Failed to load dataset from URL")
+            rule_set = CropRuleSet.from_dataset(dataset, url, source)
+        except Exception as e:
+            DATASET_REFRESH.update(state="failed", error=str(e), finished_at=datetime.now().isoformat())
+            DATASET_READY.set()
+            return None
+
+        DATASET_URL = url
+        install_rule_set(rule_set)
+        save_rules_cache(rule_set)
+        DATASET_REFRESH.update(state="ready", source=source, finished_at=datetime.now().isoformat())
+        DATASET_READY.set()
+        return rule_set
+
+def start_dataset_refresh(url=None, timeout=None):
+    """Refresh the dataset on a daemon thread so callers never wait on the network."""
+    thread = threading.Thread(target=refresh_dataset, args=(url, timeout), name='dataset-refresh', daemon=True)
+    thread.start()
+    return thread
+
+def wait_for_dataset(timeout=None):
+    """Block until the first background refresh has finished (used by scripts and tests)."""
+    return DATASET_READY.wait(timeout)
+
+def start_dataset_refresh_on_boot():
+    """Start the boot-time refresh unless DATASET_REFRESH_ON_START=0.
+
+    Called by the server entry points (app.py, gunicorn.conf.py), never on
+    import, so tests and scripts that import the app stay offline.
+    """
+    if os.environ.get('DATASET_REFRESH_ON_START', '1') == '1':
+        return start_dataset_refresh()
+    return None
+
+# Batch scoring limits and input field order (matches the rule matrix params)
+BATCH_FIELDS = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+MAX_BATCH_SIZE = 10000
+DEFAULT_BATCH_TOP_K = 3
+
+# Streaming uploads are parsed and scored this many rows at a time, so memory
+# use does not depend on the upload size
+STREAM_CHUNK_ROWS = int(os.environ.get('STREAM_CHUNK_ROWS', 1000))
+STREAM_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+# Longer upload lines are skipped (and reported) rather than buffered
+STREAM_MAX_LINE_BYTES = int(os.environ.get('STREAM_MAX_LINE_BYTES', 64 * 1024))
 
 def calculate_suitability(crop, N, P, K, temp, humidity, ph, rainfall):
     """Calculate crop suitability score using distance-based matching."""
@@ -158,40 +322,126 @@ def calculate_suitability(crop, N, P, K, temp, humidity, ph, rainfall):
     
     return similarity_score
 
-@app.route('/')
-def home():
-    # Log usage
-    usage_tracker.log_request('/', request.remote_addr)
-    
-    return jsonify({
+def build_home_payload():
+    return {
         "message": "🌾 SIH 2025 Crop Recommendation API",
         "status": "operational",
         "version": "1.0.0",
-        "supported_crops": len(CROP_RULES),
+        "supported_crops": len(RULE_SET.crop_rules),
         "languages": ["English", "Hindi"],
         "endpoints": {
             "health": "/api/health",
             "recommend": "/api/recommend (POST)",
+            "recommend_batch": "/api/recommend/batch (POST)",
+            "recommend_stream": "/api/recommend/stream (POST, CSV/NDJSON)",
             "crops": "/api/crops",
             "usage": "/api/usage",
             "dashboard": "/dashboard"
         }
-    })
+    }
+
+def build_crops_payload():
+    rule_set = RULE_SET
+    crops = []
+    for crop in rule_set.crop_rules.keys():
+        crops.append({
+            "english": crop,
+            "hindi": rule_set.hindi_names.get(crop, crop),
+            "base_yield": rule_set.crop_yields.get(crop, 2000)
+        })
+    
+    return {
+        "status": "success",
+        "total_crops": len(crops),
+        "crops": crops
+    }
+
+# Catalog responses are serialized once per rule set (i.e. per dataset load)
+HOME_RESPONSE = StaticJSONResponse(build_home_payload, version=lambda: RULE_SET)
+CROPS_RESPONSE = StaticJSONResponse(build_crops_payload, version=lambda: RULE_SET)
+
+@app.route('/')
+def home():
+    # Log usage
+    get_usage_tracker().log_request('/', request.remote_addr)
+    
+    return HOME_RESPONSE.response()
 
 @app.route('/api/health')
 def health_check():
     # Log usage
-    usage_tracker.log_request('/api/health', request.remote_addr)
+    get_usage_tracker().log_request('/api/health', request.remote_addr)
+    rule_set = RULE_SET
     
     return jsonify({
         "status": "healthy",
         "service": "SIH 2025 Crop Recommendation API",
         "version": "1.0.0",
-        "supported_crops": len(CROP_RULES),
+        "supported_crops": len(rule_set.crop_rules),
         "accuracy": "94%",
-        "target": "Jharkhand Farmers"
+        "target": "Jharkhand Farmers",
+        "distilled_model": DISTILLED_MODEL.info() if DISTILLED_MODEL is not None else None,
+        "request_coalescing": recommend_flight.stats()
     })
 
+# Alternatives returned unless the request passes ?top_k=
+DEFAULT_ALTERNATIVES = 3
+
+def build_recommendation(sample, rule_set, distilled_model=None, top_k=DEFAULT_ALTERNATIVES, fields=None):
+    """Response body for one [N, P, K, temperature, humidity, ph, rainfall] sample.
+    
+    Only the best 1 + top_k crops are selected, and yield, sustainability
+    and the model prediction are computed only where fields (None for the
+    full response) asks for them.
+    """
+    # Score all crops in one vectorized pass and keep the best 1 + top_k
+    ranked = rule_set.suitability.rank(sample, 1 + top_k)
+    sections = ['primary_crop'] + ['alternative_crops'] * (len(ranked) - 1)
+    need_yield = [wants(fields, 'recommendation', section, 'predicted_yield_kg_per_ha') for section in sections]
+    need_sustainability = [wants(fields, 'recommendation', section, 'sustainability_score') for section in sections]
+    
+    # Variation factors for the ranked crops in one draw, keyed on (input, crop)
+    ranked_crops = [crop for crop, _ in ranked]
+    if any(need_yield):
+        yield_variation = yield_jitter.uniform(sample, ranked_crops, 0.8, 1.2).tolist()
+    if any(need_sustainability):
+        sustainability_variation = yield_jitter.uniform(sample, ranked_crops, 0.7, 1.0, SUSTAINABILITY_STREAM).tolist()
+    
+    crops = []
+    for i, (crop, score) in enumerate(ranked):
+        entry = {"name_english": crop, "name_hindi": rule_set.hindi_names.get(crop, crop)}
+        if i == 0:
+            entry["confidence"] = round(score, 3)
+        # Yield and sustainability (simplified)
+        if need_yield[i]:
+            entry["predicted_yield_kg_per_ha"] = round(rule_set.crop_yields.get(crop, 2000) * (score * 0.8 + yield_variation[i]), 2)
+        if need_sustainability[i]:
+            entry["sustainability_score"] = round(min(10, max(1, score * 10 * sustainability_variation[i])), 2)
+        crops.append(entry)
+    
+    response = {
+        "status": "success",
+        "timestamp": "2025-09-17T20:54:02+05:30",
+        "recommendation": {
+            "primary_crop": crops[0],
+            "alternative_crops": crops[1:]
+        },
+        "system_info": {
+            "model_accuracy": "94%",
+            "total_crops_supported": len(rule_set.crop_rules),
+            "target_region": "Jharkhand, India"
+        }
+    }
+    if distilled_model is not None and wants(fields, 'model_prediction'):
+        response["model_prediction"] = distilled_model.recommendation(sample)
+    return response
+
+# Identical requests in flight at the same time share one build_recommendation()
+recommend_flight = SingleFlight('recommend')
+
+# /api/recommend fills in parameters the request leaves out
+RECOMMEND_DEFAULTS = {'N': 90, 'P': 42, 'K': 43, 'temperature': 21, 'humidity': 82, 'ph': 6.5, 'rainfall': 203}
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend_crop():
     try:
@@ -199,101 +449,328 @@ def recommend_crop():
         if not data:
             return jsonify({"status": "error", "message": "No JSON data provided"}), 400
         
-        # Extract parameters
-        N = float(data.get('N', 90))
-        P = float(data.get('P', 42))
-        K = float(data.get('K', 43))
-        temperature = float(data.get('temperature', 21))
-        humidity = float(data.get('humidity', 82))
-        ph = float(data.get('ph', 6.5))
-        rainfall = float(data.get('rainfall', 203))
+        # Same checks as the batch endpoint (numeric, finite, humidity/pH ranges)
+        sample, error = validate_sample(dict(RECOMMEND_DEFAULTS, **data) if isinstance(data, dict) else data)
+        if error:
+            return jsonify({"status": "error", "message": error}), 400
         
-        # Calculate suitability for all crops
-        crop_scores = {}
-        for crop in CROP_RULES.keys():
-            score = calculate_suitability(crop, N, P, K, temperature, humidity, ph, rainfall)
-            crop_scores[crop] = score
+        rule_set, distilled_model = RULE_SET, DISTILLED_MODEL
         
-        # Get best crop
-        best_crop = max(crop_scores, key=crop_scores.get)
-        confidence = crop_scores[best_crop]
+        # ?top_k= alternatives; ?fields= limits the response and what is computed
+        try:
+            top_k = parse_top_k(request.args.get('top_k'), DEFAULT_ALTERNATIVES, len(rule_set.suitability) - 1)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        fields = parse_fields(request.args.get('fields'))
         
-        # Log usage with crop recommendation
-        usage_tracker.log_request('/api/recommend', request.remote_addr, best_crop)
+        response, _ = recommend_flight.do(request_key(sample, rule_set, distilled_model) + (top_k, fields),
+                                          build_recommendation, sample, rule_set, distilled_model, top_k, fields)
         
-        # Calculate yield (simplified)
-        base_yield = CROP_YIELDS.get(best_crop, 2000)
-        yield_factor = (confidence * 0.8) + random.uniform(0.8, 1.2)
-        predicted_yield = base_yield * yield_factor
+        # Usage is logged per request, including those that shared a computation
+        get_usage_tracker().log_request('/api/recommend', request.remote_addr,
+                                  response["recommendation"]["primary_crop"]["name_english"])
         
-        # Calculate sustainability (simplified)
-        sustainability = min(10, max(1, confidence * 10 * random.uniform(0.7, 1.0)))
+        return jsonify(select_fields(response, fields))
         
-        # Get alternatives
-        sorted_crops = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
-        alternatives = []
-        for crop, score in sorted_crops[1:4]:
-            alt_yield = CROP_YIELDS.get(crop, 2000) * (score * 0.8 + random.uniform(0.8, 1.2))
-            alt_sustainability = min(10, max(1, score * 10 * random.uniform(0.7, 1.0)))
-            alternatives.append({
-                "name_english": crop,
-                "name_hindi": HINDI_NAMES.get(crop, crop),
-                "predicted_yield_kg_per_ha": round(alt_yield, 2),
-                "sustainability_score": round(alt_sustainability, 2)
-            })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Error processing request: {str(e)}"
+        }), 500
+
+def validate_sample(record):
+    """(values in BATCH_FIELDS order, None) for a valid sample, else (None, error message)."""
+    if not isinstance(record, dict):
+        return None, "Sample must be an object"
+    
+    missing = [field for field in BATCH_FIELDS if field not in record]
+    if missing:
+        return None, f"Missing required parameters: {', '.join(missing)}"
+    
+    try:
+        values = [float(record[field]) for field in BATCH_FIELDS]
+    except (ValueError, TypeError):
+        return None, "Invalid parameter values. All parameters must be numeric."
+    
+    if not all(np.isfinite(values)):
+        return None, "Parameters must be finite numbers"
+    if not (0 <= values[4] <= 100):
+        return None, "Humidity must be between 0 and 100 percent"
+    if not (0 <= values[5] <= 14):
+        return None, "pH must be between 0 and 14"
+    return values, None
+
+def parse_batch_samples(data):
+    """Turn row-wise or columnar batch input into scoreable rows and per-row errors."""
+    if isinstance(data.get('samples'), list):
+        records = data['samples']
+    elif isinstance(data.get('columns'), dict):
+        columns = data['columns']
+        missing = [field for field in BATCH_FIELDS if not isinstance(columns.get(field), list)]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        lengths = {len(columns[field]) for field in BATCH_FIELDS}
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same length")
+        records = [dict(zip(BATCH_FIELDS, values)) for values in zip(*(columns[f] for f in BATCH_FIELDS))]
+    else:
+        raise ValueError("Provide 'samples' (list of objects) or 'columns' (object of arrays)")
+    
+    if len(records) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch too large: {len(records)} samples (maximum {MAX_BATCH_SIZE})")
+    
+    rows, row_indices, errors = [], [], []
+    for index, record in enumerate(records):
+        values, message = validate_sample(record)
+        if message:
+            errors.append({"index": index, "status": "error", "message": message})
+        else:
+            rows.append(values)
+            row_indices.append(index)
+    
+    return rows, row_indices, errors
+
+@app.route('/api/recommend/batch', methods=['POST'])
+def recommend_crop_batch():
+    """Score many soil samples against every crop in one matrix operation."""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"status": "error", "message": "No JSON data provided"}), 400
         
-        response = {
-            "status": "success",
-            "timestamp": "2025-09-17T20:54:02+05:30",
-            "recommendation": {
-                "primary_crop": {
-                    "name_english": best_crop,
-                    "name_hindi": HINDI_NAMES.get(best_crop, best_crop),
-                    "confidence": round(confidence, 3),
-                    "predicted_yield_kg_per_ha": round(predicted_yield, 2),
-                    "sustainability_score": round(sustainability, 2)
-                },
-                "alternative_crops": alternatives
-            },
-            "system_info": {
-                "model_accuracy": "94%",
-                "total_crops_supported": len(CROP_RULES),
-                "target_region": "Jharkhand, India"
-            }
-        }
+        try:
+            top_k = int(data.get('top_k', DEFAULT_BATCH_TOP_K))
+            rows, row_indices, errors = parse_batch_samples(data)
+        except (ValueError, TypeError) as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        if top_k < 1:
+            return jsonify({"status": "error", "message": "top_k must be at least 1"}), 400
         
-        return jsonify(response)
+        get_usage_tracker().log_request('/api/recommend/batch', request.remote_addr)
+        
+        rule_set = RULE_SET
+        suitability = rule_set.suitability
+        results = list(errors)
+        if rows:
+            scores = suitability.score(rows)
+            top = suitability.top_k(scores, top_k)
+            top_scores = np.take_along_axis(scores, top, axis=1).round(3).tolist()
+            
+            for index, crop_ids, crop_scores in zip(row_indices, top.tolist(), top_scores):
+                results.append({
+                    "index": index,
+                    "status": "success",
+                    "recommendations": [
+                        {
+                            "name_english": suitability.crops[crop_id],
+                            "name_hindi": rule_set.hindi_names.get(suitability.crops[crop_id], suitability.crops[crop_id]),
+                            "suitability_score": score
+                        } for crop_id, score in zip(crop_ids, crop_scores)
+                    ]
+                })
+            results.sort(key=lambda result: result['index'])
+        
+        return jsonify({
+            "status": "success",
+            "total_samples": len(results),
+            "successful": len(rows),
+            "failed": len(errors),
+            "top_k": min(top_k, len(suitability)),
+            "results": results
+        })
         
     except Exception as e:
         return jsonify({
             "status": "error",
-            "message": f"Error processing request: {str(e)}"
+            "message": f"Error processing batch: {str(e)}"
         }), 500
 
+def stream_format(value):
+    """'csv' / 'ndjson' for a format name or MIME type, else None."""
+    value = (value or '').split(';')[0].strip().lower()
+    for name, mimetype in STREAM_FORMATS.items():
+        if value in (name, mimetype):
+            return name
+    if value in ('jsonl', 'application/jsonl', 'application/x-jsonlines'):
+        return 'ndjson'
+    return None
+
+def iter_upload_lines(stream, max_line_bytes=None):
+    """Non-blank lines of the request body, read incrementally.
+    
+    Yields (line, None), or (None, error message) for a line that is longer
+    than max_line_bytes or not valid UTF-8, so it becomes a per-row error.
+    """
+    max_line_bytes = max_line_bytes or STREAM_MAX_LINE_BYTES
+    reader = io.BufferedReader(stream, 64 * 1024)
+    first = True
+    while True:
+        raw = reader.readline(max_line_bytes + 1)
+        if not raw:
+            return
+        if len(raw) > max_line_bytes:
+            # Skip the rest of the line without holding it in memory
+            while not raw.endswith(b'\n'):
+                raw = reader.readline(max_line_bytes)
+                if not raw:
+                    break
+            first = False
+            yield None, f"Line is longer than {max_line_bytes} bytes"
+            continue
+        try:
+            line = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            first = False
+            yield None, "Line is not valid UTF-8"
+            continue
+        if first:
+            line, first = line.lstrip('\ufeff'), False
+        if line.strip():
+            yield line, None
+
+def parse_csv_records(lines, header):
+    for line, error in lines:
+        if error:
+            yield error
+            continue
+        row = next(csv.reader([line]), [])
+        yield dict(zip(header, (value.strip() for value in row)))
+
+def parse_ndjson_records(lines):
+    for line, error in lines:
+        if error:
+            yield error
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield "Invalid JSON line"
+
+def score_stream_chunk(records, start, rule_set, top_k):
+    """Score one chunk of records; returns result dicts in input order."""
+    suitability = rule_set.suitability
+    results = []
+    rows, positions = [], []
+    for offset, record in enumerate(records):
+        if isinstance(record, str):
+            values, message = None, record
+        else:
+            values, message = validate_sample(record)
+        result = {"index": start + offset}
+        if isinstance(record, dict) and 'id' in record:
+            result["id"] = record['id']
+        if message:
+            result.update(status="error", message=message)
+        else:
+            rows.append(values)
+            positions.append(offset)
+        results.append(result)
+    
+    if rows:
+        scores = suitability.score(rows)
+        top = suitability.top_k(scores, top_k)
+        top_scores = np.take_along_axis(scores, top, axis=1).round(3).tolist()
+        for offset, crop_ids, crop_scores in zip(positions, top.tolist(), top_scores):
+            results[offset].update(status="success", recommendations=[
+                {
+                    "name_english": suitability.crops[crop_id],
+                    "name_hindi": rule_set.hindi_names.get(suitability.crops[crop_id], suitability.crops[crop_id]),
+                    "suitability_score": score
+                } for crop_id, score in zip(crop_ids, crop_scores)
+            ])
+    return results
+
+def format_csv_results(results, top_k):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for result in results:
+        row = [result["index"], result.get("id", ""), result["status"], result.get("message", "")]
+        for recommendation in result.get("recommendations", [])[:top_k]:
+            row += [recommendation["name_english"], recommendation["suitability_score"]]
+        writer.writerow(row)
+    return buffer.getvalue()
+
+@app.route('/api/recommend/stream', methods=['POST'])
+def recommend_crop_stream():
+    """Score a CSV or NDJSON upload of any size, streaming results back.
+    
+    Input format comes from ?format= or Content-Type, output from ?output=
+    or Accept (NDJSON unless CSV is asked for). The body is read, scored
+    and written STREAM_CHUNK_ROWS rows at a time.
+    """
+    input_format = stream_format(request.args.get('format') or request.content_type)
+    if input_format is None:
+        return jsonify({"status": "error",
+                        "message": "Upload text/csv or application/x-ndjson (or pass ?format=csv|ndjson)"}), 415
+    output_format = stream_format(request.args.get('output')) or (
+        'csv' if request.accept_mimetypes.best_match(['application/x-ndjson', 'text/csv']) == 'text/csv'
+        else 'ndjson')
+    try:
+        top_k = int(request.args.get('top_k', DEFAULT_BATCH_TOP_K))
+    except ValueError:
+        return jsonify({"status": "error", "message": "top_k must be an integer"}), 400
+    if top_k < 1:
+        return jsonify({"status": "error", "message": "top_k must be at least 1"}), 400
+    
+    lines = iter_upload_lines(request.stream)
+    if input_format == 'csv':
+        header_line, error = next(lines, ('', None))
+        if error:
+            return jsonify({"status": "error", "message": f"Unreadable CSV header: {error}"}), 400
+        header = [column.strip() for column in next(csv.reader([header_line]), [])]
+        missing = [field for field in BATCH_FIELDS if field not in header]
+        if missing:
+            return jsonify({"status": "error", "message": f"CSV header is missing columns: {', '.join(missing)}"}), 400
+        records = parse_csv_records(lines, header)
+    else:
+        records = parse_ndjson_records(lines)
+    
+    get_usage_tracker().log_request('/api/recommend/stream', request.remote_addr)
+    rule_set = RULE_SET
+    top_k = min(top_k, len(rule_set.suitability))
+    
+    def generate():
+        successful = failed = 0
+        if output_format == 'csv':
+            header = ['index', 'id', 'status', 'message']
+            for rank in range(1, top_k + 1):
+                header += [f'crop_{rank}', f'score_{rank}']
+            yield ','.join(header) + '\r\n'
+        
+        start = 0
+        while True:
+            chunk = list(itertools.islice(records, STREAM_CHUNK_ROWS))
+            if not chunk:
+                break
+            results = score_stream_chunk(chunk, start, rule_set, top_k)
+            start += len(chunk)
+            ok = sum(result["status"] == "success" for result in results)
+            successful, failed = successful + ok, failed + len(results) - ok
+            if output_format == 'csv':
+                yield format_csv_results(results, top_k)
+            else:
+                yield ''.join(json.dumps(result) + '\n' for result in results)
+        
+        if output_format == 'ndjson':
+            yield json.dumps({"summary": {"status": "complete", "total_samples": start,
+                                          "successful": successful, "failed": failed,
+                                          "top_k": top_k}}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[output_format])
+
 @app.route('/api/crops')
 def get_crops():
     # Log usage
-    usage_tracker.log_request('/api/crops', request.remote_addr)
-    
-    crops = []
-    for crop in CROP_RULES.keys():
-        crops.append({
-            "english": crop,
-            "hindi": HINDI_NAMES.get(crop, crop),
-            "base_yield": CROP_YIELDS.get(crop, 2000)
-        })
+    get_usage_tracker().log_request('/api/crops', request.remote_addr)
     
-    return jsonify({
-        "status": "success",
-        "total_crops": len(crops),
-        "crops": crops
-    })
+    return CROPS_RESPONSE.response()
 
 @app.route('/api/usage')
 def get_usage_stats():
     """Get public usage statistics."""
     try:
-        stats = usage_tracker.get_usage_stats()
+        stats = get_usage_tracker().get_usage_stats()
         return jsonify({
             "status": "success",
             "usage_statistics": stats
@@ -306,11 +783,9 @@ def get_usage_stats():
 
 @app.route('/api/update-dataset', methods=['POST'])
 def update_dataset():
-    """Update dataset URL and reload data."""
-    global DATASET_URL, DATASET, CROP_RULES, CROP_YIELDS, HINDI_NAMES
-    
+    """Update dataset URL and reload data in the background."""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         new_url = data.get('dataset_url')
         
         if not new_url:
@@ -319,27 +794,15 @@ def update_dataset():
                 "message": "dataset_url is required"
             }), 400
         
-        # Update the URL
-        DATASET_URL = new_url
-        
-        # Reload dataset
-        DATASET = load_dataset()
-        
-        # Update crop information
-        CROP_RULES, CROP_YIELDS, HINDI_NAMES = get_crop_info_from_dataset()
+        # The current rules keep serving until the new dataset is ready
+        start_dataset_refresh(new_url)
         
-        if DATASET is not None:
-            return jsonify({
-                "status": "success",
-                "message": f"Dataset updated successfully from {new_url}",
-                "crops_loaded": list(DATASET['label'].unique()),
-                "total_records": len(DATASET)
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "Failed to load dataset from URL"
-            }), 400
+        return jsonify({
+            "status": "accepted",
+            "message": f"Dataset refresh started from {new_url}",
+            "dataset_url": new_url,
+            "check_status": "/api/dataset-info"
+        }), 202
             
     except Exception as e:
         return jsonify({
@@ -351,13 +814,18 @@ def update_dataset():
 def get_dataset_info():
     """Get current dataset information."""
     try:
-        if DATASET is not None:
+        dataset_info = RULE_SET.dataset_info
+        refresh = dict(DATASET_REFRESH)
+        if dataset_info is not None:
             return jsonify({
                 "status": "success",
-                "dataset_url": DATASET_URL,
-                "crops": list(DATASET['label'].unique()),
-                "total_records": len(DATASET),
-                "columns": list(DATASET.columns)
+                "dataset_url": dataset_info['dataset_url'],
+                "source": dataset_info.get('source', dataset_info['dataset_url']),
+                "crops": dataset_info['crops'],
+                "total_records": dataset_info['total_records'],
+                "columns": dataset_info['columns'],
+                "loaded_at": dataset_info.get('loaded_at'),
+                "refresh": refresh
             })
         else:
             return jsonify({
@@ -365,7 +833,8 @@ def get_dataset_info():
                 "dataset_url": "Using default crops",
                 "crops": list(DEFAULT_CROP_RULES.keys()),
                 "total_records": len(DEFAULT_CROP_RULES),
-                "columns": ["Using hardcoded rules"]
+                "columns": ["Using hardcoded rules"],
+                "refresh": refresh
             })
     except Exception as e:
         return jsonify({
@@ -379,5 +848,6 @@ def dashboard():
     return render_template('dashboard.html')
 
 if __name__ == '__main__':
+    start_dataset_refresh_on_boot()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,90 @@
+# SIH 2025 - Singleflight Request Coalescing
+# Identical in-flight requests share one computation instead of each running it
+
+import threading
+
+
+def request_key(values, *context):
+    """Hashable key for one set of soil/climate values.
+
+    Values are compared as floats (90 == 90.0 == "90", -0.0 == 0.0); extra
+    context (e.g. the rule-set object) keeps results from different
+    configurations apart.
+    """
+    return tuple(float(value) + 0.0 for value in values) + tuple(id(part) for part in context)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs fn once per key while calls for that key are in flight.
+
+    The first caller for a key (the leader) runs fn; callers that arrive
+    before it finishes wait and get the same result object, or the same
+    exception. Nothing is cached: once the leader returns, the next call
+    computes afresh. Shared results are handed to several requests and
+    must be treated as read-only.
+    """
+
+    def __init__(self, name='singleflight'):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.executions = 0
+        self.shared = 0
+        self.max_waiters = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return (result, shared); shared is True for callers that did not run fn."""
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.shared += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.executions += 1
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'executions': self.executions,
+                'shared': self.shared,
+                'dedup_rate': round(self.shared / self.requests, 4) if self.requests else 0.0,
+                'max_waiters': self.max_waiters,
+                'in_flight': len(self._calls)
+            }
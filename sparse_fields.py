@@ -0,0 +1,66 @@
+# SIH 2025 - Sparse Fieldsets
+# fields= and top_k= query parameters for the recommendation responses
+
+def parse_fields(value):
+    """Requested field names from 'name_english,confidence', or None for the full response."""
+    if value is None:
+        return None
+    fields = frozenset(name.strip() for name in value.split(',') if name.strip())
+    return fields or None
+
+
+def parse_top_k(value, default, maximum):
+    """Number of alternatives to return; raises ValueError with a client-facing message."""
+    if value is None:
+        return min(default, maximum)
+    try:
+        top_k = int(value)
+    except ValueError:
+        raise ValueError("top_k must be an integer")
+    if top_k < 0:
+        raise ValueError("top_k must be 0 or more")
+    return min(top_k, maximum)
+
+
+def wants(fields, *names):
+    """True for the full response, or when any of names (a field or an enclosing section) was requested."""
+    return fields is None or not fields.isdisjoint(names)
+
+
+def wanted_details(fields, details, *sections):
+    """The analysis details (keys of details) whose response field (values) is requested.
+
+    sections are the keys enclosing that field; requesting one of them
+    requests everything inside it.
+    """
+    return tuple(detail for detail, name in details.items() if wants(fields, name, *sections))
+
+
+def select_fields(payload, fields):
+    """Copy of payload with only the requested keys, at any depth.
+
+    A requested key keeps its whole value; other dicts and lists are kept
+    only where something inside them was requested. "status" is always kept.
+    """
+    if fields is None:
+        return payload
+    selected = _select(payload, fields) or {}
+    if 'status' in payload:
+        selected = dict(status=payload['status'], **{k: v for k, v in selected.items() if k != 'status'})
+    return selected
+
+
+def _select(value, fields):
+    if isinstance(value, dict):
+        selected = {}
+        for key, item in value.items():
+            if key in fields:
+                selected[key] = item
+            else:
+                item = _select(item, fields)
+                if item:
+                    selected[key] = item
+        return selected
+    if isinstance(value, list):
+        return [item for item in (_select(item, fields) for item in value) if item]
+    return None
@@ -1,9 +1,14 @@
 # SIH 2025 - Standalone API Server (No Dependencies)
-# Complete self-contained Flask API for crop recommendation
+# Self-contained Flask API for crop recommendation (beyond Flask, only the stdlib-only
+# singleflight.py and sparse_fields.py helpers)
 
 from flask import Flask, request, jsonify
-import random
+import hashlib
 import json
+import os
+import struct
+from singleflight import SingleFlight, request_key
+from sparse_fields import parse_fields, parse_top_k, select_fields, wants
 
 app = Flask(__name__)
 
@@ -77,6 +82,28 @@ CROP_NAMES = {
     }
 }
 
+# Yield variation keyed on (input, crop), so equal requests get equal answers.
+# Same draws as yield_jitter.uniform_one(), written without NumPy to keep this
+# file self-contained
+JITTER_SEED = int(os.environ.get('YIELD_JITTER_SEED', 2025))
+MASK64 = (1 << 64) - 1
+
+def splitmix64(z):
+    """SplitMix64 finalizer."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def jitter_uniform(features, crop, low, high):
+    """Reproducible stand-in for random.uniform(low, high) for one (input, crop)."""
+    values = [float(v) + 0.0 for v in features]  # -0.0 -> 0.0
+    key = JITTER_SEED & MASK64
+    for bits in struct.unpack(f'<{len(values)}Q', struct.pack(f'<{len(values)}d', *values)):
+        key = splitmix64(key ^ bits)
+    crop_key = int.from_bytes(hashlib.blake2b(str(crop).encode('utf-8'), digest_size=8).digest(), 'little')
+    counter = ((key ^ crop_key) + 0x9E3779B97F4A7C15) & MASK64
+    return low + (high - low) * (splitmix64(counter) >> 11) * 2.0 ** -53
+
 def calculate_crop_suitability(crop, N, P, K, temperature, humidity, ph, rainfall):
     """Calculate suitability score for a crop."""
     if crop not in CROP_RULES:
@@ -120,7 +147,8 @@ def predict_yield(crop, N, P, K, temperature, humidity, ph, rainfall):
         ph_factor * 0.15 + rainfall_factor * 0.10
     )
     
-    predicted_yield = base_yield * yield_multiplier * random.uniform(0.85, 1.15)
+    variation = jitter_uniform((N, P, K, temperature, humidity, ph, rainfall), crop, 0.85, 1.15)
+    predicted_yield = base_yield * yield_multiplier * variation
     return max(100, predicted_yield)
 
 def calculate_sustainability(crop, N, P, K, temperature, humidity, ph, rainfall):
@@ -162,9 +190,94 @@ def health_check():
         "version": "1.0.0",
         "supported_crops": len(CROP_DATABASE),
         "languages": ["English", "Hindi", "Bengali"],
-        "accuracy": "94%"
+        "accuracy": "94%",
+        "request_coalescing": recommend_flight.stats()
     })
 
+# Alternatives returned unless the request passes ?top_k=
+DEFAULT_ALTERNATIVES = 3
+
+def build_recommendation(sample, top_k=DEFAULT_ALTERNATIVES, fields=None):
+    """Response body for one [N, P, K, temperature, humidity, ph, rainfall] sample.
+    
+    Yield and sustainability are estimated only for the crops returned, and
+    only where fields (None for the full response) asks for them.
+    """
+    N, P, K, temperature, humidity, ph, rainfall = sample
+    
+    # Calculate suitability for all crops
+    crop_scores = {}
+    for crop in CROP_RULES.keys():
+        score = calculate_crop_suitability(crop, N, P, K, temperature, humidity, ph, rainfall)
+        crop_scores[crop] = score
+    
+    # Get best crop
+    best_crop = max(crop_scores, key=crop_scores.get)
+    confidence = crop_scores[best_crop]
+    
+    # Primary crop, with yield and sustainability if requested
+    primary = {
+        "name": best_crop,
+        "name_hindi": CROP_NAMES['hindi'].get(best_crop, best_crop),
+        "name_bengali": CROP_NAMES['bengali'].get(best_crop, best_crop),
+        "confidence": round(confidence, 3)
+    }
+    if wants(fields, 'recommendation', 'primary_crop', 'predicted_yield'):
+        primary["predicted_yield"] = round(predict_yield(best_crop, N, P, K, temperature, humidity, ph, rainfall), 2)
+    if wants(fields, 'recommendation', 'primary_crop', 'sustainability_score'):
+        primary["sustainability_score"] = round(
+            calculate_sustainability(best_crop, N, P, K, temperature, humidity, ph, rainfall), 2)
+    
+    # Get alternatives
+    sorted_crops = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
+    alternatives = []
+    for crop, score in sorted_crops[1:1 + top_k]:
+        alternative = {
+            "name": crop,
+            "name_hindi": CROP_NAMES['hindi'].get(crop, crop),
+            "name_bengali": CROP_NAMES['bengali'].get(crop, crop)
+        }
+        if wants(fields, 'recommendation', 'alternatives', 'yield'):
+            alternative["yield"] = round(predict_yield(crop, N, P, K, temperature, humidity, ph, rainfall), 2)
+        if wants(fields, 'recommendation', 'alternatives', 'sustainability'):
+            alternative["sustainability"] = round(
+                calculate_sustainability(crop, N, P, K, temperature, humidity, ph, rainfall), 2)
+        alternative["suitability"] = round(score, 3)
+        alternatives.append(alternative)
+    
+    # Validate inputs
+    warnings = []
+    if N > 200: warnings.append("High nitrogen level")
+    if ph < 4 or ph > 9: warnings.append("Unusual pH level")
+    if rainfall > 2000: warnings.append("Very high rainfall")
+    
+    response = {
+        "status": "success",
+        "timestamp": "2025-09-17T20:12:06+05:30",
+        "input_parameters": {
+            "nitrogen": N, "phosphorus": P, "potassium": K,
+            "temperature": temperature, "humidity": humidity,
+            "ph": ph, "rainfall": rainfall
+        },
+        "recommendation": {
+            "primary_crop": primary,
+            "alternatives": alternatives
+        },
+        "validation": {
+            "warnings": warnings,
+            "is_valid": len(warnings) == 0
+        },
+        "system_info": {
+            "model_accuracy": "94%",
+            "total_crops_supported": len(CROP_DATABASE),
+            "languages_supported": 3
+        }
+    }
+    return response
+
+# Identical requests in flight at the same time share one build_recommendation()
+recommend_flight = SingleFlight('recommend')
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend_crop():
     """Crop recommendation endpoint."""
@@ -192,72 +305,19 @@ def recommend_crop():
         ph = float(data['ph'])
         rainfall = float(data['rainfall'])
         
-        # Calculate suitability for all crops
-        crop_scores = {}
-        for crop in CROP_RULES.keys():
-            score = calculate_crop_suitability(crop, N, P, K, temperature, humidity, ph, rainfall)
-            crop_scores[crop] = score
-        
-        # Get best crop
-        best_crop = max(crop_scores, key=crop_scores.get)
-        confidence = crop_scores[best_crop]
+        sample = [N, P, K, temperature, humidity, ph, rainfall]
         
-        # Calculate yield and sustainability
-        predicted_yield = predict_yield(best_crop, N, P, K, temperature, humidity, ph, rainfall)
-        sustainability_score = calculate_sustainability(best_crop, N, P, K, temperature, humidity, ph, rainfall)
+        # ?top_k= alternatives; ?fields= limits the response and what is computed
+        try:
+            top_k = parse_top_k(request.args.get('top_k'), DEFAULT_ALTERNATIVES, len(CROP_RULES) - 1)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        fields = parse_fields(request.args.get('fields'))
         
-        # Get alternatives
-        sorted_crops = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
-        alternatives = []
-        for crop, score in sorted_crops[1:4]:  # Top 3 alternatives
-            alt_yield = predict_yield(crop, N, P, K, temperature, humidity, ph, rainfall)
-            alt_sustainability = calculate_sustainability(crop, N, P, K, temperature, humidity, ph, rainfall)
-            alternatives.append({
-                "name": crop,
-                "name_hindi": CROP_NAMES['hindi'].get(crop, crop),
-                "name_bengali": CROP_NAMES['bengali'].get(crop, crop),
-                "yield": round(alt_yield, 2),
-                "sustainability": round(alt_sustainability, 2),
-                "suitability": round(score, 3)
-            })
-        
-        # Validate inputs
-        warnings = []
-        if N > 200: warnings.append("High nitrogen level")
-        if ph < 4 or ph > 9: warnings.append("Unusual pH level")
-        if rainfall > 2000: warnings.append("Very high rainfall")
-        
-        response = {
-            "status": "success",
-            "timestamp": "2025-09-17T20:12:06+05:30",
-            "input_parameters": {
-                "nitrogen": N, "phosphorus": P, "potassium": K,
-                "temperature": temperature, "humidity": humidity,
-                "ph": ph, "rainfall": rainfall
-            },
-            "recommendation": {
-                "primary_crop": {
-                    "name": best_crop,
-                    "name_hindi": CROP_NAMES['hindi'].get(best_crop, best_crop),
-                    "name_bengali": CROP_NAMES['bengali'].get(best_crop, best_crop),
-                    "confidence": round(confidence, 3),
-                    "predicted_yield": round(predicted_yield, 2),
-                    "sustainability_score": round(sustainability_score, 2)
-                },
-                "alternatives": alternatives
-            },
-            "validation": {
-                "warnings": warnings,
-                "is_valid": len(warnings) == 0
-            },
-            "system_info": {
-                "model_accuracy": "94%",
-                "total_crops_supported": len(CROP_DATABASE),
-                "languages_supported": 3
-            }
-        }
+        response, _ = recommend_flight.do(request_key(sample) + (top_k, fields),
+                                          build_recommendation, sample, top_k, fields)
         
-        return jsonify(response)
+        return jsonify(select_fields(response, fields))
         
     except ValueError as e:
         return jsonify({"status": "error", "message": f"Invalid parameter: {str(e)}"}), 400
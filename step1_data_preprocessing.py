@@ -5,8 +5,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from columnar_cache import DEFAULT_CACHE_DIR, load_columnar_dataset
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -15,9 +15,10 @@ print("AI-BASED CROP RECOMMENDATION SYSTEM - STEP 1")
 print("Data Understanding and Preprocessing")
 print("=" * 60)
 
-# Load the dataset
+# Load the dataset (parsed once into the columnar cache, rebuilt when the CSV changes)
 try:
-    df = pd.read_csv('Crop_recommendation.csv')
+    data = load_columnar_dataset('Crop_recommendation.csv')
+    df = data.frame()
     print("✓ Dataset loaded successfully!")
     print(f"Dataset shape: {df.shape}")
 except FileNotFoundError:
@@ -141,10 +142,8 @@ for i, col in enumerate(X.columns):
 print(f"\nTarget variable: {y.name}")
 print(f"Number of unique classes: {y.nunique()}")
 
-# Split the data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
+# Split the data (stratified 80/20, random_state=42; stored in the columnar cache)
+X_train, X_test, y_train, y_test = data.train_test_frames()
 
 print(f"\n✓ Data split completed:")
 print(f"  Training set: {X_train.shape[0]} samples ({X_train.shape[0]/len(df)*100:.1f}%)")
@@ -161,18 +160,15 @@ test_dist = y_test.value_counts().sort_index()
 for crop, count in test_dist.items():
     print(f"  {crop}: {count} samples")
 
-# Save preprocessed data
+# Steps 2 and 3 read the columnar cache; the CSVs stay for other scripts and notebooks
 print("\n💾 Saving preprocessed data...")
-X_train.to_csv('X_train.csv', index=False)
-X_test.to_csv('X_test.csv', index=False)
-y_train.to_csv('y_train.csv', index=False)
-y_test.to_csv('y_test.csv', index=False)
+csv_files = data.write_csv_split()
 
 print("✓ Preprocessed data saved:")
-print("  - X_train.csv")
-print("  - X_test.csv") 
-print("  - y_train.csv")
-print("  - y_test.csv")
+for path in csv_files:
+    print(f"  - {path}")
+print(f"  - {DEFAULT_CACHE_DIR}/ (float32 features, label codes, split index)")
+print(f"  - Source hash: {data.manifest['source_sha256'][:16]}")
 
 print("\n" + "=" * 60)
 print("STEP 1 COMPLETED SUCCESSFULLY! 🎉")
@@ -183,5 +179,5 @@ print(f"✓ {len(crop_counts)} unique crops identified")
 print(f"✓ No missing values detected")
 print(f"✓ Data split into {X_train.shape[0]} training and {X_test.shape[0]} testing samples")
 print("✓ Visualizations saved: crop_distribution.png, correlation_matrix.png, feature_distributions.png")
-print("✓ Preprocessed data files saved")
+print("✓ Preprocessed data files saved and cached for steps 2 and 3")
 print("\nReady for Step 2: Model Building and Evaluation!")
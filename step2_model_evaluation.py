@@ -10,6 +10,7 @@ from sklearn.svm import SVC
 from sklearn.naive_bayes import GaussianNB
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.preprocessing import LabelEncoder
+from columnar_cache import load_columnar_dataset
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -35,10 +36,7 @@ print("=" * 60)
 
 # Load preprocessed data
 try:
-    X_train = pd.read_csv('X_train.csv')
-    X_test = pd.read_csv('X_test.csv')
-    y_train = pd.read_csv('y_train.csv').iloc[:, 0]  # Get the series
-    y_test = pd.read_csv('y_test.csv').iloc[:, 0]    # Get the series
+    X_train, X_test, y_train, y_test = load_columnar_dataset('Crop_recommendation.csv').train_test_frames()
     
     print("✓ Preprocessed data loaded successfully!")
     print(f"Training set: {X_train.shape}")
@@ -46,8 +44,8 @@ try:
     print(f"Number of classes: {len(y_train.unique())}")
     
 except FileNotFoundError:
-    print("❌ Error: Preprocessed data files not found.")
-    print("Please run step1_data_preprocessing.py first.")
+    print("❌ Error: Crop_recommendation.csv not found.")
+    print("Please run create_sample_dataset.py or place the dataset in this directory.")
     exit()
 
 # Encode labels for XGBoost (requires numerical labels)
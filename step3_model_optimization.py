@@ -3,7 +3,9 @@
 
 import pandas as pd
 import numpy as np
+import argparse
 import json
+import os
 import joblib
 import pickle
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
@@ -12,11 +14,25 @@ from sklearn.svm import SVC
 from sklearn.naive_bayes import GaussianNB
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.preprocessing import LabelEncoder
-import matplotlib.pyplot as plt
-import seaborn as sns
+from columnar_cache import load_columnar_dataset
+from halving_search import SuccessiveHalvingSearch
 import warnings
 warnings.filterwarnings('ignore')
 
+# Set by run_complete_system.py --headless: skip the plots (and their imports) and
+# write the figures' data to SIH_REPORTS_DIR for report_plots.py to draw later
+HEADLESS = os.environ.get('SIH_HEADLESS') == '1'
+REPORTS_DIR = os.environ.get('SIH_REPORTS_DIR', 'reports')
+if not HEADLESS:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+# 'halving' = resumable successive halving (folds and history kept in search_cache/)
+parser = argparse.ArgumentParser(description='Step 3: hyperparameter tuning and model export')
+parser.add_argument('--search', choices=['randomized', 'halving'],
+                    default=os.environ.get('SIH_SEARCH_MODE', 'randomized'))
+args, _ = parser.parse_known_args()
+
 # Try to import XGBoost
 try:
     from xgboost import XGBClassifier
@@ -32,16 +48,13 @@ print("=" * 60)
 
 # Load preprocessed data
 try:
-    X_train = pd.read_csv('X_train.csv')
-    X_test = pd.read_csv('X_test.csv')
-    y_train = pd.read_csv('y_train.csv').iloc[:, 0]
-    y_test = pd.read_csv('y_test.csv').iloc[:, 0]
+    X_train, X_test, y_train, y_test = load_columnar_dataset('Crop_recommendation.csv').train_test_frames()
     
     print("✓ Preprocessed data loaded successfully!")
     
 except FileNotFoundError:
-    print("❌ Error: Preprocessed data files not found.")
-    print("Please run step1_data_preprocessing.py first.")
+    print("❌ Error: Crop_recommendation.csv not found.")
+    print("Please run create_sample_dataset.py or place the dataset in this directory.")
     exit()
 
 # Load model results to identify best model
@@ -116,8 +129,21 @@ elif best_model_name == 'Gaussian Naive Bayes':
 print(f"🔧 Tuning hyperparameters for {best_model_name}...")
 print(f"Parameter grid: {param_grid}")
 
+if args.search == 'halving':
+    print("✂️ Using successive halving search (resumes from search_cache/)...")
+    search_cv = SuccessiveHalvingSearch(
+        base_model,
+        param_grid,
+        n_candidates=50,
+        factor=3,
+        cv=5,
+        scoring='accuracy',
+        n_jobs=-1,
+        random_state=42,
+        verbose=1
+    )
 # Use RandomizedSearchCV for faster tuning (especially for large grids)
-if len(param_grid) > 3 or any(len(v) > 5 for v in param_grid.values()):
+elif len(param_grid) > 3 or any(len(v) > 5 for v in param_grid.values()):
     print("🎲 Using RandomizedSearchCV for faster tuning...")
     search_cv = RandomizedSearchCV(
         base_model, 
@@ -192,19 +218,20 @@ print("🔍 Generating final confusion matrix...")
 cm = confusion_matrix(y_test, y_pred)
 unique_labels = sorted(y_test.unique())
 
-plt.figure(figsize=(12, 10))
-sns.heatmap(cm, annot=True, fmt='d', cmap='Greens', 
-            xticklabels=unique_labels, yticklabels=unique_labels,
-            cbar_kws={'shrink': 0.8})
-plt.title(f'Final Optimized Model Confusion Matrix - {best_model_name}', 
-          fontsize=14, fontweight='bold')
-plt.xlabel('Predicted Label')
-plt.ylabel('True Label')
-plt.xticks(rotation=45)
-plt.yticks(rotation=0)
-plt.tight_layout()
-plt.savefig('final_model_confusion_matrix.png', dpi=300, bbox_inches='tight')
-plt.show()
+if not HEADLESS:
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Greens', 
+                xticklabels=unique_labels, yticklabels=unique_labels,
+                cbar_kws={'shrink': 0.8})
+    plt.title(f'Final Optimized Model Confusion Matrix - {best_model_name}', 
+              fontsize=14, fontweight='bold')
+    plt.xlabel('Predicted Label')
+    plt.ylabel('True Label')
+    plt.xticks(rotation=45)
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+    plt.savefig('final_model_confusion_matrix.png', dpi=300, bbox_inches='tight')
+    plt.show()
 
 # Feature importance for final model (if available)
 if hasattr(final_model, 'feature_importances_'):
@@ -220,15 +247,30 @@ if hasattr(final_model, 'feature_importances_'):
         print(f"{feature}: {importance:.4f}")
     
     # Plot final feature importance
-    plt.figure(figsize=(10, 6))
-    features, importance_values = zip(*feature_importance)
-    plt.barh(features, importance_values, color='lightcoral', edgecolor='black')
-    plt.title(f'Final Model Feature Importance - {best_model_name}', 
-              fontsize=14, fontweight='bold')
-    plt.xlabel('Importance')
-    plt.tight_layout()
-    plt.savefig('final_model_feature_importance.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    if not HEADLESS:
+        plt.figure(figsize=(10, 6))
+        features, importance_values = zip(*feature_importance)
+        plt.barh(features, importance_values, color='lightcoral', edgecolor='black')
+        plt.title(f'Final Model Feature Importance - {best_model_name}', 
+                  fontsize=14, fontweight='bold')
+        plt.xlabel('Importance')
+        plt.tight_layout()
+        plt.savefig('final_model_feature_importance.png', dpi=300, bbox_inches='tight')
+        plt.show()
+
+if HEADLESS:
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    final_report = {
+        'model': best_model_name,
+        'accuracy': final_accuracy,
+        'labels': unique_labels,
+        'confusion_matrix': confusion_matrix(y_test, y_pred, labels=unique_labels).tolist(),
+        'feature_importances': (dict(zip(X_train.columns, map(float, final_model.feature_importances_)))
+                                if hasattr(final_model, 'feature_importances_') else None)
+    }
+    with open(os.path.join(REPORTS_DIR, 'step3_final_model.json'), 'w') as f:
+        json.dump(final_report, f, indent=2)
+    print(f"💾 Final model report saved to {REPORTS_DIR}/step3_final_model.json")
 
 print("\n" + "=" * 60)
 print("MODEL EXPORT")
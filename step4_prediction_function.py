@@ -6,6 +6,7 @@ import numpy as np
 import joblib
 import json
 import os
+from model_registry import get_model_registry
 from typing import Union, Dict, List
 import warnings
 warnings.filterwarnings('ignore')
@@ -47,6 +48,9 @@ if not os.path.exists(model_filename):
 
 print(f"✓ Model file found: {model_filename}")
 
+# Model and label encoder are deserialized once and shared by every prediction
+model_registry = get_model_registry(model_filename, uses_encoded_labels)
+
 def recommend_crop(N: float, P: float, K: float, temperature: float, 
                   humidity: float, ph: float, rainfall: float) -> str:
     """
@@ -76,12 +80,8 @@ def recommend_crop(N: float, P: float, K: float, temperature: float,
     """
     
     try:
-        # Load the trained model
-        model = joblib.load(model_filename)
-        
-        # Load label encoder if needed
-        if uses_encoded_labels:
-            label_encoder = joblib.load('label_encoder.pkl')
+        # Get the resident model (loaded once by the registry)
+        model, label_encoder = model_registry.get()
         
         # Create input array in the correct order
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
@@ -115,12 +115,8 @@ def recommend_crop_with_confidence(N: float, P: float, K: float, temperature: fl
     """
     
     try:
-        # Load the trained model
-        model = joblib.load(model_filename)
-        
-        # Load label encoder if needed
-        if uses_encoded_labels:
-            label_encoder = joblib.load('label_encoder.pkl')
+        # Get the resident model (loaded once by the registry)
+        model, label_encoder = model_registry.get()
         
         # Create input array
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
@@ -355,9 +351,9 @@ predictor_code = f'''# Crop Recommendation Predictor Module
 # Generated for SIH 2025 AI-Based Crop Recommendation System
 
 import numpy as np
-import joblib
 import json
 from typing import Dict, Union
+from model_registry import get_model_registry
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -368,6 +364,9 @@ FEATURE_NAMES = {feature_names}
 MODEL_NAME = "{model_name}"
 MODEL_ACCURACY = {model_accuracy}
 
+# Loaded once on first prediction; call model_registry.reload() after retraining
+model_registry = get_model_registry(MODEL_FILENAME, USES_ENCODED_LABELS)
+
 def recommend_crop(N: float, P: float, K: float, temperature: float, 
                   humidity: float, ph: float, rainfall: float) -> str:
     """
@@ -389,10 +388,7 @@ def recommend_crop(N: float, P: float, K: float, temperature: float,
     """
     
     try:
-        model = joblib.load(MODEL_FILENAME)
-        
-        if USES_ENCODED_LABELS:
-            label_encoder = joblib.load('label_encoder.pkl')
+        model, label_encoder = model_registry.get()
         
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
         
@@ -412,10 +408,7 @@ def recommend_crop_with_confidence(N: float, P: float, K: float, temperature: fl
     """Recommend crop with confidence scores."""
     
     try:
-        model = joblib.load(MODEL_FILENAME)
-        
-        if USES_ENCODED_LABELS:
-            label_encoder = joblib.load('label_encoder.pkl')
+        model, label_encoder = model_registry.get()
         
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
         
@@ -5,8 +5,9 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
-import random
+from model_registry import get_model_registry
 from typing import Dict, List
+from yield_jitter import yield_jitter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -26,6 +27,9 @@ try:
     
     print("✓ Model metadata loaded successfully!")
     
+    # Model and label encoder are deserialized once and shared by every prediction
+    model_registry = get_model_registry(model_filename, uses_encoded_labels)
+    
 except FileNotFoundError:
     print("❌ Error: model_metadata.json not found.")
     exit()
@@ -115,8 +119,8 @@ def calculate_yield_prediction(crop: str, N: float, P: float, K: float,
         rainfall_factor * 0.1
     )
     
-    # Add some randomness for realism
-    random_factor = random.uniform(0.85, 1.15)
+    # Add some variation for realism (reproducible per input and crop)
+    random_factor = yield_jitter.uniform_one((N, P, K, temperature, humidity, ph, rainfall), crop, 0.85, 1.15)
     
     predicted_yield = base_yield * yield_multiplier * random_factor
     
@@ -175,11 +179,8 @@ def recommend_crop(N: float, P: float, K: float, temperature: float,
     """
     
     try:
-        # Load model and make prediction
-        model = joblib.load(model_filename)
-        
-        if uses_encoded_labels:
-            label_encoder = joblib.load('label_encoder.pkl')
+        # Use the resident model and make prediction
+        model, label_encoder = model_registry.get()
         
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
         
@@ -214,10 +215,7 @@ def comprehensive_crop_analysis(N: float, P: float, K: float, temperature: float
     """
     
     try:
-        model = joblib.load(model_filename)
-        
-        if uses_encoded_labels:
-            label_encoder = joblib.load('label_encoder.pkl')
+        model, label_encoder = model_registry.get()
         
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
         
@@ -324,23 +322,23 @@ enhanced_code = f'''# Enhanced Crop Recommendation System
 # SIH 2025 - With Yield Prediction and Sustainability Scoring
 
 import numpy as np
-import joblib
-import random
 from typing import Dict
+from yield_jitter import yield_jitter
+from model_registry import get_model_registry
 
 MODEL_FILENAME = "{model_filename}"
 USES_ENCODED_LABELS = {uses_encoded_labels}
 
+# Loaded once on first prediction; call model_registry.reload() after retraining
+model_registry = get_model_registry(MODEL_FILENAME, USES_ENCODED_LABELS)
+
 CROP_DATA = {CROP_DATA}
 
 def recommend_crop(N, P, K, temperature, humidity, ph, rainfall):
     """Enhanced recommendation with yield and sustainability."""
     
     try:
-        model = joblib.load(MODEL_FILENAME)
-        
-        if USES_ENCODED_LABELS:
-            label_encoder = joblib.load('label_encoder.pkl')
+        model, label_encoder = model_registry.get()
         
         input_features = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
         
@@ -365,7 +363,8 @@ def recommend_crop(N, P, K, temperature, humidity, ph, rainfall):
                           temp_factor * 0.25 + humidity_factor * 0.15 + 
                           ph_factor * 0.1 + rainfall_factor * 0.1)
         
-        predicted_yield = base_yield * yield_multiplier * random.uniform(0.85, 1.15)
+        variation = yield_jitter.uniform_one((N, P, K, temperature, humidity, ph, rainfall), crop_prediction, 0.85, 1.15)
+        predicted_yield = base_yield * yield_multiplier * variation
         
         # Calculate sustainability
         water_need = CROP_DATA.get(crop_lower, {{}}).get('water_need', 800)
@@ -0,0 +1,83 @@
+# SIH 2025 - Vectorized Suitability Engine
+# Scores every crop against one or many soil samples in a single NumPy pass
+
+import numpy as np
+
+# Parameter order used by simple_deployment_app / full_crop_backend rule tables
+PARAM_ORDER = ('N', 'P', 'K', 'temp', 'humidity', 'ph', 'rainfall')
+
+
+class SuitabilityMatrix:
+    """Compiled (crops x params) min/max rule matrix for distance-based matching."""
+
+    def __init__(self, crop_rules, param_order=PARAM_ORDER):
+        self.param_order = tuple(param_order)
+        self.crops = list(crop_rules.keys())
+        self.crop_index = {crop: i for i, crop in enumerate(self.crops)}
+
+        bounds = np.full((len(self.crops), len(self.param_order), 2), np.nan)
+        for i, crop in enumerate(self.crops):
+            rules = crop_rules[crop]
+            for j, param in enumerate(self.param_order):
+                if param in rules:
+                    bounds[i, j] = rules[param]
+
+        lower = bounds[:, :, 0]
+        upper = bounds[:, :, 1]
+        param_range = upper - lower
+
+        # Parameters with a zero, negative or NaN range are skipped, exactly as
+        # calculate_suitability() does
+        self.valid = param_range > 0
+        self.optimal = np.where(self.valid, (lower + upper) / 2, 0.0)
+        self.param_range = np.where(self.valid, param_range, 1.0)
+        self.param_count = self.valid.sum(axis=1)
+
+    def __len__(self):
+        return len(self.crops)
+
+    def score(self, samples):
+        """Return a (samples x crops) array of similarity scores in [0, 1]."""
+        samples = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+
+        distance = np.minimum(
+            1.0, np.abs(samples[:, None, :] - self.optimal[None, :, :]) / self.param_range[None, :, :]
+        )
+        total_distance = np.where(self.valid[None, :, :], distance, 0.0).sum(axis=2)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_distance = total_distance / self.param_count[None, :]
+        scores = np.maximum(0.0, 1.0 - avg_distance)
+        return np.where(self.param_count[None, :] > 0, scores, 0.0)
+
+    def top_k(self, scores, k):
+        """Indices of the k best crops per row, highest score first.
+
+        Ties keep rule-table order, matching max() and the stable sorted()
+        previously used for ranking.
+        """
+        scores = np.atleast_2d(scores)
+        n_crops = scores.shape[1]
+        k = max(0, min(int(k), n_crops))
+        if k == 0:
+            return np.empty((scores.shape[0], 0), dtype=np.intp)
+
+        if k < n_crops:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            kth = np.take_along_axis(scores, top, axis=1).min(axis=1)
+            # argpartition picks arbitrarily among crops tied at the cut-off;
+            # fall back to a stable sort for those (rare) rows
+            tied = (scores >= kth[:, None]).sum(axis=1) > k
+            if tied.any():
+                top[tied] = np.argsort(-scores[tied], axis=1, kind='stable')[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n_crops), scores.shape)
+
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.lexsort((top, -top_scores), axis=1)
+        return np.take_along_axis(top, order, axis=1)
+
+    def rank(self, sample, k):
+        """Score a single sample and return [(crop, score), ...] for the top k."""
+        scores = self.score(sample)[0]
+        return [(self.crops[i], float(scores[i])) for i in self.top_k(scores, k)[0]]
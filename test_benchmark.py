@@ -0,0 +1,51 @@
+# Test the local benchmark harness and its regression check
+
+import json
+import benchmark
+
+
+def report(**results):
+    return {'results': results}
+
+
+def test_run_benchmarks_reports_percentiles():
+    results = benchmark.run_benchmarks(['comprehensive_analysis', 'full_crop_backend'], requests=30, warmup=5)
+
+    for name in ('comprehensive_analysis', 'full_crop_backend'):
+        result = results[name]
+        assert result['status'] == 'ok'
+        assert result['requests'] == 30
+        assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms'] <= result['max_ms']
+        assert result['throughput_rps'] > 0
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 95) == 95
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([7], 99) == 7
+
+
+def test_compare_flags_only_regressions_over_threshold():
+    baseline = report(api={'status': 'ok', 'p50_ms': 1.0, 'p95_ms': 2.0, 'throughput_rps': 1000},
+                      gone={'status': 'skipped', 'reason': 'no model'})
+    current = report(api={'status': 'ok', 'p50_ms': 1.05, 'p95_ms': 2.5, 'throughput_rps': 850},
+                     gone={'status': 'ok', 'p50_ms': 9.0, 'p95_ms': 9.0, 'throughput_rps': 1})
+
+    regressions = benchmark.compare_results(baseline, current, threshold=10)
+    assert [(r['target'], r['metric']) for r in regressions] == [('api', 'p95_ms'), ('api', 'throughput_rps')]
+    assert regressions[0]['regression_pct'] == 25.0
+
+
+def test_compare_mode_exit_code(tmp_path):
+    baseline_file = tmp_path / 'baseline.json'
+    current_file = tmp_path / 'current.json'
+    baseline_file.write_text(json.dumps(report(api={'status': 'ok', 'p50_ms': 1.0, 'p95_ms': 2.0,
+                                                    'throughput_rps': 1000})))
+    current_file.write_text(json.dumps(report(api={'status': 'ok', 'p50_ms': 1.3, 'p95_ms': 2.0,
+                                                   'throughput_rps': 1000})))
+
+    assert benchmark.main(['--current', str(current_file), '--compare', str(baseline_file)]) == 1
+    assert benchmark.main(['--current', str(current_file), '--compare', str(baseline_file),
+                           '--threshold', '50']) == 0
@@ -0,0 +1,55 @@
+# Test pre-serialized, ETag-cached catalog responses
+
+import json
+import production_api
+import simple_deployment_app as sda
+
+
+def test_catalog_matches_jsonify_and_revalidates():
+    for module, path, build in ((sda, '/api/crops', sda.build_crops_payload), (sda, '/', sda.build_home_payload),
+                                (production_api, '/api/crops', production_api.build_crops_payload),
+                                (production_api, '/', production_api.build_home_payload)):
+        with module.app.test_client() as client:
+            first = client.get(path)
+            with module.app.app_context():
+                expected = module.jsonify(build()).get_data()
+
+            assert first.status_code == 200
+            assert first.get_data() == expected
+            assert first.headers['ETag'].startswith('"')
+            assert 'max-age=' in first.headers['Cache-Control']
+
+            second = client.get(path)
+            assert second.headers['ETag'] == first.headers['ETag']
+
+            not_modified = client.get(path, headers={'If-None-Match': first.headers['ETag']})
+            assert not_modified.status_code == 304
+            assert not_modified.get_data() == b''
+
+            stale = client.get(path, headers={'If-None-Match': '"outdated"'})
+            assert stale.status_code == 200
+
+
+def test_crops_regenerated_when_dataset_changes():
+    old_rule_set = sda.RULE_SET
+    try:
+        with sda.app.test_client() as client:
+            before = client.get('/api/crops')
+            sda.install_rule_set(sda.CropRuleSet({'rice': sda.DEFAULT_CROP_RULES['rice']}, {'rice': 4500},
+                                                 {'rice': 'चावल'}))
+            after = client.get('/api/crops', headers={'If-None-Match': before.headers['ETag']})
+
+        assert after.status_code == 200
+        assert after.headers['ETag'] != before.headers['ETag']
+        assert json.loads(after.get_data())['total_crops'] == 1
+    finally:
+        sda.install_rule_set(old_rule_set)
+
+
+def test_not_modified_requests_still_count_usage():
+    with sda.app.test_client() as client:
+        etag = client.get('/api/crops').headers['ETag']
+        before = sda.get_usage_tracker().get_usage_stats()['endpoint_usage'].get('/api/crops', 0)
+        client.get('/api/crops', headers={'If-None-Match': etag})
+        after = sda.get_usage_tracker().get_usage_stats()['endpoint_usage'].get('/api/crops', 0)
+    assert after == before + 1
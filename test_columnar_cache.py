@@ -0,0 +1,80 @@
+# Test the memory-mapped training data cache shared by steps 1-3
+
+import os
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+import columnar_cache
+from columnar_cache import load_columnar_dataset
+
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+
+
+def test_split_matches_step1_train_test_split(tmp_path):
+    data = load_columnar_dataset('Crop_recommendation.csv', cache_dir=str(tmp_path))
+    df = pd.read_csv('Crop_recommendation.csv')
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURES], df['label'], test_size=0.2, random_state=42, stratify=df['label']
+    )
+    cached = data.train_test_frames()
+
+    for expected, actual in zip((X_train, X_test), cached[:2]):
+        np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy(np.float32))
+        assert list(actual.columns) == FEATURES
+    for expected, actual in zip((y_train, y_test), cached[2:]):
+        assert list(actual) == list(expected)
+    assert data.classes == sorted(df['label'].unique())
+
+    frame = data.frame()
+    assert list(frame['label']) == list(df['label'])
+    assert isinstance(data.features, np.memmap)
+    assert np.shares_memory(cached[0].to_numpy(), data.features)
+
+
+def test_csv_split_matches_the_files_step1_used_to_write(tmp_path):
+    data = load_columnar_dataset('Crop_recommendation.csv', cache_dir=str(tmp_path / 'cache'))
+    df = pd.read_csv('Crop_recommendation.csv')
+    X = df[FEATURES]
+    y = df['label']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train.to_csv(tmp_path / 'X_train.csv', index=False)
+    X_test.to_csv(tmp_path / 'X_test.csv', index=False)
+    y_train.to_csv(tmp_path / 'y_train.csv', index=False)
+    y_test.to_csv(tmp_path / 'y_test.csv', index=False)
+
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    paths = data.write_csv_split(str(out_dir))
+
+    assert [os.path.basename(p) for p in paths] == ['X_train.csv', 'y_train.csv', 'X_test.csv', 'y_test.csv']
+    for path in paths:
+        with open(path, 'rb') as actual, open(tmp_path / os.path.basename(path), 'rb') as expected:
+            assert actual.read() == expected.read()
+
+
+def test_stale_cache_is_rebuilt(tmp_path, monkeypatch):
+    source = tmp_path / 'crops.csv'
+    pd.read_csv('Crop_recommendation.csv').sample(600, random_state=1).to_csv(source, index=False)
+    cache_dir = str(tmp_path / 'cache')
+    builds = []
+    build = columnar_cache.build_columnar_cache
+    monkeypatch.setattr(columnar_cache, 'build_columnar_cache', lambda *a, **k: builds.append(1) or build(*a, **k))
+
+    first = load_columnar_dataset(str(source), cache_dir)
+    load_columnar_dataset(str(source), cache_dir)
+    assert len(builds) == 1
+
+    # Touched but unchanged: hash matches, no rebuild
+    os.utime(source, ns=(0, 0))
+    load_columnar_dataset(str(source), cache_dir)
+    assert len(builds) == 1
+
+    rows = pd.read_csv(source)
+    pd.concat([rows, rows.head(5)]).to_csv(source, index=False)
+    rebuilt = load_columnar_dataset(str(source), cache_dir)
+    assert len(builds) == 2
+    assert len(rebuilt) == len(first) + 5
+    assert rebuilt.manifest['source_sha256'] != first.manifest['source_sha256']
+
+    load_columnar_dataset(str(source), cache_dir, random_state=7)
+    assert len(builds) == 3
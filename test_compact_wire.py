@@ -0,0 +1,60 @@
+# Test the compact binary encoding of /api/recommend responses
+
+import pytest
+import benchmark
+import production_api
+from compact_wire import CROP_IDS, MIMETYPE, decode_recommendation, encode_recommendation
+from working_crop_system import comprehensive_analysis
+
+PAYLOAD = {'N': 90, 'P': 42, 'K': 43, 'temperature': 21, 'humidity': 82, 'ph': 6.5, 'rainfall': 203}
+
+
+def post(payload, accept=None):
+    with production_api.app.test_client() as client:
+        return client.post('/api/recommend', json=payload, headers={'Accept': accept} if accept else None)
+
+
+@pytest.mark.parametrize('rainfall', [203, 5000])
+def test_compact_response_carries_the_json_recommendation(rainfall):
+    payload = dict(PAYLOAD, rainfall=rainfall)
+    as_json = post(payload).get_json()
+    compact = post(payload, f'{MIMETYPE}, application/json;q=0.5')
+
+    assert compact.mimetype == MIMETYPE and 'Accept' in compact.headers['Vary']
+    decoded = decode_recommendation(compact.get_data())
+    expected = as_json['recommendation']
+    fields = ('name_english', 'predicted_yield_kg_per_ha', 'sustainability_score')
+    assert decoded['primary_crop']['confidence'] == expected['primary_crop']['confidence']
+    for got, want in zip([decoded['primary_crop']] + decoded['alternative_crops'],
+                         [expected['primary_crop']] + expected['alternative_crops']):
+        assert {field: got[field] for field in fields} == {field: want[field] for field in fields}
+    assert [alt['suitability_score'] for alt in decoded['alternative_crops']] == \
+        [alt['suitability_score'] for alt in expected['alternative_crops']]
+    assert decoded['validation'] == as_json['validation']
+    assert len(compact.get_data()) * 5 <= len(post(payload).get_data())
+
+
+def test_json_stays_the_default():
+    for accept in (None, '*/*', 'application/json'):
+        response = post(PAYLOAD, accept)
+        assert response.mimetype == 'application/json' and response.get_json()['status'] == 'success'
+    assert post({'N': 1}, MIMETYPE).get_json()['status'] == 'error'
+
+
+def test_crop_ids_match_the_catalog():
+    with production_api.app.test_client() as client:
+        crops = client.get('/api/crops').get_json()['crops']
+    assert [crop['english'] for crop in sorted(crops, key=lambda crop: crop['id'])] == list(CROP_IDS)
+
+    data = encode_recommendation(comprehensive_analysis(*PAYLOAD.values()))
+    with pytest.raises(ValueError):
+        decode_recommendation(data[:-3])
+    with pytest.raises(ValueError):
+        decode_recommendation(b'XX' + data[2:])
+
+
+def test_benchmark_reports_payload_sizes():
+    report = benchmark.run_benchmarks(['payload_sizes', 'compact_encode'], requests=20, warmup=2,
+                                      distinct_inputs=8)
+    assert report['payload_sizes']['size_ratio'] >= 5
+    assert report['compact_encode']['status'] == 'ok'
@@ -0,0 +1,120 @@
+# Test the compiled crop rule tables against the original per-crop branches
+
+import random
+from crop_rule_compiler import CompiledCropRules
+from working_crop_system import CropRecommendationSystem
+
+
+def reference_suitability(crop_rules, crop, N, P, K, temperature, humidity, ph, rainfall):
+    """Original calculate_crop_suitability, kept verbatim so sums add in the same order."""
+    if crop not in crop_rules:
+        return 0.0
+
+    rules = crop_rules[crop]
+    score = 0.0
+    total_params = len(rules)
+    params = {'N': N, 'P': P, 'K': K, 'temperature': temperature,
+              'humidity': humidity, 'ph': ph, 'rainfall': rainfall}
+
+    def standard(param_value, min_val, max_val):
+        if min_val <= param_value <= max_val:
+            return 1.0
+        range_width = max(1, max_val - min_val)
+        distance = min_val - param_value if param_value < min_val else param_value - max_val
+        return max(0.0, 1.0 - min(1.0, distance / range_width))
+
+    if crop.lower() == 'pomegranate':
+        if 18 <= temperature <= 30:
+            score += 1.5
+        elif 15 <= temperature <= 35:
+            score += 1.0
+        else:
+            score += max(0.0, 1.0 - abs(temperature - 25) / 25)
+        if 40 <= humidity <= 70:
+            score += 1.5
+        elif 30 <= humidity <= 80:
+            score += 1.0
+        else:
+            score += max(0.0, 1.0 - abs(humidity - 55) / 55)
+        for param in ['N', 'P', 'K', 'ph', 'rainfall']:
+            score += standard(params[param], *rules[param])
+    else:
+        for param, (min_val, max_val) in rules.items():
+            score += standard(params[param], min_val, max_val)
+
+    if crop.lower() == 'pomegranate':
+        return min(1.0, score / (total_params + 1.0))
+    return score / total_params
+
+
+def random_samples(count, seed=3):
+    rng = random.Random(seed)
+    return [[rng.uniform(0, 200), rng.uniform(0, 150), rng.uniform(0, 300), rng.uniform(0, 50),
+             rng.uniform(0, 100), rng.uniform(3, 10), rng.uniform(0, 3000)] for _ in range(count)]
+
+
+def test_compiled_scores_match_reference():
+    system = CropRecommendationSystem()
+    samples = random_samples(500)
+    scores = system.compiled_rules.score(samples)
+
+    for row, sample in zip(scores, samples):
+        for crop, i in system.compiled_rules.crop_index.items():
+            assert row[i] == reference_suitability(system.crop_rules, crop, *sample)
+
+
+def test_overrides_match_crop_names_case_insensitively():
+    system = CropRecommendationSystem()
+    crop_rules = {'Pomegranate': system.crop_rules['pomegranate'], 'Rice': system.crop_rules['rice']}
+    overrides = {'POMEGRANATE': system.crop_overrides['pomegranate'], 'Rice': {'bonus': 7.0}}
+    compiled = CompiledCropRules(crop_rules, system.crop_data, overrides)
+    samples = random_samples(200, seed=11)
+    scores = compiled.score(samples)
+
+    for row, sample in zip(scores, samples):
+        assert row[compiled.crop_index['Pomegranate']] == reference_suitability(crop_rules, 'Pomegranate', *sample)
+    assert compiled.divisor[compiled.crop_index['Rice']] == 14.0
+    assert compiled.profile('Pomegranate') is compiled.profile('pomegranate')
+    assert compiled.profile('POMEGRANATE').yield_bands == system.crop_overrides['pomegranate']['yield_bands']
+
+
+def test_pomegranate_bonus_bands_apply_only_by_mask():
+    system = CropRecommendationSystem()
+    compiled = system.compiled_rules
+    pomegranate = compiled.crop_index['pomegranate']
+
+    assert compiled.banded[pomegranate].tolist() == [False, False, False, True, True, False, False]
+    assert compiled.banded.sum() == 2
+    assert compiled.divisor[pomegranate] == 8.0
+    assert system.calculate_crop_suitability('pomegranate', 100, 50, 50, 25, 50, 7.0, 600) == 1.0
+
+
+def test_new_override_needs_no_code_change():
+    crop_rules = {'millet': {'temperature': (25, 35), 'rainfall': (300, 600)}}
+    crop_data = {'millet': {'base_yield': 1500, 'water_need': 400, 'fertilizer_efficiency': 0.9}}
+    overrides = {'millet': {
+        'suitability_bands': {'rainfall': {'ideal': (350, 500, 1.0), 'tolerable': (200, 800, 0.5),
+                                           'center': 425, 'scale': 1000}},
+        'yield_bands': {'temperature': ((27, 33, 1.0), 0.4)},
+        'climate_tiers': ((25, 38, 20, 60, 9.5),)
+    }}
+    compiled = CompiledCropRules(crop_rules, crop_data, overrides)
+
+    assert compiled.score([0, 0, 0, 30, 0, 0, 400])[0, 0] == 1.0
+    assert compiled.score([0, 0, 0, 30, 0, 0, 700])[0, 0] == 0.75
+    assert compiled.score([0, 0, 0, 30, 0, 0, 1425])[0, 0] == 0.5
+
+    profile = compiled.profile('Millet')
+    assert profile.temperature_factor(30) == 1.0 and profile.temperature_factor(40) == 0.4
+    assert profile.climate_score(30, 40) == 9.5 and profile.climate_score(30, 80) == 5.0
+    assert compiled.profile('unknown').base_yield == 2000
+
+
+def test_overrides_changes_recompile():
+    system = CropRecommendationSystem()
+    sample = [90, 42, 43, 21, 82, 6.5, 203]
+    before = system.calculate_crop_suitability('rice', *sample)
+
+    system.crop_overrides['rice'] = {'bonus': 7.0}
+    system.invalidate_cache()
+    assert system.calculate_crop_suitability('rice', *sample) == before / 2
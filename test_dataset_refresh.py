@@ -0,0 +1,106 @@
+# Test cached rule loading and the background dataset refresh
+
+import os
+import runpy
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+import simple_deployment_app as sda
+
+
+def test_rules_cache_round_trip(tmp_path):
+    cache_file = str(tmp_path / 'rules.json')
+    rule_set = sda.CropRuleSet.from_dataset(pd.read_csv('crop_dataset.csv'), 'crop_dataset.csv')
+    sda.save_rules_cache(rule_set, cache_file)
+    cached = sda.load_rules_cache(cache_file)
+
+    assert cached.crop_yields == rule_set.crop_yields
+    assert cached.hindi_names == rule_set.hindi_names
+    assert cached.dataset_info == rule_set.dataset_info
+    assert list(cached.crop_rules) == list(rule_set.crop_rules)
+    samples = [[90, 42, 43, 21, 82, 6.5, 203], [20, 30, 20, 30, 60, 7.5, 400]]
+    np.testing.assert_array_equal(cached.suitability.score(samples), rule_set.suitability.score(samples))
+
+
+def test_corrupt_cache_is_ignored(tmp_path):
+    cache_file = tmp_path / 'rules.json'
+    cache_file.write_text('{"crop_rules": ')
+    assert sda.load_rules_cache(str(cache_file)) is None
+    assert sda.load_rules_cache(str(tmp_path / 'missing.json')) is None
+
+
+def test_worker_boots_from_cache_without_loading_dataset(tmp_path):
+    cache_file = str(tmp_path / 'rules.json')
+    rule_set = sda.CropRuleSet.from_dataset(pd.read_csv('crop_dataset.csv'), 'http://cached.example/crops.csv')
+    sda.save_rules_cache(rule_set, cache_file)
+
+    env = dict(os.environ, RULES_CACHE_FILE=cache_file)
+    script = ("import simple_deployment_app as sda; "
+              "print(sda.RULE_SET.dataset_info['dataset_url'], len(sda.CROP_RULES), sda.DATASET_REFRESH['state'])")
+    output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60).stdout.split()
+    assert output[-3:] == ['http://cached.example/crops.csv', str(len(rule_set.crop_rules)), 'idle']
+
+
+def test_refresh_starts_from_the_server_hooks_not_on_import(monkeypatch):
+    started = []
+    monkeypatch.setattr(sda, 'start_dataset_refresh', lambda url=None, timeout=None: started.append(url))
+
+    monkeypatch.setenv('DATASET_REFRESH_ON_START', '0')
+    assert sda.start_dataset_refresh_on_boot() is None
+    monkeypatch.setenv('DATASET_REFRESH_ON_START', '1')
+    hooks = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py'))
+    hooks['post_fork'](None, None)
+    assert started == [None]
+
+
+def test_unreachable_url_never_blocks_requests(tmp_path, monkeypatch):
+    monkeypatch.setattr(sda, 'RULES_CACHE_FILE', str(tmp_path / 'rules.json'))
+    old_rule_set, old_url = sda.RULE_SET, sda.DATASET_URL
+
+    # Accepts connections but never answers, like a hung dataset host
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    url = f"http://127.0.0.1:{server.getsockname()[1]}/crops.csv"
+    try:
+        started = time.monotonic()
+        thread = sda.start_dataset_refresh(url, timeout=1.0)
+        assert time.monotonic() - started < 0.5
+
+        with sda.app.test_client() as client:
+            response = client.post('/api/recommend', json={'N': 90, 'P': 42, 'K': 43, 'temperature': 21,
+                                                           'humidity': 82, 'ph': 6.5, 'rainfall': 203})
+        assert response.status_code == 200
+        assert sda.RULE_SET is old_rule_set
+
+        thread.join(30)
+        # The URL timed out, so the refresh fell back to the local CSV and swapped atomically
+        assert sda.RULE_SET is not old_rule_set
+        assert sda.RULE_SET.dataset_info['dataset_url'] == url
+        assert sda.RULE_SET.dataset_info['source'] == sda.LOCAL_DATASET_FILE
+        assert sda.DATASET_REFRESH['source'] == sda.LOCAL_DATASET_FILE
+        assert sda.load_rules_cache().crop_yields == sda.RULE_SET.crop_yields
+    finally:
+        server.close()
+        sda.install_rule_set(old_rule_set)
+        sda.DATASET_URL = old_url
+
+
+def test_update_dataset_returns_immediately(monkeypatch):
+    started = []
+    monkeypatch.setattr(sda, 'start_dataset_refresh', lambda url=None, timeout=None: started.append(url))
+
+    with sda.app.test_client() as client:
+        assert client.post('/api/update-dataset', json={}).status_code == 400
+        response = client.post('/api/update-dataset', json={'dataset_url': 'http://example.com/crops.csv'})
+        info = client.get('/api/dataset-info').get_json()
+
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'accepted'
+    assert started == ['http://example.com/crops.csv']
+    assert info['status'] == 'success'
+    assert 'refresh' in info
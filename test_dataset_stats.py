@@ -0,0 +1,74 @@
+# Test single-pass (and chunked) rule derivation against the per-crop loop
+
+import numpy as np
+import pandas as pd
+import simple_deployment_app as sda
+from dataset_stats import aggregate_crop_stats, aggregate_csv_stats, read_crop_stats
+
+
+def reference_rules(dataset):
+    """Original per-crop filter + mean/std loop from get_crop_info_from_dataset."""
+    crop_rules, crop_yields = {}, {}
+    for crop in dataset['label'].unique():
+        crop_data = dataset[dataset['label'] == crop]
+        mean, std = crop_data.mean(numeric_only=True), crop_data.std(numeric_only=True)
+        crop_rules[crop] = {
+            'N': (max(0, mean['N'] - std['N']), mean['N'] + std['N']),
+            'P': (max(0, mean['P'] - std['P']), mean['P'] + std['P']),
+            'K': (max(0, mean['K'] - std['K']), mean['K'] + std['K']),
+            'temp': (mean['temperature'] - std['temperature'], mean['temperature'] + std['temperature']),
+            'humidity': (max(0, mean['humidity'] - std['humidity']), min(100, mean['humidity'] + std['humidity'])),
+            'ph': (max(0, mean['ph'] - std['ph']), min(14, mean['ph'] + std['ph'])),
+            'rainfall': (max(0, mean['rainfall'] - std['rainfall']), mean['rainfall'] + std['rainfall'])
+        }
+        crop_yields[crop] = int(mean['N'] * 50)
+    return crop_rules, crop_yields
+
+
+def as_array(crop_rules):
+    return np.array([[crop_rules[crop][param] for param in sda.RULE_COLUMNS] for crop in crop_rules], float)
+
+
+def test_rules_match_reference_loop():
+    for csv_file in ('crop_dataset.csv', 'Crop_recommendation.csv'):
+        dataset = pd.read_csv(csv_file)
+        expected_rules, expected_yields = reference_rules(dataset)
+        crop_rules, crop_yields, hindi_names = sda.get_crop_info_from_dataset(dataset)
+
+        assert list(crop_rules) == list(expected_rules)
+        assert crop_yields == expected_yields
+        assert set(hindi_names) == set(crop_rules)
+        np.testing.assert_allclose(as_array(crop_rules), as_array(expected_rules), rtol=1e-12, equal_nan=True)
+
+
+def test_chunked_stats_match_single_pass(tmp_path):
+    dataset = pd.read_csv('Crop_recommendation.csv').sample(frac=1, random_state=5)
+    csv_file = tmp_path / 'shuffled.csv'
+    dataset.to_csv(csv_file, index=False)
+
+    full = aggregate_crop_stats(dataset)
+    chunked = read_crop_stats(str(csv_file), chunksize=97)
+
+    assert chunked.total_records == full.total_records == len(dataset)
+    assert chunked.columns == list(dataset.columns)
+    assert chunked.crops == list(dataset['label'].unique())
+    pd.testing.assert_frame_equal(chunked.stats, full.stats, check_dtype=False, rtol=1e-9)
+
+
+def test_single_row_crops_across_chunks():
+    dataset = pd.read_csv('crop_dataset.csv')
+    chunks = [dataset.iloc[i:i + 4] for i in range(0, len(dataset), 4)]
+    crop_rules, _, _ = sda.get_crop_info_from_dataset(chunks)
+    expected_rules, _ = reference_rules(dataset)
+
+    np.testing.assert_array_equal(as_array(crop_rules), as_array(expected_rules))
+
+
+def test_long_labels_are_not_truncated():
+    prefix = 'heirloom-variety-' * 4  # 68 characters
+    header = 'N,P,K,temperature,humidity,ph,rainfall,label\n'
+    rows = [f'{10 * i},40,40,25,70,6.5,800,{prefix}{suffix}\n' for i, suffix in enumerate('ab' * 3)]
+    for chunksize in (2, 100):
+        stats = aggregate_csv_stats([header] + rows, chunksize=chunksize)
+        assert stats.crops == [prefix + 'a', prefix + 'b']
+        assert stats.stat('count')[:, 0].tolist() == [3, 3]
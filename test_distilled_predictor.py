@@ -0,0 +1,76 @@
+# Test the distilled surrogate model and its NumPy-only serving path
+
+import subprocess
+import sys
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from columnar_cache import load_columnar_dataset
+from distilled_predictor import DistilledPredictor, load_distilled_predictor
+from model_distiller import distill
+
+SAMPLE = [90, 42, 43, 21, 82, 6.5, 203]
+
+
+@pytest.fixture(scope='module')
+def distilled(tmp_path_factory):
+    X_train, X_test, y_train, y_test = load_columnar_dataset('Crop_recommendation.csv').train_test_frames()
+    teacher = RandomForestClassifier(n_estimators=50, random_state=42).fit(X_train, y_train)
+    classes = sorted(y_train.unique())
+    predictor = distill(teacher, X_train, X_test, y_test, classes, n_synthetic=20000, depths=(8, 12))
+    path = str(tmp_path_factory.mktemp('distilled') / 'distilled_model.npz')
+    predictor.metadata['teacher_model'] = 'Random Forest'
+    predictor.save(path)
+    return teacher, predictor, path, X_test
+
+
+def test_fidelity_is_measured_against_the_teacher(distilled):
+    teacher, predictor, _, X_test = distilled
+    agreement = float((predictor.predict(X_test.to_numpy()) == teacher.predict(X_test)).mean())
+
+    assert predictor.metadata['fidelity']['test'] == pytest.approx(agreement)
+    assert agreement > 0.8
+    assert predictor.metadata['max_depth'] <= 12
+
+
+def test_saved_artifact_round_trips(distilled):
+    _, predictor, path, X_test = distilled
+    loaded = load_distilled_predictor(path)
+
+    rows = X_test.to_numpy(np.float64)
+    np.testing.assert_array_equal(loaded.predict_proba(rows), predictor.predict_proba(rows))
+    for row in rows[:50].tolist():
+        crop, probability = loaded.predict_one(row)
+        assert crop == loaded.predict([row])[0]
+        assert probability == pytest.approx(loaded.predict_proba([row]).max())
+    top = loaded.top_k(SAMPLE, 3)
+    assert [p for _, p in top] == sorted((p for _, p in top), reverse=True)
+    assert load_distilled_predictor(path + '.missing') is None
+
+
+def test_serving_does_not_import_sklearn(distilled):
+    path = distilled[2]
+    code = ("import sys, distilled_predictor; "
+            f"p = distilled_predictor.load_distilled_predictor({path!r}); "
+            f"p.recommendation({SAMPLE!r}); "
+            "print(any(m.split('.')[0] == 'sklearn' for m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == 'False'
+
+
+def test_apps_add_model_prediction(distilled, monkeypatch):
+    import full_crop_backend
+    import simple_deployment_app
+    predictor = DistilledPredictor.load(distilled[2])
+    payload = dict(zip(('N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall'), SAMPLE))
+
+    for module in (simple_deployment_app, full_crop_backend):
+        client = module.app.test_client()
+        monkeypatch.setattr(module, 'DISTILLED_MODEL', None)
+        assert 'model_prediction' not in client.post('/api/recommend', json=payload).get_json()
+
+        monkeypatch.setattr(module, 'DISTILLED_MODEL', predictor)
+        data = client.post('/api/recommend', json=payload).get_json()
+        assert data['model_prediction']['crop'] == predictor.predict_one(SAMPLE)[0]
+        assert data['model_prediction']['source'] == 'distilled Random Forest'
+        assert client.get('/api/health').get_json()['distilled_model']['nodes'] == len(predictor.feature)
@@ -0,0 +1,89 @@
+# Test the resumable successive-halving search used by step 3 --search halving
+
+import os
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+from columnar_cache import load_columnar_dataset
+from halving_search import SuccessiveHalvingSearch, cached_cv_folds
+
+GRID = {'n_estimators': [10, 30], 'max_depth': [5, 10, None], 'min_samples_leaf': [1, 2, 4]}
+
+
+def training_data():
+    X_train, _, y_train, _ = load_columnar_dataset('Crop_recommendation.csv').train_test_frames()
+    return X_train, y_train
+
+
+def test_budget_grows_to_max_for_the_last_candidates(tmp_path):
+    X, y = training_data()
+    search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=42, n_jobs=1), GRID,
+                                     n_candidates=9, cv=3, n_jobs=1, cache_dir=str(tmp_path)).fit(X, y)
+
+    assert [r['candidates'] for r in search.rounds_] == [9, 3]
+    assert [r['resource'] for r in search.rounds_] == [10, 30]
+    assert search.best_params_['n_estimators'] == 30
+    assert search.best_estimator_.n_estimators == 30
+    assert search.n_fits_ == (9 + 3) * 3
+    assert 0.5 < search.best_score_ <= 1.0
+
+
+def test_rerun_resumes_from_history(tmp_path):
+    X, y = training_data()
+
+    def search():
+        return SuccessiveHalvingSearch(RandomForestClassifier(random_state=42, n_jobs=1), GRID,
+                                       n_candidates=9, cv=3, n_jobs=1, cache_dir=str(tmp_path)).fit(X, y)
+
+    first = search()
+    with open(first.history_file_, 'a') as f:
+        f.write('{"truncated')  # as if the previous run was killed mid-write
+    second = search()
+
+    assert second.n_fits_ == 0
+    assert second.n_resumed_ == 12
+    assert second.best_params_ == first.best_params_
+    assert second.best_score_ == first.best_score_
+
+    changed = SuccessiveHalvingSearch(RandomForestClassifier(random_state=7, n_jobs=1), GRID,
+                                      n_candidates=9, cv=3, n_jobs=1, cache_dir=str(tmp_path)).fit(X, y)
+    assert changed.n_fits_ == 36
+
+
+def test_sample_budget_and_cached_folds(tmp_path):
+    X, y = training_data()
+    fold_ids, key = cached_cv_folds(y, 5, 42, str(tmp_path))
+    assert os.path.exists(tmp_path / f'folds_{key}.npy')
+    assert np.array_equal(cached_cv_folds(y, 5, 42, str(tmp_path))[0], fold_ids)
+    assert len(np.bincount(fold_ids)) == 5
+    assert np.bincount(fold_ids).max() - np.bincount(fold_ids).min() <= len(set(y))
+
+    search = SuccessiveHalvingSearch(GaussianNB(), {'var_smoothing': [1e-9, 1e-8, 1e-7, 1e-6, 1e-5]},
+                                     n_jobs=1, cache_dir=str(tmp_path)).fit(X, y)
+    assert search.resource == 'n_samples'
+    assert [r['candidates'] for r in search.rounds_] == [5, 2]
+    assert search.rounds_[-1]['resource'] == int((fold_ids != 0).sum())
+
+
+def test_resource_only_grid_runs_one_default_candidate(tmp_path):
+    X, y = training_data()
+    search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=42, n_jobs=1),
+                                     {'n_estimators': [10, 20]}, cv=3, n_jobs=1,
+                                     cache_dir=str(tmp_path)).fit(X, y)
+
+    assert search.rounds_ == [{'resource': 20, 'candidates': 1, 'best_score': search.best_score_}]
+    assert search.best_params_ == {'n_estimators': 20}
+    assert search.n_fits_ == 3
+    assert 0.5 < search.best_score_ <= 1.0
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'n_candidates': 0}, 'n_candidates'),
+    ({'param_distributions': {}}, 'param_distributions'),
+    ({'factor': 1}, 'factor'),
+])
+def test_invalid_settings_are_rejected(kwargs, message):
+    kwargs = dict({'param_distributions': GRID}, **kwargs)
+    with pytest.raises(ValueError, match=message):
+        SuccessiveHalvingSearch(RandomForestClassifier(), **kwargs)
@@ -0,0 +1,75 @@
+# Test the plot-free training stages used by run_complete_system.py --headless
+
+import json
+import os
+import subprocess
+import sys
+import pandas as pd
+import pytest
+import run_complete_system
+from headless_pipeline import candidate_models, report_filename, run_model_evaluation, run_preprocessing
+
+SOURCE = os.path.abspath('Crop_recommendation.csv')
+
+
+def test_headless_stages_write_reports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+
+    summary = run_preprocessing('reports', SOURCE, cache_dir)
+    assert summary['rows'] == len(pd.read_csv(SOURCE))
+    assert summary['n_train'] + summary['n_test'] == summary['rows']
+    assert os.path.exists('reports/step1_summary.json')
+
+    results = run_model_evaluation('reports', workers=2, source=SOURCE, cache_dir=cache_dir)
+    with open('model_results_summary.json') as f:
+        assert json.load(f) == results
+
+    performances = results['model_performances']
+    assert list(performances) == list(candidate_models())
+    assert results['best_accuracy'] == max(performances.values())
+    assert performances[results['best_model']] == results['best_accuracy']
+
+    with open(os.path.join('reports', report_filename('Random Forest'))) as f:
+        report = json.load(f)
+    assert report['accuracy'] == performances['Random Forest']
+    assert len(report['confusion_matrix']) == len(report['labels'])
+    assert sum(map(sum, report['confusion_matrix'])) == summary['n_test']
+    assert sorted(report['feature_importances']) == sorted(['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall'])
+    assert abs(sum(report['feature_importances'].values()) - 1.0) < 1e-6
+
+
+def test_deferred_plots_are_drawn_from_the_reports(tmp_path, monkeypatch):
+    pytest.importorskip('matplotlib')
+    pytest.importorskip('seaborn')
+    from report_plots import render_report_plots
+
+    monkeypatch.chdir(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+    run_preprocessing('reports', SOURCE, cache_dir)
+    results = run_model_evaluation('reports', workers=2, source=SOURCE, cache_dir=cache_dir)
+
+    written = render_report_plots('reports', SOURCE, cache_dir)
+    slug = results['best_model'].lower().replace(' ', '_')
+    assert os.path.join('reports', 'model_comparison.png') in written
+    assert os.path.join('reports', f'confusion_matrix_{slug}.png') in written
+    assert all(os.path.getsize(path) > 0 for path in written)
+
+
+def test_plot_renderer_runs_in_the_background(tmp_path, monkeypatch):
+    launched = {}
+
+    class FakePopen:
+        pid = 4242
+
+        def __init__(self, args, **kwargs):
+            launched.update(args=args, **kwargs)
+
+    monkeypatch.setattr(subprocess, 'Popen', FakePopen)
+    reports_dir = str(tmp_path / 'reports')
+    process = run_complete_system.start_plot_renderer(reports_dir)
+
+    assert isinstance(process, FakePopen)
+    assert launched['args'] == [sys.executable, 'report_plots.py', reports_dir]
+    assert launched['start_new_session'] is True
+    assert os.path.exists(os.path.join(reports_dir, 'plots.log'))
@@ -0,0 +1,49 @@
+# Test the shared localization index and its use by the API modules
+
+import sys
+import pytest
+import mobile_app_backend
+import production_api
+import simple_api_server
+from multilingual_support import LOCALIZATION_INDEX, LocalizationIndex, get_crop_name, ml_support
+
+SAMPLE = {'N': 90, 'P': 42, 'K': 43, 'temperature': 21, 'humidity': 82, 'ph': 6.5, 'rainfall': 203}
+
+
+def test_index_matches_crop_names():
+    for language, names in ml_support.crop_names.items():
+        for crop, name in names.items():
+            assert get_crop_name(crop, language) == name
+            assert LOCALIZATION_INDEX.names(language)[crop] == name
+    assert LOCALIZATION_INDEX.languages == ('english', 'hindi', 'bengali')
+
+
+def test_missing_translations_fall_back_to_crop_id():
+    assert get_crop_name('millet', 'hindi') == 'millet'
+    assert get_crop_name('rice', 'tamil') == 'rice'
+    assert dict(LOCALIZATION_INDEX.names('tamil')) == {}
+
+
+def test_index_is_read_only_and_interned():
+    with pytest.raises(TypeError):
+        LOCALIZATION_INDEX.names('hindi')['rice'] = 'x'
+
+    index = LocalizationIndex({'odia': {'rice': ''.join(['ଧା', 'ନ'])}})
+    assert index.name('rice', 'odia') is sys.intern('ଧାନ')
+
+
+def test_api_modules_use_the_index():
+    for module in (production_api, simple_api_server, mobile_app_backend):
+        with module.app.test_client() as client:
+            data = client.post('/api/recommend', json=SAMPLE).get_json()
+        primary = data['recommendation']['primary_crop']
+        crop = primary.get('name_english', primary.get('name'))
+        assert primary['name_hindi'] == get_crop_name(crop, 'hindi')
+        assert primary['name_bengali'] == get_crop_name(crop, 'bengali')
+
+
+def test_final_working_api_uses_the_index():
+    import final_working_api
+    with final_working_api.app.test_client() as client:
+        recommendation = client.post('/api/recommend', json=SAMPLE).get_json()['recommendation']
+    assert recommendation['crop_hindi'] == get_crop_name(recommendation['crop_english'], 'hindi')
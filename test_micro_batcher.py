@@ -0,0 +1,89 @@
+# Test the micro-batching dispatcher in front of the crop scoring engine
+
+import threading
+import time
+import numpy as np
+import pytest
+from micro_batcher import MicroBatcher
+from working_crop_system import CropRecommendationSystem
+
+
+def run_concurrently(target, args_list):
+    results = [None] * len(args_list)
+    barrier = threading.Barrier(len(args_list))
+
+    def worker(i, args):
+        barrier.wait()
+        results[i] = target(*args)
+
+    threads = [threading.Thread(target=worker, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return results
+
+
+def test_concurrent_calls_share_batches():
+    sizes = []
+
+    def double(items):
+        sizes.append(len(items))
+        time.sleep(0.005)  # let the next batch queue up
+        return [2 * item for item in items]
+
+    batcher = MicroBatcher(double, window_ms=5, max_batch=8)
+    results = run_concurrently(batcher.submit, [(i,) for i in range(32)])
+
+    assert results == [2 * i for i in range(32)]
+    assert sum(sizes) == 32 and max(sizes) <= 8 and len(sizes) < 32
+    stats = batcher.stats()
+    assert stats['items'] == 32 and stats['batches'] == len(sizes)
+    assert stats['max_batch_size'] == max(sizes)
+    assert stats['queue_ms']['max'] >= stats['queue_ms']['p50'] >= 0
+
+
+def test_isolated_requests_skip_the_window():
+    batcher = MicroBatcher(lambda items: items, window_ms=500)
+    started = time.perf_counter()
+    for i in range(5):
+        assert batcher.submit(i) == i
+    assert time.perf_counter() - started < 0.5
+    assert batcher.stats()['mean_batch_size'] == 1
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def fail(items):
+        raise RuntimeError('scoring failed')
+
+    batcher = MicroBatcher(fail)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match='scoring failed'):
+            batcher.submit(1)
+    assert batcher.stats()['errors'] == 2
+    assert batcher._thread.is_alive()
+
+
+def test_batched_rankings_match_unbatched():
+    samples = np.random.RandomState(0).uniform(0, 200, (48, 7)).round(2).tolist()
+    reference = CropRecommendationSystem(cache_size=0)
+    system = CropRecommendationSystem(cache_size=0)
+    system.enable_micro_batching(window_ms=2, max_batch=16)
+
+    rankings = run_concurrently(system.rank_crops, samples)
+
+    assert rankings == [reference.rank_crops(*sample) for sample in samples]
+    assert system.batching_stats()['items'] == 48
+    assert reference.batching_stats() is None
+
+
+def test_production_health_reports_batching():
+    import production_api
+
+    with production_api.app.test_client() as client:
+        response = client.post('/api/recommend', json={'N': 91, 'P': 42, 'K': 43, 'temperature': 21,
+                                                       'humidity': 82, 'ph': 6.5, 'rainfall': 203})
+        health = client.get('/api/health').get_json()
+
+    assert response.status_code == 200
+    assert health['micro_batching']['max_batch'] == production_api.MICRO_BATCH_MAX
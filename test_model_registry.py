@@ -0,0 +1,40 @@
+# Test that the model registry deserializes models once and hot-reloads on demand
+
+import joblib
+import model_registry
+from model_registry import ModelRegistry, get_model_registry
+
+
+def test_model_loaded_once_and_reloaded_explicitly(tmp_path, monkeypatch):
+    model_file = tmp_path / 'model.pkl'
+    encoder_file = tmp_path / 'label_encoder.pkl'
+    joblib.dump({'version': 1}, model_file)
+    joblib.dump(['rice', 'wheat'], encoder_file)
+
+    loads = []
+    real_load = joblib.load
+    monkeypatch.setattr(joblib, 'load', lambda path: loads.append(path) or real_load(path))
+
+    registry = ModelRegistry(str(model_file), uses_encoded_labels=True, encoder_filename=str(encoder_file))
+    assert not registry.is_loaded
+    for _ in range(100):
+        model, label_encoder = registry.get()
+    assert model == {'version': 1}
+    assert label_encoder == ['rice', 'wheat']
+    assert len(loads) == 2
+
+    joblib.dump({'version': 2}, model_file)
+    assert registry.get()[0] == {'version': 1}
+    registry.reload()
+    assert registry.get()[0] == {'version': 2}
+    assert registry.version == 2
+    assert len(loads) == 4
+
+
+def test_registry_shared_per_model_file(tmp_path):
+    model_file = str(tmp_path / 'model.pkl')
+    joblib.dump('model', model_file)
+
+    first = get_model_registry(model_file)
+    assert get_model_registry(model_file) is first
+    assert first.get() == ('model', None)
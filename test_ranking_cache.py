@@ -0,0 +1,120 @@
+# Test the quantized suitability ranking cache in working_crop_system
+
+import random
+import time
+from working_crop_system import CropRecommendationSystem
+
+SAMPLE = (90, 42, 43, 21, 82, 6.5, 203)
+
+
+def reference_ranking(system, *params):
+    crop_scores = {crop: system.calculate_crop_suitability(crop, *params) for crop in system.crop_rules}
+    return sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def test_cached_ranking_matches_uncached_scores():
+    system = CropRecommendationSystem()
+    for params in (SAMPLE, (100, 50, 50, 25, 50, 7.0, 600), (65, 40, 40, 20, 60, 6.8, 550)):
+        assert system.rank_crops(*params) == reference_ranking(system, *params)
+        assert system.rank_crops(*params) == reference_ranking(system, *params)
+        assert system.recommend_crop(*params)['crop'] == reference_ranking(system, *params)[0][0]
+
+    stats = system.cache_stats()
+    assert stats['misses'] == 3
+    assert stats['hits'] == 6
+    assert stats['size'] == 3
+
+
+def test_quantized_inputs_share_an_entry():
+    system = CropRecommendationSystem(cache_precision={'N': 0, 'P': 0, 'K': 0, 'temperature': 1,
+                                                       'humidity': 0, 'ph': 1, 'rainfall': 0})
+    first = system.rank_crops(90.2, 42, 43, 21.04, 82, 6.5, 203.4)
+    second = system.rank_crops(89.9, 42, 43, 20.96, 82, 6.52, 202.6)
+    assert first == second == reference_ranking(system, 90.2, 42, 43, 21.04, 82, 6.5, 203.4)
+    assert system.cache_stats()['hits'] == 1
+
+
+def test_reused_scores_stay_close_to_exact_scores():
+    system = CropRecommendationSystem()
+    rng = random.Random(5)
+    worst = {}
+    for _ in range(2000):
+        first = [rng.uniform(0, 200), rng.uniform(0, 150), rng.uniform(0, 300), rng.uniform(0, 50),
+                 rng.uniform(0, 100), rng.uniform(3, 10), rng.uniform(0, 3000)]
+        # Another input that rounds to the same key reuses the first one's ranking
+        other = [value + rng.uniform(-0.005, 0.005) for value in system._quantize(first)]
+        assert system._quantize(other) == system._quantize(first)
+        assert system.rank_crops(*first) == reference_ranking(system, *first)
+        for crop, score in system.rank_crops(*other):
+            deviation = abs(score - system.calculate_crop_suitability(crop, *other))
+            worst[crop] = max(worst.get(crop, 0.0), deviation)
+
+    assert max(deviation for crop, deviation in worst.items() if crop != 'pomegranate') <= 0.01
+    assert worst['pomegranate'] <= 0.5 / 8 + 0.01
+
+
+def test_yield_variation_stays_outside_cache():
+    system = CropRecommendationSystem()
+    # Inputs that share a quantized ranking entry still get their own (deterministic) variation
+    inputs = [(90 + i / 10000, *SAMPLE[1:]) for i in range(20)]
+    results = [system.get_top_recommendations(*params, top_n=3) for params in inputs]
+
+    assert len({tuple(r['suitability_score'] for r in result) for result in results}) == 1
+    assert len({result[0]['predicted_yield_kg_per_ha'] for result in results}) > 1
+    assert system.cache_stats()['misses'] == 1
+    assert system.get_top_recommendations(*inputs[0], top_n=3) == results[0]
+
+
+def test_lru_eviction_and_ttl_expiry():
+    system = CropRecommendationSystem(cache_size=2, cache_ttl=0.05)
+    system.rank_crops(*SAMPLE)
+    system.rank_crops(100, 50, 50, 25, 50, 7.0, 600)
+    system.rank_crops(65, 40, 40, 20, 60, 6.8, 550)
+    assert system.cache_stats()['evictions'] == 1
+
+    time.sleep(0.1)
+    system.rank_crops(65, 40, 40, 20, 60, 6.8, 550)
+    assert system.cache_stats()['expirations'] == 1
+    assert system.cache_stats()['hits'] == 0
+
+
+def test_rule_changes_invalidate_cache():
+    system = CropRecommendationSystem()
+    assert system.rank_crops(*SAMPLE)[0][0] != 'wheat'
+
+    system.update_crop_rules('wheat', {'N': (85, 95), 'P': (40, 45), 'K': (40, 45), 'temperature': (20, 22),
+                                       'humidity': (80, 85), 'ph': (6.0, 7.0), 'rainfall': (200, 210)})
+    assert system.cache_stats()['size'] == 0
+    assert system.rank_crops(*SAMPLE)[0] == ('wheat', 1.0)
+
+    system.crop_rules = {'rice': system.crop_rules['rice']}
+    assert system.rank_crops(*SAMPLE) == [('rice', reference_ranking(system, *SAMPLE)[0][1])]
+
+
+def test_comprehensive_analysis_scores_once(monkeypatch):
+    import working_crop_system
+
+    system = CropRecommendationSystem(cache_size=0)
+    ranking = reference_ranking(system, *SAMPLE)
+    compiled = system.compiled_rules
+    calls = {'score': 0, 'yield': 0}
+    score, predict_yield = compiled.score, system.predict_yield
+
+    def counting_score(*args):
+        calls['score'] += 1
+        return score(*args)
+
+    def counting_yield(*args):
+        calls['yield'] += 1
+        return predict_yield(*args)
+
+    monkeypatch.setattr(compiled, 'score', counting_score)
+    monkeypatch.setattr(system, 'predict_yield', counting_yield)
+    monkeypatch.setattr(working_crop_system, 'crop_system', system)
+
+    analysis = working_crop_system.comprehensive_analysis(*SAMPLE)
+
+    assert calls == {'score': 1, 'yield': 5}
+    assert analysis['primary_recommendation']['crop'] == ranking[0][0]
+    assert analysis['primary_recommendation']['confidence_score'] == round(ranking[0][1], 3)
+    assert [alt['crop'] for alt in analysis['alternative_crops']] == [crop for crop, _ in ranking[1:5]]
@@ -0,0 +1,116 @@
+# Test singleflight coalescing of identical in-flight recommendation requests
+
+import threading
+import time
+import pytest
+from singleflight import SingleFlight, request_key
+
+PAYLOAD = {'N': 90, 'P': 42, 'K': 43, 'temperature': 21, 'humidity': 82, 'ph': 6.5, 'rainfall': 203}
+
+
+def run_concurrently(target, count):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return results
+
+
+def slow(calls, result=None, error=None):
+    def fn():
+        calls.append(1)
+        time.sleep(0.1)  # keep the leader in flight while the others arrive
+        if error is not None:
+            raise error
+        return result if result is not None else {'value': len(calls)}
+    return fn
+
+
+def test_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    fn = slow(calls)
+    results = run_concurrently(lambda: flight.do(request_key([90, 42.0, '43']), fn), 10)
+
+    assert len(calls) == 1
+    assert all(result is results[0][0] for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert flight.stats()['shared'] == 9 and flight.stats()['executions'] == 1
+    assert flight.in_flight() == 0
+
+    # Nothing is cached once the call has finished
+    assert flight.do(request_key([90, 42, 43]), fn)[0] == {'value': 2}
+
+
+def test_errors_and_distinct_keys():
+    flight = SingleFlight()
+    calls = []
+    fn = slow(calls, error=ValueError('bad input'))
+    results = run_concurrently(lambda: flight.do('key', fn), 5)
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    assert request_key([0.0, 1]) == request_key([-0.0, 1.0])
+    assert request_key([1], object()) != request_key([1], object())
+    counter = iter(range(100))
+    keys = run_concurrently(lambda: flight.do(next(counter), lambda: threading.get_ident())[1], 4)
+    assert keys == [False] * 4
+
+
+@pytest.mark.parametrize('module_name', ['simple_deployment_app', 'full_crop_backend', 'standalone_api'])
+def test_apps_coalesce_but_count_every_request(module_name, monkeypatch):
+    module = __import__(module_name)
+    calls = []
+    build = module.build_recommendation
+
+    def slow_build(*args):
+        calls.append(1)
+        time.sleep(0.1)
+        return build(*args)
+
+    monkeypatch.setattr(module, 'build_recommendation', slow_build)
+    logged = []
+    if hasattr(module, 'get_usage_tracker'):
+        monkeypatch.setattr(module.get_usage_tracker(), 'log_request', lambda *args: logged.append(args))
+
+    def post():
+        with module.app.test_client() as client:
+            response = client.post('/api/recommend', json=PAYLOAD)
+            return response.status_code, response.get_json()
+
+    results = run_concurrently(post, 8)
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results) and results[0][0] == 200
+    if hasattr(module, 'get_usage_tracker'):
+        assert len(logged) == 8
+        assert {args[2] for args in logged} == {results[0][1]['recommendation']['primary_crop']['name_english']}
+
+
+def test_comprehensive_analysis_is_coalesced(monkeypatch):
+    import working_crop_system
+    calls = []
+    analysis = working_crop_system._comprehensive_analysis
+
+    def slow_analysis(*args):
+        calls.append(1)
+        time.sleep(0.1)
+        return analysis(*args)
+
+    monkeypatch.setattr(working_crop_system, '_comprehensive_analysis', slow_analysis)
+    results = run_concurrently(lambda: working_crop_system.comprehensive_analysis(*PAYLOAD.values()), 6)
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert results[0]['primary_recommendation']['crop']
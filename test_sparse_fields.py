@@ -0,0 +1,125 @@
+# Test fields= / top_k= on the recommendation responses
+
+import numpy as np
+import pytest
+import full_crop_backend
+import mobile_app_backend
+import production_api
+import simple_deployment_app
+import standalone_api
+import working_crop_system
+from sparse_fields import parse_fields, parse_top_k, select_fields
+from working_crop_system import CropRecommendationSystem
+
+PAYLOAD = {'N': 90, 'P': 42, 'K': 43, 'temperature': 21, 'humidity': 82, 'ph': 6.5, 'rainfall': 203}
+
+
+def post(module, query=''):
+    with module.app.test_client() as client:
+        return client.post(f'/api/recommend{query}', json=PAYLOAD)
+
+
+def test_select_fields_keeps_requested_keys_at_any_depth():
+    payload = {'status': 'success', 'timestamp': 't', 'validation': {'is_valid': True},
+               'recommendation': {'primary_crop': {'name': 'rice', 'yield': 1.0},
+                                  'alternatives': [{'name': 'maize', 'yield': 2.0}]}}
+
+    assert select_fields(payload, None) is payload
+    assert select_fields(payload, parse_fields('name')) == {
+        'status': 'success',
+        'recommendation': {'primary_crop': {'name': 'rice'}, 'alternatives': [{'name': 'maize'}]}}
+    assert select_fields(payload, parse_fields(' validation, primary_crop ,')) == {
+        'status': 'success', 'validation': {'is_valid': True},
+        'recommendation': {'primary_crop': {'name': 'rice', 'yield': 1.0}}}
+    assert parse_fields('') is None
+    assert parse_top_k(None, 3, 23) == 3 and parse_top_k('99', 3, 23) == 23
+    with pytest.raises(ValueError):
+        parse_top_k('-1', 3, 23)
+
+
+def test_partial_selection_matches_full_ranking():
+    system = CropRecommendationSystem(cache_size=0)
+    samples = np.random.RandomState(5).uniform(0, 200, (100, 7)).round(1).tolist()
+    # All-zero suitability rows exercise tie ordering
+    samples.append([0, 0, 0, 0, 0, 0, 0])
+    for sample in samples:
+        ranking = system.rank_crops(*sample)
+        for top_n in (1, 4, 24, 30):
+            assert system.rank_crops(*sample, top_n) == ranking[:top_n]
+
+
+@pytest.mark.parametrize('module, name, alternatives, default_k', [
+    (simple_deployment_app, 'name_english', 'alternative_crops', simple_deployment_app.DEFAULT_ALTERNATIVES),
+    (production_api, 'name_english', 'alternative_crops', production_api.DEFAULT_ALTERNATIVES),
+    (mobile_app_backend, 'name', 'alternatives', mobile_app_backend.DEFAULT_ALTERNATIVES),
+    (full_crop_backend, 'name_english', 'alternative_crops', full_crop_backend.DEFAULT_ALTERNATIVES),
+    (standalone_api, 'name', 'alternatives', standalone_api.DEFAULT_ALTERNATIVES),
+])
+def test_fields_and_top_k(module, name, alternatives, default_k):
+    full = post(module).get_json()
+    assert len(full['recommendation'][alternatives]) == default_k
+
+    primary_only = post(module, f'?fields={name}&top_k=0').get_json()
+    assert primary_only == {'status': 'success',
+                            'recommendation': {'primary_crop': {name: full['recommendation']['primary_crop'][name]}}}
+
+    names = post(module, f'?fields={name}&top_k=8').get_json()['recommendation'][alternatives]
+    assert [alt[name] for alt in names[:default_k]] == [alt[name] for alt in full['recommendation'][alternatives]]
+    assert len(names) == 8
+
+    assert post(module, '?top_k=many').status_code == 400
+
+
+def count_estimates(monkeypatch):
+    calls = []
+    system = working_crop_system.crop_system
+    for method in ('predict_yield', 'calculate_sustainability_score'):
+        original = getattr(system, method)
+        monkeypatch.setattr(system, method,
+                            lambda crop, *args, method=method, original=original: calls.append((method, crop)) or
+                            original(crop, *args))
+    return calls
+
+
+@pytest.mark.parametrize('module, query, expected', [
+    (production_api, '?fields=name_english&top_k=5', 0),
+    (production_api, '?fields=primary_crop&top_k=5', 2),
+    (production_api, '?fields=sustainability_score&top_k=2', 3),
+    (production_api, '?top_k=1', 4),
+    (mobile_app_backend, '?fields=name,yield&top_k=3', 3),
+])
+def test_unrequested_estimates_are_not_computed(module, query, expected, monkeypatch):
+    calls = count_estimates(monkeypatch)
+    assert post(module, query).status_code == 200
+    assert len(calls) == expected
+
+
+def test_simple_app_skips_unrequested_draws(monkeypatch):
+    draws = []
+    uniform = simple_deployment_app.yield_jitter.uniform
+    monkeypatch.setattr(simple_deployment_app.yield_jitter, 'uniform',
+                        lambda *args: draws.append(args) or uniform(*args))
+
+    response = post(simple_deployment_app, '?fields=name_english,confidence&top_k=2').get_json()
+    assert draws == []
+    assert set(response['recommendation']['primary_crop']) == {'name_english', 'confidence'}
+    assert 'model_prediction' not in response
+
+    response = post(simple_deployment_app, '?fields=predicted_yield_kg_per_ha&top_k=2').get_json()
+    assert len(draws) == 1 and len(response['recommendation']['alternative_crops']) == 2
+
+
+def test_standalone_api_skips_unrequested_estimates(monkeypatch):
+    calls = []
+    for name in ('predict_yield', 'calculate_sustainability'):
+        original = getattr(standalone_api, name)
+        monkeypatch.setattr(standalone_api, name,
+                            lambda crop, *args, name=name, original=original: calls.append((name, crop)) or
+                            original(crop, *args))
+
+    response = post(standalone_api, '?fields=name,suitability&top_k=5').get_json()
+    assert calls == []
+    assert len(response['recommendation']['alternatives']) == 5
+
+    post(standalone_api, '?fields=yield&top_k=2')
+    assert [name for name, _ in calls] == ['predict_yield'] * 2
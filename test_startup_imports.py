@@ -0,0 +1,77 @@
+# Test that the serving app imports quickly without the training stack
+
+import json
+import os
+import subprocess
+import sys
+
+# Generous budgets (the import takes ~0.25s and ~45 MB here); pandas and
+# sklearn alone would add ~0.5s and ~60 MB
+IMPORT_SECONDS_BUDGET = 2.0
+MAX_RSS_MB_BUDGET = 120
+HEAVY_MODULES = ('pandas', 'sklearn', 'joblib', 'matplotlib', 'seaborn', 'scipy')
+
+SCRIPT = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+import app
+import_seconds = time.perf_counter() - started
+usage_files_at_import = os.listdir(os.environ['USAGE_DATA_DIR'])
+import simple_deployment_app as sda
+if os.environ.get('REFRESH_FROM'):
+    sda.refresh_dataset(os.environ['REFRESH_FROM'])
+with sda.app.test_client() as client:
+    status = client.post('/api/recommend', json={'N': 90, 'P': 42, 'K': 43, 'temperature': 21,
+                                                 'humidity': 82, 'ph': 6.5, 'rainfall': 203}).status_code
+def max_rss_mb():
+    # VmHWM resets at exec; ru_maxrss on Linux keeps the forking parent's peak
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({
+    'import_seconds': import_seconds,
+    'max_rss_mb': max_rss_mb(),
+    'heavy': [name for name in %r if name in sys.modules],
+    'refresh': sda.DATASET_REFRESH['state'],
+    'status': status,
+    'usage_files_at_import': usage_files_at_import,
+    'usage_files': sorted(os.listdir(os.environ['USAGE_DATA_DIR']))
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_startup(tmp_path, **env):
+    usage_dir = tmp_path / 'usage'
+    usage_dir.mkdir(exist_ok=True)
+    env = dict(os.environ, USAGE_DATA_DIR=str(usage_dir),
+               RULES_CACHE_FILE=str(tmp_path / 'rules.json'), DATASET_REFRESH_ON_START='0', **env)
+    result = subprocess.run([sys.executable, '-c', SCRIPT], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_and_dataset_refresh_stay_light(tmp_path):
+    # Rebuild the rules from the CSV the way the background refresh does
+    report = run_startup(tmp_path, REFRESH_FROM='crop_dataset.csv')
+
+    assert report['heavy'] == []
+    assert report['refresh'] == 'ready'
+    assert report['status'] == 200
+    # The usage store opens on the first request, in USAGE_DATA_DIR
+    assert report['usage_files_at_import'] == []
+    assert 'usage_stats.db' in report['usage_files']
+    assert report['import_seconds'] < IMPORT_SECONDS_BUDGET
+    assert report['max_rss_mb'] < MAX_RSS_MB_BUDGET
+
+
+def test_boot_from_rules_cache_stays_light(tmp_path):
+    run_startup(tmp_path, REFRESH_FROM='crop_dataset.csv')  # writes the rules cache
+    report = run_startup(tmp_path)
+
+    assert report['heavy'] == []
+    assert report['refresh'] == 'idle'
+    assert report['status'] == 200
+    assert report['import_seconds'] < IMPORT_SECONDS_BUDGET
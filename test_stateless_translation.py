@@ -0,0 +1,48 @@
+# Test per-call language translation under concurrent mixed-language use
+
+from concurrent.futures import ThreadPoolExecutor
+from complete_sih_system import CompleteSIHSystem
+from multilingual_support import (UI_CONFIGS, get_crop_name, get_localized_interface, ml_support,
+                                  translate_recommendation)
+
+LANGUAGES = ('english', 'hindi', 'bengali')
+RESULT = {'crop': 'rice', 'predicted_yield_kg_per_ha': 3500.0, 'sustainability_score': 8.2,
+          'confidence_score': 0.9}
+
+
+def test_translation_does_not_touch_global_language():
+    ml_support.set_language('english')
+    translated = translate_recommendation(RESULT, 'hindi')
+    interface = get_localized_interface('bengali')
+
+    assert ml_support.current_language == 'english'
+    assert translated['language'] == 'hindi'
+    assert translated['primary_recommendation']['crop_local'] == 'चावल'
+    assert translated['ui_text']['recommended_crop'] == ml_support.translations['hindi']['recommended_crop']
+    assert interface is UI_CONFIGS['bengali']
+    assert interface['crop_names']['rice'] == 'ধান'
+
+
+def test_unsupported_language_falls_back_to_english():
+    ml_support.set_language('hindi')
+    assert translate_recommendation(RESULT, 'tamil')['primary_recommendation']['crop_local'] == 'Rice'
+    assert get_localized_interface('tamil') is UI_CONFIGS['english']
+    ml_support.set_language('english')
+
+
+def test_concurrent_mixed_language_requests():
+    system = CompleteSIHSystem()
+    requests = [LANGUAGES[i % 3] for i in range(90)]
+
+    def call(language):
+        if language == 'english':
+            return language, translate_recommendation(RESULT, language)['ui_text'], None
+        response = system.mobile_api_endpoint(90, 42, 43, 21, 82, 6.5, 203, language)
+        return language, response['ui_texts'], response['recommendation']['primary_crop']
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        for language, ui_text, primary in pool.map(call, requests):
+            assert ui_text['recommended_crop'] == ml_support.translations[language]['recommended_crop']
+            assert ui_text['sustainability_score'] == ml_support.translations[language]['sustainability_score']
+            if primary:
+                assert primary['name_local'] == get_crop_name(primary['name_english'], language)
@@ -0,0 +1,133 @@
+# Test the streaming CSV/NDJSON recommendation upload
+
+import csv
+import io
+import json
+import tracemalloc
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+import simple_deployment_app as sda
+
+FIELDS = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+SAMPLES = [[90, 42, 43, 21, 82, 6.5, 203], [100, 50, 50, 25, 50, 7.0, 600], [20, 130, 200, 22, 92, 6.0, 110]]
+
+
+class GeneratedCSV(io.RawIOBase):
+    """Lazily generated CSV upload, so the test itself holds no large body."""
+
+    def __init__(self, rows, long_line_bytes=0):
+        self.rows = rows
+        self.long_line_bytes = long_line_bytes
+        self.lines = self._lines()
+        self.pending = b''
+
+    def _lines(self):
+        yield (','.join(FIELDS) + '\n').encode()
+        for row in range(self.rows):
+            if row == self.rows // 2 and self.long_line_bytes:
+                # One huge line (no newline until the end), produced in pieces
+                for start in range(0, self.long_line_bytes, 1 << 20):
+                    yield b'9' * min(1 << 20, self.long_line_bytes - start)
+                yield b'\n'
+            yield ('%d,42,43,21,%d,6.5,203\n' % (row % 140, row % 100)).encode()
+
+    def size(self):
+        return sum(len(line) for line in self._lines())
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while len(self.pending) < len(buffer):
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.pending += line
+        size = min(len(buffer), len(self.pending))
+        buffer[:size], self.pending = self.pending[:size], self.pending[size:]
+        return size
+
+
+def test_csv_and_ndjson_match_batch_endpoint():
+    with sda.app.test_client() as client:
+        batch = client.post('/api/recommend/batch', json={'samples': [dict(zip(FIELDS, sample)) for sample in SAMPLES], 'top_k': 2}).get_json()['results']
+
+        upload = ','.join(['id'] + FIELDS) + '\n' + ''.join(
+            ','.join(map(str, [f'farm-{i}'] + sample)) + '\n' for i, sample in enumerate(SAMPLES))
+        response = client.post('/api/recommend/stream?top_k=2', data=upload, content_type='text/csv')
+        assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [line['recommendations'] for line in lines[:-1]] == [result['recommendations'] for result in batch]
+        assert [line['id'] for line in lines[:-1]] == ['farm-0', 'farm-1', 'farm-2']
+        assert lines[-1]['summary'] == {'status': 'complete', 'total_samples': 3, 'successful': 3,
+                                        'failed': 0, 'top_k': 2}
+
+        ndjson = ''.join(json.dumps(dict(zip(FIELDS, sample))) + '\n' for sample in SAMPLES)
+        response = client.post('/api/recommend/stream?top_k=2', data=ndjson,
+                               content_type='application/x-ndjson', headers={'Accept': 'text/csv'})
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [[row['crop_1'], float(row['score_1']), row['crop_2'], float(row['score_2'])] for row in rows] == [
+            [r['recommendations'][0]['name_english'], r['recommendations'][0]['suitability_score'],
+             r['recommendations'][1]['name_english'], r['recommendations'][1]['suitability_score']] for r in batch]
+
+
+def test_bad_rows_and_headers():
+    with sda.app.test_client() as client:
+        upload = ','.join(FIELDS) + '\n90,42,43,21,82,6.5,203\n90,42,abc,21,82,6.5,203\n90,42,43,21,120,6.5,203\n'
+        lines = [json.loads(line) for line in client.post(
+            '/api/recommend/stream', data=upload, content_type='text/csv').get_data(as_text=True).splitlines()]
+        assert [line.get('status') for line in lines[:3]] == ['success', 'error', 'error']
+        assert 'numeric' in lines[1]['message'] and 'Humidity' in lines[2]['message']
+        assert lines[3]['summary']['failed'] == 2
+
+        response = client.post('/api/recommend/stream', data=b'{"N": 1}\nnot json\n',
+                               content_type='application/x-ndjson')
+        assert [json.loads(line).get('status') for line in response.get_data(as_text=True).splitlines()[:2]] == [
+            'error', 'error']
+
+        response = client.post('/api/recommend/stream', data='N,P,K\n1,2,3\n', content_type='text/csv')
+        assert response.status_code == 400 and 'rainfall' in response.get_json()['message']
+        assert client.post('/api/recommend/stream', data=b'x', content_type='text/plain').status_code == 415
+        assert client.post('/api/recommend/stream?top_k=0', data=upload, content_type='text/csv').status_code == 400
+
+
+def test_undecodable_and_overlong_lines_are_row_errors():
+    upload = (','.join(FIELDS) + '\n90,42,43,21,82,6.5,203\n').encode() + b'90,42,43,21,82,6.5,\xff203\n' + \
+        b'9' * (sda.STREAM_MAX_LINE_BYTES + 10) + b'\n90,42,43,21,82,6.5,203\n'
+    with sda.app.test_client() as client:
+        for content_type in ('text/csv', 'application/x-ndjson'):
+            body = upload if content_type == 'text/csv' else upload.replace(
+                b'90,42,43,21,82,6.5,203', json.dumps(dict(zip(FIELDS, SAMPLES[0]))).encode())
+            response = client.post('/api/recommend/stream', data=body, content_type=content_type)
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            if content_type == 'text/csv':
+                assert [line.get('status') for line in lines[:-1]] == ['success', 'error', 'error', 'success']
+                assert 'UTF-8' in lines[1]['message'] and 'longer than' in lines[2]['message']
+            assert lines[-1]['summary']['total_samples'] == len(lines) - 1
+
+        response = client.post('/api/recommend/stream', data=b'N,P\xff\n1,2\n', content_type='text/csv')
+        assert response.status_code == 400 and 'UTF-8' in response.get_json()['message']
+
+
+def peak_memory(rows, long_line_bytes=0):
+    stream = GeneratedCSV(rows, long_line_bytes)
+    environ = EnvironBuilder('/api/recommend/stream', method='POST', content_type='text/csv').get_environ()
+    environ.update({'wsgi.input': stream, 'CONTENT_LENGTH': str(stream.size())})
+    tracemalloc.start()
+    app_iter, status, _ = run_wsgi_app(sda.app, environ, buffered=False)
+    scored = sum(chunk.count(b'\n') for chunk in app_iter)
+    app_iter.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert status.startswith('200')
+    assert scored == rows + 1 + bool(long_line_bytes)
+    return peak
+
+
+def test_memory_does_not_grow_with_upload_size():
+    small = peak_memory(3 * sda.STREAM_CHUNK_ROWS)
+    large = peak_memory(20 * sda.STREAM_CHUNK_ROWS)
+    assert large < 2 * small
+
+    # A multi-megabyte line is skipped, not buffered
+    assert peak_memory(3 * sda.STREAM_CHUNK_ROWS, 16 << 20) < 2 * small
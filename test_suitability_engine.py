@@ -0,0 +1,127 @@
+# Test the vectorized suitability engine against the reference per-crop loop
+
+import random
+import simple_deployment_app as sda
+from suitability_engine import SuitabilityMatrix
+
+# Compare against the rules built from the local dataset as well as the defaults
+DATASET_RULES = sda.CropRuleSet.from_dataset(sda.load_dataset(sda.LOCAL_DATASET_FILE)[0],
+                                             sda.LOCAL_DATASET_FILE).crop_rules
+
+
+def reference_ranking(crop_rules, sample):
+    """Original dict-and-loop scoring from simple_deployment_app.recommend_crop."""
+    saved_rules = sda.CROP_RULES
+    sda.CROP_RULES = crop_rules
+    try:
+        crop_scores = {crop: sda.calculate_suitability(crop, *sample) for crop in crop_rules}
+    finally:
+        sda.CROP_RULES = saved_rules
+    return sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def random_samples(count, seed=7):
+    rng = random.Random(seed)
+    samples = [[90, 42, 43, 21, 82, 6.5, 203], [100, 50, 50, 25, 50, 7.0, 600]]
+    for _ in range(count):
+        samples.append([
+            rng.uniform(0, 200), rng.uniform(0, 150), rng.uniform(0, 300),
+            rng.uniform(5, 45), rng.uniform(10, 100), rng.uniform(3.5, 9.5),
+            rng.uniform(50, 3000)
+        ])
+    return samples
+
+
+def test_scores_match_reference_exactly():
+    for crop_rules in (sda.DEFAULT_CROP_RULES, DATASET_RULES):
+        matrix = SuitabilityMatrix(crop_rules)
+        samples = random_samples(300)
+        scores = matrix.score(samples)
+
+        for row, sample in zip(scores, samples):
+            for crop, expected in reference_ranking(crop_rules, sample):
+                assert row[matrix.crop_index[crop]] == expected
+
+
+def test_top_k_matches_stable_sort():
+    for crop_rules in (sda.DEFAULT_CROP_RULES, DATASET_RULES):
+        matrix = SuitabilityMatrix(crop_rules)
+        for sample in random_samples(100, seed=11):
+            expected = reference_ranking(crop_rules, sample)
+            for k in (1, 4, len(crop_rules)):
+                assert matrix.rank(sample, k) == expected[:k]
+
+
+def test_recommend_endpoint_uses_engine():
+    with sda.app.test_client() as client:
+        response = client.post('/api/recommend', json={
+            'N': 90, 'P': 42, 'K': 43, 'temperature': 21,
+            'humidity': 82, 'ph': 6.5, 'rainfall': 203
+        })
+        data = response.get_json()
+
+    expected = reference_ranking(sda.CROP_RULES, [90, 42, 43, 21, 82, 6.5, 203])
+    assert data['status'] == 'success'
+    assert data['recommendation']['primary_crop']['name_english'] == expected[0][0]
+    assert [alt['name_english'] for alt in data['recommendation']['alternative_crops']] == \
+        [crop for crop, _ in expected[1:4]]
+
+
+def test_full_crop_backend_ranks_like_its_reference_loop():
+    import full_crop_backend as fcb
+    for sample in random_samples(100, seed=13) + [[0] * 7]:
+        crop_scores = {crop: fcb.calculate_suitability(crop, *sample) for crop in fcb.CROP_RULES}
+        expected = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)[:7]
+        recommendation = fcb.build_recommendation(sample)['recommendation']
+        ranked = [recommendation['primary_crop']] + recommendation['alternative_crops']
+        assert [crop['name_english'] for crop in ranked] == [crop for crop, _ in expected]
+
+
+def test_recommend_endpoint_validates_like_batch():
+    sample = {'N': 90, 'P': 42, 'K': 43, 'temperature': 21, 'humidity': 82, 'ph': 6.5, 'rainfall': 203}
+    with sda.app.test_client() as client:
+        nan = client.post('/api/recommend', data='{"N": NaN}', content_type='application/json')
+        assert nan.status_code == 400
+        assert nan.get_json()['message'] == 'Parameters must be finite numbers'
+        for bad in ({'ph': 'nan'}, {'rainfall': 'Infinity'}, {'humidity': 150}, {'ph': -1}, {'K': 'high'}):
+            response = client.post('/api/recommend', json=dict(sample, **bad))
+            assert response.status_code == 400 and response.get_json()['status'] == 'error'
+        assert client.post('/api/recommend', json=[1, 2, 3]).status_code == 400
+
+        # Left-out parameters still fall back to the defaults
+        partial = client.post('/api/recommend', json={'N': 90}).get_json()
+        full = client.post('/api/recommend', json=sample).get_json()
+    assert partial == full
+
+
+def test_batch_endpoint_rows_and_columns():
+    samples = random_samples(50, seed=3)
+    fields = sda.BATCH_FIELDS
+    rows = [dict(zip(fields, sample)) for sample in samples]
+    rows.insert(5, {'N': 90, 'P': 42})
+    rows.insert(9, dict(rows[0], ph='acidic'))
+
+    with sda.app.test_client() as client:
+        by_row = client.post('/api/recommend/batch', json={'samples': rows, 'top_k': 2}).get_json()
+        by_column = client.post('/api/recommend/batch', json={
+            'columns': {field: [sample[i] for sample in samples] for i, field in enumerate(fields)},
+            'top_k': 2
+        }).get_json()
+
+    assert by_row['total_samples'] == len(rows)
+    assert by_row['failed'] == 2
+    assert by_row['results'][5]['status'] == 'error'
+    assert by_row['results'][9]['status'] == 'error'
+
+    ok_rows = [result for result in by_row['results'] if result['status'] == 'success']
+    assert len(ok_rows) == by_column['successful'] == len(samples)
+    for row_result, column_result, sample in zip(ok_rows, by_column['results'], samples):
+        expected = [crop for crop, _ in reference_ranking(sda.CROP_RULES, sample)[:2]]
+        assert [r['name_english'] for r in row_result['recommendations']] == expected
+        assert row_result['recommendations'] == column_result['recommendations']
+
+
+def test_batch_endpoint_rejects_malformed_payload():
+    with sda.app.test_client() as client:
+        assert client.post('/api/recommend/batch', json={'rows': []}).status_code == 400
+        assert client.post('/api/recommend/batch', json={'columns': {'N': [1]}}).status_code == 400
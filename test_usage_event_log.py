@@ -0,0 +1,193 @@
+# Test the append-only usage event log and snapshot/replay behaviour
+
+import atexit
+import json
+import multiprocessing
+import os
+import time
+import pytest
+from usage_tracker import UsageTracker
+
+
+def make_tracker(tmp_path, **kwargs):
+    kwargs.setdefault('flush_interval', 60)
+    return UsageTracker(log_file=str(tmp_path / 'usage_logs.json'), **kwargs)
+
+
+def close_without_snapshot(tracker):
+    """Stop a tracker as if the process died after its last flush."""
+    tracker.store.snapshot = lambda persisted: None
+    tracker.close()
+
+
+def test_log_request_does_not_touch_disk(tmp_path):
+    tracker = make_tracker(tmp_path)
+    for _ in range(50):
+        tracker.log_request('/api/recommend', '127.0.0.1', 'rice')
+
+    assert not os.path.exists(tracker.snapshot_file)
+    assert not os.path.exists(tracker.event_file)
+
+    stats = tracker.get_usage_stats()
+    assert stats['total_requests'] == 50
+    assert stats['endpoint_usage'] == {'/api/recommend': 50}
+    assert stats['top_recommended_crops'] == {'rice': 50}
+    tracker.close()
+
+
+def test_events_survive_restart_via_snapshot_and_replay(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.log_request('/api/recommend', crop_recommended='wheat')
+    tracker.flush(snapshot=True)
+
+    # Events after the snapshot only reach the append-only log
+    tracker.log_request('/api/crops')
+    tracker.log_request('/api/recommend', crop_recommended='wheat')
+    tracker._last_snapshot = time.monotonic()  # no periodic snapshot yet
+    tracker.flush()
+
+    # The snapshot rotated the log, so it only holds the later events
+    with open(tracker.event_file) as f:
+        assert len(f.readlines()) == 2
+    with open(tracker.snapshot_file) as f:
+        snapshot = json.load(f)
+    assert snapshot['total_requests'] == 1 and snapshot['event_log_offset'] == 0
+    close_without_snapshot(tracker)
+
+    reloaded = make_tracker(tmp_path)
+    stats = reloaded.get_usage_stats()
+    assert stats['total_requests'] == 3
+    assert stats['endpoint_usage'] == {'/api/recommend': 2, '/api/crops': 1}
+    assert stats['top_recommended_crops'] == {'wheat': 2}
+    reloaded.close()
+
+
+def test_snapshot_rotates_the_event_log(tmp_path):
+    tracker = make_tracker(tmp_path)
+    for _ in range(3):
+        for _ in range(10):
+            tracker.log_request('/api/recommend')
+        tracker._last_snapshot = time.monotonic()  # no periodic snapshot yet
+        tracker.flush()
+        size = os.path.getsize(tracker.event_file)
+        tracker.flush(snapshot=True)
+        assert size > 0 and os.path.getsize(tracker.event_file) == 0
+    tracker.close()
+    reloaded = make_tracker(tmp_path)
+    assert reloaded.get_usage_stats()['total_requests'] == 30
+    reloaded.close()
+
+    # Stopped after rotating but before the snapshot was reset: the stale
+    # offset points past the empty log and must not hide new events
+    with open(tracker.snapshot_file) as f:
+        snapshot = json.load(f)
+    with open(tracker.snapshot_file, 'w') as f:
+        json.dump(dict(snapshot, event_log_offset=10000), f)
+    restarted = make_tracker(tmp_path)
+    for _ in range(500):
+        restarted.log_request('/api/crops')
+    restarted._last_snapshot = time.monotonic()
+    restarted.flush()
+    assert os.path.getsize(restarted.event_file) > 10000
+    close_without_snapshot(restarted)
+
+    reloaded = make_tracker(tmp_path)
+    stats = reloaded.get_usage_stats()
+    reloaded.close()
+    assert stats['total_requests'] == 530
+    assert stats['endpoint_usage'] == {'/api/recommend': 30, '/api/crops': 500}
+
+
+def test_full_buffer_drops_events_from_totals_too(tmp_path):
+    tracker = make_tracker(tmp_path, max_buffer=5, enqueue_timeout=0.01)
+    for _ in range(8):
+        tracker.log_request('/')
+
+    stats = tracker.get_usage_stats()
+    assert stats['total_requests'] == 5
+    assert stats['dropped_events'] == 3
+    tracker.close()
+
+    reloaded = make_tracker(tmp_path)
+    assert reloaded.get_usage_stats()['total_requests'] == 5
+    reloaded.close()
+
+
+def test_failed_writes_that_cannot_be_requeued_leave_the_totals(tmp_path):
+    tracker = make_tracker(tmp_path, max_buffer=5)
+    for _ in range(5):
+        tracker.log_request('/')
+
+    def failing_write(batch):
+        # Requests arriving meanwhile take the buffer the batch came from
+        for _ in range(3):
+            tracker.log_request('/api/crops')
+        raise OSError('disk full')
+
+    tracker.store.write = failing_write
+    tracker.flush()
+    stats = tracker.get_usage_stats()
+    assert stats['dropped_events'] == 3
+    assert stats['total_requests'] == tracker._events.qsize() == 5
+    del tracker.store.write
+    tracker.close()
+
+
+def test_snapshot_never_rewrites_the_legacy_log_file(tmp_path):
+    legacy = tmp_path / 'usage_logs.json'
+    legacy.write_text(json.dumps({'total_requests': 7, 'endpoint_stats': {'/': 7}}))
+    tracker = make_tracker(tmp_path)
+    assert tracker.get_usage_stats()['total_requests'] == 7
+
+    tracker.log_request('/')
+    tracker.close()
+    assert json.loads(legacy.read_text()) == {'total_requests': 7, 'endpoint_stats': {'/': 7}}
+
+    reloaded = make_tracker(tmp_path)
+    assert reloaded.get_usage_stats()['endpoint_usage'] == {'/': 8}
+    reloaded.close()
+
+
+def test_close_stops_the_flusher_and_unregisters(tmp_path, monkeypatch):
+    unregistered = []
+    monkeypatch.setattr(atexit, 'unregister', unregistered.append)
+    tracker = make_tracker(tmp_path, flush_interval=0.01)
+    tracker.log_request('/')
+    tracker.close()
+
+    assert unregistered == [tracker.close]
+    assert not tracker._flusher.is_alive()
+    tracker.close()  # idempotent
+
+
+def test_event_log_refuses_a_second_writer(tmp_path):
+    tracker = make_tracker(tmp_path)
+    with pytest.raises(RuntimeError, match='USAGE_BACKEND=sqlite'):
+        make_tracker(tmp_path)
+    tracker.close()
+    make_tracker(tmp_path).close()
+
+
+def _log_in_child(tracker, results):
+    try:
+        tracker.log_request('/')
+        results.put('logged')
+    except RuntimeError as e:
+        results.put(str(e))
+
+
+def test_forked_workers_do_not_share_the_event_log(tmp_path):
+    tracker = make_tracker(tmp_path)
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    child = context.Process(target=_log_in_child, args=(tracker, results))
+    child.start()
+    child.join(timeout=30)
+
+    assert 'USAGE_BACKEND=sqlite' in results.get(timeout=5)
+    tracker.log_request('/')
+    tracker.close()
+    assert not os.path.exists(tracker.event_file) or os.path.getsize(tracker.event_file) == 0
+    reloaded = make_tracker(tmp_path)
+    assert reloaded.get_usage_stats()['total_requests'] == 1
+    reloaded.close()
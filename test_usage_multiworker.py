@@ -0,0 +1,110 @@
+# Stress test: several worker processes sharing one SQLite usage store
+
+import multiprocessing
+import threading
+from usage_tracker import UsageTracker
+
+WORKERS = 6
+THREADS_PER_WORKER = 4
+REQUESTS_PER_THREAD = 250
+
+
+def run_worker(db_file, worker_id):
+    """Simulate one gunicorn worker serving requests on several threads."""
+    tracker = UsageTracker(log_file=db_file + '.json', db_file=db_file, flush_interval=0.005)
+
+    def serve():
+        for i in range(REQUESTS_PER_THREAD):
+            tracker.log_request('/api/recommend', crop_recommended='rice' if i % 2 else 'wheat')
+
+    threads = [threading.Thread(target=serve) for _ in range(THREADS_PER_WORKER)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tracker.log_request(f'/worker/{worker_id}')
+    tracker.close()
+
+
+def test_no_increments_lost_across_workers(tmp_path):
+    db_file = str(tmp_path / 'usage_stats.db')
+    UsageTracker(log_file=db_file + '.json', db_file=db_file).close()
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=run_worker, args=(db_file, i)) for i in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=120)
+        assert worker.exitcode == 0
+
+    per_worker = THREADS_PER_WORKER * REQUESTS_PER_THREAD
+    tracker = UsageTracker(log_file=db_file + '.json', db_file=db_file)
+    stats = tracker.get_usage_stats()
+    tracker.close()
+    assert stats['total_requests'] == WORKERS * (per_worker + 1)
+    assert stats['endpoint_usage']['/api/recommend'] == WORKERS * per_worker
+    assert stats['top_recommended_crops'] == {'rice': WORKERS * per_worker // 2,
+                                              'wheat': WORKERS * per_worker // 2}
+    assert all(stats['endpoint_usage'][f'/worker/{i}'] == 1 for i in range(WORKERS))
+
+
+def test_unflushed_events_visible_to_own_worker(tmp_path):
+    db_file = str(tmp_path / 'usage_stats.db')
+    first = UsageTracker(log_file=db_file + '.json', db_file=db_file, flush_interval=60)
+    second = UsageTracker(log_file=db_file + '.json', db_file=db_file, flush_interval=60)
+
+    first.log_request('/api/crops')
+    second.log_request('/api/crops')
+    second.flush()
+
+    assert first.get_usage_stats()['total_requests'] == 2
+    assert second.get_usage_stats()['total_requests'] == 1
+    first.close()
+    assert second.get_usage_stats()['total_requests'] == 2
+    second.close()
+
+
+def test_existing_json_snapshot_seeds_new_database(tmp_path):
+    log_file = str(tmp_path / 'usage_logs.json')
+    json_tracker = UsageTracker(log_file=log_file)
+    for _ in range(3):
+        json_tracker.log_request('/api/health')
+    json_tracker.close()
+
+    for _ in range(2):
+        tracker = UsageTracker(log_file=log_file, db_file=str(tmp_path / 'usage_stats.db'))
+        assert tracker.get_usage_stats()['total_requests'] == 3
+        tracker.close()
+
+
+def test_stats_never_count_a_batch_twice(tmp_path):
+    db_file = str(tmp_path / 'usage_stats.db')
+    tracker = UsageTracker(log_file=db_file + '.json', db_file=db_file, flush_interval=60)
+    for _ in range(5):
+        tracker.log_request('/api/recommend')
+
+    # Pause the flush after the batch is committed, before persisted_data is updated
+    committed, release = threading.Event(), threading.Event()
+    write = tracker.store.write
+
+    def paused_write(batch):
+        write(batch)
+        committed.set()
+        release.wait(5)
+
+    tracker.store.write = paused_write
+    flusher = threading.Thread(target=tracker.flush)
+    flusher.start()
+    assert committed.wait(5)
+
+    totals = []
+    reader = threading.Thread(target=lambda: totals.append(tracker.get_usage_stats()['total_requests']))
+    reader.start()
+    reader.join(0.2)
+    release.set()
+    flusher.join(5)
+    reader.join(5)
+    tracker.close()
+
+    assert totals == [5]
@@ -0,0 +1,74 @@
+# Test the counter-based yield jitter and reproducible API responses
+
+import os
+import subprocess
+import sys
+import threading
+import numpy as np
+from yield_jitter import SUSTAINABILITY_STREAM, YieldJitter, yield_jitter
+from working_crop_system import CropRecommendationSystem
+
+SAMPLE = [90, 42, 43, 21, 82, 6.5, 203]
+CROPS = ['rice', 'maize', 'jute', 'coffee', 'banana']
+
+
+def test_vectorized_draws_match_scalar_draws():
+    samples = np.random.RandomState(0).uniform(0, 300, (200, 7))
+    draws = yield_jitter.uniform(samples, CROPS, 0.85, 1.15)
+
+    assert draws.shape == (200, len(CROPS))
+    assert ((draws >= 0.85) & (draws < 1.15)).all()
+    for row in (0, 17, 199):
+        assert draws[row].tolist() == [yield_jitter.uniform_one(samples[row], crop, 0.85, 1.15) for crop in CROPS]
+    assert yield_jitter.unit(SAMPLE, CROPS).tolist() == [yield_jitter.unit_one(SAMPLE, crop) for crop in CROPS]
+
+    # Roughly uniform, and independent across streams, crops and seeds
+    unit = yield_jitter.unit(np.random.RandomState(1).uniform(0, 300, (50000, 7)), ['rice'])[:, 0]
+    assert abs(unit.mean() - 0.5) < 0.01
+    assert np.histogram(unit, 10, (0, 1))[0].min() > 4500
+    assert yield_jitter.unit_one(SAMPLE, 'rice') != yield_jitter.unit_one(SAMPLE, 'rice', SUSTAINABILITY_STREAM)
+    assert yield_jitter.unit_one(SAMPLE, 'rice') != yield_jitter.unit_one(SAMPLE, 'maize')
+    assert yield_jitter.unit_one(SAMPLE, 'rice') != YieldJitter(seed=7).unit_one(SAMPLE, 'rice')
+
+
+def test_same_input_gives_same_yield_across_threads():
+    system = CropRecommendationSystem()
+    expected = system.get_top_recommendations(*SAMPLE)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(system.get_top_recommendations(*SAMPLE)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [expected] * 8
+    assert system.predict_yield('rice', *SAMPLE) == system.predict_yield('rice', *SAMPLE)
+    assert system.predict_yield('rice', *SAMPLE) != system.predict_yield('rice', *SAMPLE[:-1], 204)
+
+
+def test_api_responses_are_reproducible():
+    import full_crop_backend
+    import simple_deployment_app
+    payload = dict(zip(('N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall'), SAMPLE))
+
+    for module in (simple_deployment_app, full_crop_backend):
+        client = module.app.test_client()
+        first = client.post('/api/recommend', json=payload).get_json()
+        second = client.post('/api/recommend', json=payload).get_json()
+        assert first['recommendation'] == second['recommendation']
+
+
+def test_standalone_api_jitter_matches_without_numpy():
+    import standalone_api
+    rng = np.random.default_rng(3)
+    for sample in [SAMPLE, [0.0, -0.0, 1e-300, 5, 5, 5, 5]] + rng.uniform(0, 300, (50, 7)).tolist():
+        for crop in ('rice', 'pomegranate', 'mothbeans'):
+            assert standalone_api.jitter_uniform(sample, crop, 0.85, 1.15) == \
+                yield_jitter.uniform_one(sample, crop, 0.85, 1.15)
+
+    # Self-contained: importing it must not pull in NumPy
+    script = "import sys, standalone_api; print('numpy' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60).stdout
+    assert output.strip() == 'False'
@@ -1,89 +1,533 @@
 # Usage Analytics for SIH 2025 Crop Recommendation API
+import atexit
+import functools
 import json
 import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
 from datetime import datetime
 from collections import defaultdict
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single process assumed
+    fcntl = None
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+SINGLE_PROCESS_HINT = ("USAGE_BACKEND=jsonl keeps usage in a single process; "
+                       "use USAGE_BACKEND=sqlite with several gunicorn workers")
+
+COUNTER_KEYS = ('daily_stats', 'endpoint_stats', 'crop_recommendations', 'user_locations')
+
+
+def empty_counters():
+    return {
+        'total_requests': 0,
+        'daily_stats': defaultdict(int),
+        'endpoint_stats': defaultdict(int),
+        'crop_recommendations': defaultdict(int),
+        'user_locations': defaultdict(int)
+    }
+
+
+def copy_counters(data):
+    copy = empty_counters()
+    copy['total_requests'] = data['total_requests']
+    for key in COUNTER_KEYS:
+        copy[key].update(data[key])
+    return copy
+
+
+def add_counters(data, other, sign=1):
+    """Add (or subtract, with sign=-1) one counters dict into another."""
+    data['total_requests'] += sign * other['total_requests']
+    for key in COUNTER_KEYS:
+        for name, count in other[key].items():
+            data[key][name] += sign * count
+            if not data[key][name]:
+                del data[key][name]
+    return data
+
+
+def apply_event(data, event):
+    """Add one request event to a counters dict."""
+    data['total_requests'] += 1
+    data['daily_stats'][event['date']] += 1
+    data['endpoint_stats'][event['endpoint']] += 1
+    if event.get('crop'):
+        data['crop_recommendations'][event['crop']] += 1
+    if event.get('location'):
+        data['user_locations'][event['location']] += 1
+
+
+class EventLogStore:
+    """Single-process store: append-only JSONL event log plus periodic snapshot.
+
+    The snapshot records the event log offset it covers, so startup is
+    snapshot + replay of the events appended after it. Once a snapshot is
+    written the log is replaced by an empty one, so it only ever holds the
+    events since the last snapshot. seed_file (the legacy usage_logs.json)
+    is only read, when no snapshot exists yet.
+
+    Only one process may append to and rotate the log: the store holds an
+    exclusive lock on event_file + '.lock' and refuses to open otherwise.
+    """
+
+    shared = False
+
+    def __init__(self, snapshot_file, event_file=None, seed_file=None):
+        self.snapshot_file = snapshot_file
+        self.event_file = event_file or os.path.splitext(snapshot_file)[0] + '_events.jsonl'
+        self.seed_file = seed_file
+        self.event_offset = 0
+        self._writer_lock = self._lock_writer()
+
+    def _lock_writer(self):
+        if fcntl is None:
+            return None
+        lock = open(self.event_file + '.lock', 'a')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            raise RuntimeError(f"{self.event_file} is in use by another process; {SINGLE_PROCESS_HINT}")
+        return lock
+
+    def close(self):
+        if self._writer_lock is not None:
+            self._writer_lock.close()
+            self._writer_lock = None
+
+    def load(self):
+        """Load the last snapshot and replay events appended after it."""
+        data = empty_counters()
+        offset = 0
+
+        source = self.snapshot_file
+        if not os.path.exists(source) and self.seed_file:
+            source = self.seed_file
+        if os.path.exists(source):
+            try:
+                with open(source, 'r') as f:
+                    snapshot = json.load(f)
+                data['total_requests'] = snapshot.get('total_requests', 0)
+                for key in COUNTER_KEYS:
+                    data[key].update(snapshot.get(key, {}))
+                offset = snapshot.get('event_log_offset', 0)
+            except (OSError, ValueError):
+                pass
+
+        # An offset past the end of the log means the process stopped after
+        # the log was rotated but before the snapshot was reset to offset 0
+        log_size = os.path.getsize(self.event_file) if os.path.exists(self.event_file) else 0
+        rotated = offset > log_size
+        if rotated:
+            offset = 0
+
+        if os.path.exists(self.event_file):
+            with open(self.event_file, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # partially written last line
+                    offset += len(line)
+                    try:
+                        apply_event(data, json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+
+        self.event_offset = offset
+        if rotated:
+            self._write_snapshot(data, offset)
+        return data
+
+    def write(self, batch):
+        payload = ''.join(json.dumps(event) + '\n' for event in batch).encode('utf-8')
+        with open(self.event_file, 'ab') as f:
+            f.write(payload)
+            self.event_offset = f.tell()
+
+    def _write_snapshot(self, counters, offset):
+        snapshot = dict(counters, event_log_offset=offset)
+        tmp_file = f"{self.snapshot_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(snapshot, f, indent=2, default=str)
+        os.replace(tmp_file, self.snapshot_file)
+
+    def snapshot(self, persisted):
+        """Atomically write a snapshot of the persisted counters, then rotate the log.
+
+        persisted must cover exactly the events written so far. A crash at
+        any point leaves either the old log with its offset, or an empty
+        log that load() recognizes.
+        """
+        self._write_snapshot(persisted, self.event_offset)
+        if self.event_offset:
+            tmp_file = f"{self.event_file}.tmp"
+            open(tmp_file, 'wb').close()
+            os.replace(tmp_file, self.event_file)
+            self.event_offset = 0
+            self._write_snapshot(persisted, 0)
+
+
+class SQLiteUsageStore:
+    """Multi-process store: counters aggregated in a SQLite database in WAL mode.
+
+    Each worker's flusher adds its batched deltas in one short transaction;
+    readers see the totals of every worker without blocking writers.
+    """
+
+    shared = True
+
+    KINDS = {
+        'daily_stats': 'daily',
+        'endpoint_stats': 'endpoint',
+        'crop_recommendations': 'crop',
+        'user_locations': 'location'
+    }
+
+    def __init__(self, db_file='usage_stats.db', seed_file=None, timeout=30.0):
+        self.db_file = db_file
+        self.seed_file = seed_file
+        self.timeout = timeout
+
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS usage_counters ('
+                'kind TEXT NOT NULL, name TEXT NOT NULL, count INTEGER NOT NULL, '
+                'PRIMARY KEY (kind, name))'
+            )
+        finally:
+            conn.close()
+        self._seed()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=self.timeout, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _transaction(self, apply):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            apply(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _seed(self):
+        """Import an existing JSON snapshot into a brand new database once."""
+        if not self.seed_file or not os.path.exists(self.seed_file):
+            return
+        try:
+            with open(self.seed_file, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        seed = empty_counters()
+        seed['total_requests'] = snapshot.get('total_requests', 0)
+        for key in COUNTER_KEYS:
+            seed[key].update(snapshot.get(key, {}))
+
+        def seed_if_empty(conn):
+            # Runs under BEGIN IMMEDIATE, so workers starting together seed once
+            if conn.execute('SELECT COUNT(*) FROM usage_counters').fetchone()[0] == 0:
+                self._add(conn, seed)
+
+        self._transaction(seed_if_empty)
+
+    def _add(self, conn, delta):
+        rows = [('total', '', delta['total_requests'])]
+        for key, kind in self.KINDS.items():
+            rows.extend((kind, name, count) for name, count in delta[key].items())
+        conn.executemany(
+            'INSERT INTO usage_counters (kind, name, count) VALUES (?, ?, ?) '
+            'ON CONFLICT (kind, name) DO UPDATE SET count = count + excluded.count',
+            rows
+        )
+
+    def load(self):
+        # Totals live in the database; this worker starts with no local share
+        return empty_counters()
+
+    def write(self, batch):
+        delta = empty_counters()
+        for event in batch:
+            apply_event(delta, event)
+        self._transaction(lambda conn: self._add(conn, delta))
+
+    def snapshot(self, persisted):
+        pass  # every write is already committed
+
+    def close(self):
+        pass  # connections are opened per transaction
+
+    def read(self):
+        data = empty_counters()
+        keys = {kind: key for key, kind in self.KINDS.items()}
+        conn = self._connect()
+        try:
+            for kind, name, count in conn.execute('SELECT kind, name, count FROM usage_counters'):
+                if kind == 'total':
+                    data['total_requests'] = count
+                else:
+                    data[keys[kind]][name] = count
+        finally:
+            conn.close()
+        return data
+
+
 class UsageTracker:
-    def __init__(self, log_file='usage_logs.json'):
+    """Request counters kept in memory and persisted by a background flusher.
+
+    log_request() only updates in-memory counters and enqueues an event. A
+    flusher thread hands queued events to the store in batches: an
+    EventLogStore for a single process, or a SQLiteUsageStore when several
+    gunicorn workers must share totals.
+    """
+
+    def __init__(self, log_file='usage_logs.json', snapshot_file=None, event_file=None, db_file=None,
+                 flush_interval=1.0, snapshot_interval=30.0, max_buffer=10000, enqueue_timeout=0.05):
+        # log_file is the legacy JSON snapshot; it only seeds a new store
         self.log_file = log_file
-        self.usage_data = self.load_usage_data()
-    
+        self.snapshot_file = snapshot_file or os.path.splitext(log_file)[0] + '_snapshot.json'
+        if db_file:
+            seed_file = self.snapshot_file if os.path.exists(self.snapshot_file) else log_file
+            self.store = SQLiteUsageStore(db_file, seed_file=seed_file)
+        else:
+            event_file = event_file or os.path.splitext(log_file)[0] + '_events.jsonl'
+            self.store = EventLogStore(self.snapshot_file, event_file, seed_file=log_file)
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.max_buffer = max_buffer
+        self.enqueue_timeout = enqueue_timeout
+
+        # persisted_data is what this process has handed to the store;
+        # usage_data additionally includes events still waiting in the buffer
+        self.persisted_data = self.store.load()
+        self.usage_data = copy_counters(self.persisted_data)
+
+        self._closed = False
+        self._fork_error = None
+        self._start_flusher()
+        if hasattr(os, 'register_at_fork'):
+            # gunicorn --preload forks after import; threads do not survive fork.
+            # A weak reference lets closed trackers be collected.
+            os.register_at_fork(after_in_child=functools.partial(_restart_after_fork, weakref.ref(self)))
+        atexit.register(self.close)
+
+    @property
+    def event_file(self):
+        return getattr(self.store, 'event_file', None)
+
+    def _start_flusher(self):
+        self._lock = threading.Lock()
+        # Reentrant: flush() snapshots while holding it
+        self._flush_lock = threading.RLock()
+        self._events = queue.Queue(maxsize=self.max_buffer)
+        self._dropped_events = 0
+        self._last_snapshot = 0.0
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name='usage-flusher', daemon=True)
+        self._flusher.start()
+
+    def _after_fork(self):
+        if not self.store.shared:
+            # The parent keeps appending to and rotating the event log
+            self._closed = True
+            self._fork_error = RuntimeError(SINGLE_PROCESS_HINT)
+            atexit.unregister(self.close)
+            self.store.close()  # only this process's copy of the lock
+            return
+        # The parent's counts already belong to the parent's flusher
+        self.persisted_data = self.store.load()
+        self.usage_data = copy_counters(self.persisted_data)
+        self._start_flusher()
+
     def load_usage_data(self):
-        """Load existing usage data from file."""
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {
-            'total_requests': 0,
-            'daily_stats': {},
-            'endpoint_stats': defaultdict(int),
-            'crop_recommendations': defaultdict(int),
-            'user_locations': defaultdict(int)
-        }
-    
+        """Load persisted counters from the store."""
+        return self.store.load()
+
     def save_usage_data(self):
-        """Save usage data to file."""
-        try:
-            with open(self.log_file, 'w') as f:
-                json.dump(self.usage_data, f, indent=2, default=str)
-        except Exception as e:
-            print(f"Error saving usage data: {e}")
-    
+        """Write a snapshot of the persisted counters."""
+        # No batch may be written between copying the counters and the snapshot
+        with self._flush_lock:
+            with self._lock:
+                persisted = copy_counters(self.persisted_data)
+            try:
+                self.store.snapshot(persisted)
+            except Exception as e:
+                print(f"Error saving usage data: {e}")
+
     def log_request(self, endpoint, user_ip=None, crop_recommended=None, location=None):
         """Log a new API request."""
-        today = datetime.now().strftime('%Y-%m-%d')
-        
-        # Update total requests
-        self.usage_data['total_requests'] += 1
-        
-        # Update daily stats
-        if today not in self.usage_data['daily_stats']:
-            self.usage_data['daily_stats'][today] = 0
-        self.usage_data['daily_stats'][today] += 1
-        
-        # Update endpoint stats
-        self.usage_data['endpoint_stats'][endpoint] += 1
-        
-        # Update crop recommendations
-        if crop_recommended:
-            self.usage_data['crop_recommendations'][crop_recommended] += 1
-        
-        # Update user locations (if provided)
-        if location:
-            self.usage_data['user_locations'][location] += 1
-        
-        # Save data
-        self.save_usage_data()
-    
+        event = {
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'endpoint': endpoint,
+            'crop': crop_recommended,
+            'location': location
+        }
+
+        if self._fork_error:
+            raise self._fork_error
+
+        try:
+            self._events.put(event, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # The flusher is stalled; count the event as dropped rather than
+            # in totals that would never be persisted
+            with self._lock:
+                self._dropped_events += 1
+            return
+
+        with self._lock:
+            apply_event(self.usage_data, event)
+
+    def flush(self, snapshot=False):
+        """Hand buffered events to the store (and optionally snapshot)."""
+        with self._flush_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self.store.write(batch)
+                except Exception as e:
+                    print(f"Error writing usage events: {e}")
+                    # Keep the events for the next flush if there is room;
+                    # the rest leave the in-memory totals as well
+                    dropped = empty_counters()
+                    for event in batch:
+                        try:
+                            self._events.put_nowait(event)
+                        except queue.Full:
+                            apply_event(dropped, event)
+                    with self._lock:
+                        add_counters(self.usage_data, dropped, sign=-1)
+                        self._dropped_events += dropped['total_requests']
+                    return
+
+                with self._lock:
+                    for event in batch:
+                        apply_event(self.persisted_data, event)
+
+            now = time.monotonic()
+            if snapshot or (batch and now - self._last_snapshot >= self.snapshot_interval):
+                self.save_usage_data()
+                self._last_snapshot = now
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Stop the flusher, persist everything still buffered and release the store."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._stop.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush(snapshot=True)
+        self.store.close()
+
     def get_usage_stats(self):
         """Get comprehensive usage statistics."""
         today = datetime.now().strftime('%Y-%m-%d')
-        
+
+        with self._lock:
+            data = copy_counters(self.usage_data)
+            dropped_events = self._dropped_events
+
+        if self.store.shared:
+            # Totals from every worker, plus this worker's not-yet-flushed events.
+            # Holding the flush lock keeps a batch from being committed to the
+            # store but not yet moved into persisted_data (counted twice).
+            with self._flush_lock:
+                with self._lock:
+                    pending = add_counters(copy_counters(self.usage_data), self.persisted_data, sign=-1)
+                data = add_counters(self.store.read(), pending)
+
         # Get recent daily stats (last 7 days)
-        recent_days = sorted(self.usage_data['daily_stats'].keys())[-7:]
-        recent_stats = {day: self.usage_data['daily_stats'][day] for day in recent_days}
-        
+        recent_days = sorted(data['daily_stats'].keys())[-7:]
+        recent_stats = {day: data['daily_stats'][day] for day in recent_days}
+
         # Get top crops
-        top_crops = dict(sorted(self.usage_data['crop_recommendations'].items(), 
+        top_crops = dict(sorted(data['crop_recommendations'].items(),
                                key=lambda x: x[1], reverse=True)[:5])
-        
+
         # Get top locations
-        top_locations = dict(sorted(self.usage_data['user_locations'].items(), 
+        top_locations = dict(sorted(data['user_locations'].items(),
                                    key=lambda x: x[1], reverse=True)[:5])
-        
+
         return {
-            'total_requests': self.usage_data['total_requests'],
-            'today_requests': self.usage_data['daily_stats'].get(today, 0),
+            'total_requests': data['total_requests'],
+            'today_requests': data['daily_stats'].get(today, 0),
             'recent_daily_stats': recent_stats,
-            'endpoint_usage': dict(self.usage_data['endpoint_stats']),
+            'endpoint_usage': dict(data['endpoint_stats']),
             'top_recommended_crops': top_crops,
             'top_user_locations': top_locations,
+            'dropped_events': dropped_events,
             'last_updated': datetime.now().isoformat()
         }
 
-# Global usage tracker instance
-usage_tracker = UsageTracker()
+def _restart_after_fork(tracker_ref):
+    tracker = tracker_ref()
+    if tracker is not None and not tracker._closed:
+        tracker._after_fork()
+
+
+def create_usage_tracker():
+    """Build the tracker configured by the environment.
+
+    USAGE_BACKEND=sqlite (default) shares totals across gunicorn workers in
+    USAGE_DB_FILE; USAGE_BACKEND=jsonl keeps the single-process append-only
+    event log. Files live in USAGE_DATA_DIR (default: this module's
+    directory, not the working directory).
+    """
+    data_dir = os.environ.get('USAGE_DATA_DIR', MODULE_DIR)
+    log_file = os.path.join(MODULE_DIR, 'usage_logs.json')
+    snapshot_file = os.path.join(data_dir, 'usage_logs_snapshot.json')
+    event_file = os.path.join(data_dir, 'usage_logs_events.jsonl')
+
+    if os.environ.get('USAGE_BACKEND', 'sqlite') == 'sqlite':
+        db_file = os.environ.get('USAGE_DB_FILE', os.path.join(data_dir, 'usage_stats.db'))
+        return UsageTracker(log_file, snapshot_file, db_file=db_file)
+    return UsageTracker(log_file, snapshot_file, event_file)
+
+
+# Global usage tracker, created on first use so importing opens no files
+_usage_tracker = None
+_usage_tracker_lock = threading.Lock()
+
+
+def get_usage_tracker():
+    """Return the process-wide usage tracker, creating it on first use."""
+    global _usage_tracker
+    with _usage_tracker_lock:
+        if _usage_tracker is None:
+            _usage_tracker = create_usage_tracker()
+        return _usage_tracker
+
+
+def close_usage_tracker():
+    """Close the process-wide tracker (if any); the next call creates a new one."""
+    global _usage_tracker
+    with _usage_tracker_lock:
+        tracker, _usage_tracker = _usage_tracker, None
+    if tracker is not None:
+        tracker.close()
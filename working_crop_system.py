@@ -1,16 +1,82 @@
 # Complete Working Crop Recommendation System - SIH 2025
-# No external ML libraries required - Pure Python Implementation
+# No external ML libraries required - rule tables compiled to NumPy arrays
 
 import csv
+import heapq
 import json
-import random
 import math
-from typing import Dict, List, Tuple
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+from crop_rule_compiler import CompiledCropRules, PARAM_NAMES
+from singleflight import SingleFlight, request_key
+from micro_batcher import DEFAULT_MAX_BATCH, DEFAULT_WINDOW_MS, MicroBatcher
+from yield_jitter import yield_jitter
+
+# Per-crop estimates describe_crop() can compute
+DETAIL_FIELDS = ('predicted_yield_kg_per_ha', 'sustainability_score')
+
+class RankingCache:
+    """Thread-safe LRU cache with a TTL for suitability rankings."""
+    
+    def __init__(self, maxsize: int = 4096, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+    
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
 
 class CropRecommendationSystem:
     """Complete crop recommendation system with ML-like capabilities."""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096, cache_ttl: float = 600.0, cache_precision=2):
         self.crop_data = {
             'rice': {'base_yield': 4500, 'water_need': 1500, 'fertilizer_efficiency': 0.7},
             'wheat': {'base_yield': 3200, 'water_need': 600, 'fertilizer_efficiency': 0.8},
@@ -38,6 +104,34 @@ class CropRecommendationSystem:
             'chickpea': {'base_yield': 1300, 'water_need': 350, 'fertilizer_efficiency': 0.85}
         }
         
+        # Rankings are cached per input rounded to cache_precision decimals
+        # (an int for every parameter, or a dict per parameter name); scores
+        # come from the first exact input seen for each rounded key
+        self.cache_precision = cache_precision
+        self.ranking_cache = RankingCache(cache_size, cache_ttl)
+        # Optional dispatcher that scores concurrent cache misses as one matrix
+        self.batcher = None
+        
+        # Crop-specific scoring that differs from the standard min/max rules.
+        # suitability_bands replace a parameter's score with ideal/tolerable
+        # band values (linear fallback around centre); bonus is added to the
+        # normalization divisor; yield_bands are ((low, high, factor), ...,
+        # fallback) and climate_tiers are (t_min, t_max, h_min, h_max, score).
+        self.crop_overrides = {
+            'pomegranate': {
+                'suitability_bands': {
+                    'temperature': {'ideal': (18, 30, 1.5), 'tolerable': (15, 35, 1.0), 'center': 25, 'scale': 25},
+                    'humidity': {'ideal': (40, 70, 1.5), 'tolerable': (30, 80, 1.0), 'center': 55, 'scale': 55}
+                },
+                'bonus': 1.0,
+                'yield_bands': {
+                    'temperature': ((15, 30, 1.0), (10, 35, 0.8), 0.5),
+                    'humidity': ((35, 70, 1.0), (30, 80, 0.8), 0.6)
+                },
+                'climate_tiers': ((15, 30, 35, 70, 9.0), (10, 35, 30, 80, 7.0))
+            }
+        }
+        
         self.crop_rules = {
             'rice': {'N': (80, 120), 'P': (40, 60), 'K': (35, 45), 'temperature': (20, 27), 'humidity': (80, 90), 'ph': (5.5, 7.0), 'rainfall': (1500, 2000)},
             'wheat': {'N': (50, 80), 'P': (30, 50), 'K': (30, 50), 'temperature': (15, 25), 'humidity': (50, 70), 'ph': (6.0, 7.5), 'rainfall': (450, 650)},
@@ -67,123 +161,112 @@ class CropRecommendationSystem:
         
         # Initialize with some "training" accuracy
         self.model_accuracy = 0.94  # Simulated 94% accuracy
+    
+    @property
+    def crop_rules(self) -> Dict:
+        return self._crop_rules
+    
+    @crop_rules.setter
+    def crop_rules(self, crop_rules: Dict):
+        self._crop_rules = crop_rules
+        self.invalidate_cache()
+    
+    def update_crop_rules(self, crop: str, rules: Dict):
+        """Add or replace the rules for one crop and drop cached rankings."""
+        self._crop_rules[crop] = rules
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """Recompile the rules and clear cached rankings.
+        
+        Call this after changing crop_rules, crop_data or crop_overrides in place.
+        """
+        self._compiled_rules = None
+        self.ranking_cache.clear()
+    
+    @property
+    def compiled_rules(self) -> CompiledCropRules:
+        compiled = self._compiled_rules
+        if compiled is None:
+            compiled = CompiledCropRules(self.crop_rules, self.crop_data, self.crop_overrides)
+            self._compiled_rules = compiled
+        return compiled
+    
+    def enable_micro_batching(self, window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        """Route ranking-cache misses through a MicroBatcher (for threaded servers)."""
+        self.batcher = MicroBatcher(self._score_batch, window_ms, max_batch, name='crop-scoring')
+        return self.batcher
+    
+    def batching_stats(self):
+        return self.batcher.stats() if self.batcher is not None else None
+    
+    def _score_batch(self, samples):
+        """[(crops, scores)] per input vector, from one vectorized score() call."""
+        compiled = self.compiled_rules
+        return [(compiled.crops, row) for row in compiled.score(samples).tolist()]
+    
+    def cache_stats(self) -> Dict:
+        """Ranking cache hit/miss metrics."""
+        return dict(self.ranking_cache.stats(), precision=self.cache_precision)
+    
+    def _quantize(self, values: Tuple[float, ...]) -> Tuple[float, ...]:
+        precision = self.cache_precision
+        if isinstance(precision, dict):
+            return tuple(round(float(value), precision.get(name, 2)) for name, value in zip(PARAM_NAMES, values))
+        return tuple(round(float(value), precision) for value in values)
+    
+    def rank_crops(self, N: float, P: float, K: float, temperature: float,
+                   humidity: float, ph: float, rainfall: float,
+                   top_n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """The top_n crops (all by default) as (crop, suitability) pairs, best first.
+        
+        Only the cache key is quantized: a miss scores the caller's exact
+        input, and later requests that map to the same key reuse that
+        ranking. With the default 2 decimals a reused score is within 0.01
+        of the exact one, plus one band step (0.5 / 8 for pomegranate) when a
+        key straddles a banded crop's band edge. Ties keep rule-table
+        order, like max() did.
+        """
+        values = tuple(float(value) for value in (N, P, K, temperature, humidity, ph, rainfall))
+        key = self._quantize(values)
+        crop_scores = self.ranking_cache.get(key)
+        if crop_scores is None:
+            if self.batcher is not None:
+                crops, scores = self.batcher.submit(values)
+            else:
+                crops, scores = self._score_batch([values])[0]
+            crop_scores = tuple(zip(crops, scores))
+            self.ranking_cache.put(key, crop_scores)
+        if top_n is None or top_n >= len(crop_scores):
+            return sorted(crop_scores, key=itemgetter(1), reverse=True)
+        # Partial selection; nlargest is stable like the full sort
+        return heapq.nlargest(top_n, crop_scores, key=itemgetter(1))
         
     def calculate_crop_suitability(self, crop: str, N: float, P: float, K: float, 
                                  temperature: float, humidity: float, ph: float, rainfall: float) -> float:
         """Calculate suitability score for a specific crop."""
         
-        if crop not in self.crop_rules:
+        compiled = self.compiled_rules
+        if crop not in compiled.crop_index:
             return 0.0
         
-        rules = self.crop_rules[crop]
-        score = 0.0
-        total_params = len(rules)
-        
-        params = {'N': N, 'P': P, 'K': K, 'temperature': temperature, 
-                 'humidity': humidity, 'ph': ph, 'rainfall': rainfall}
-        
-        # Special handling for pomegranate
-        if crop.lower() == 'pomegranate':
-            # Temperature is very important for pomegranate
-            if 18 <= temperature <= 30:  # Ideal range
-                score += 1.5  # Bonus for being in ideal range
-            elif 15 <= temperature <= 35:  # Tolerable range
-                score += 1.0
-            else:
-                # Harsher penalty for being outside tolerable range
-                score += max(0.0, 1.0 - abs(temperature - 25) / 25)
-            
-            # Humidity is also important
-            if 40 <= humidity <= 70:  # Ideal range
-                score += 1.5
-            elif 30 <= humidity <= 80:  # Tolerable range
-                score += 1.0
-            else:
-                score += max(0.0, 1.0 - abs(humidity - 55) / 55)
-            
-            # Other parameters with standard scoring
-            for param in ['N', 'P', 'K', 'ph', 'rainfall']:
-                min_val, max_val = rules[param]
-                param_value = params[param]
-                
-                if min_val <= param_value <= max_val:
-                    score += 1.0
-                else:
-                    range_width = max(1, max_val - min_val)
-                    if param_value < min_val:
-                        distance = min_val - param_value
-                    else:
-                        distance = param_value - max_val
-                    
-                    normalized_penalty = min(1.0, distance / range_width)
-                    score += max(0.0, 1.0 - normalized_penalty)
-        else:
-            # Standard scoring for other crops
-            for param, (min_val, max_val) in rules.items():
-                param_value = params[param]
-                
-                if min_val <= param_value <= max_val:
-                    score += 1.0
-                else:
-                    range_width = max(1, max_val - min_val)
-                    if param_value < min_val:
-                        distance = min_val - param_value
-                    else:
-                        distance = param_value - max_val
-                    
-                    normalized_penalty = min(1.0, distance / range_width)
-                    score += max(0.0, 1.0 - normalized_penalty)
-        
-        # Normalize the score
-        if crop.lower() == 'pomegranate':
-            # For pomegranate, we added some bonus points, so we need to normalize accordingly
-            return min(1.0, score / (total_params + 1.0))  # +1 for the bonus points
-        return score / total_params
+        scores = compiled.score([N, P, K, temperature, humidity, ph, rainfall])
+        return float(scores[0, compiled.crop_index[crop]])
     
     def predict_yield(self, crop: str, N: float, P: float, K: float, 
                      temperature: float, humidity: float, ph: float, rainfall: float) -> float:
         """Predict crop yield based on conditions."""
         
-        crop_lower = crop.lower()
-        
-        if crop_lower in self.crop_data:
-            base_yield = self.crop_data[crop_lower]['base_yield']
-            fertilizer_efficiency = self.crop_data[crop_lower]['fertilizer_efficiency']
-        else:
-            base_yield = 2000
-            fertilizer_efficiency = 0.75
+        profile = self.compiled_rules.profile(crop)
+        base_yield = profile.base_yield
+        fertilizer_efficiency = profile.fertilizer_efficiency
         
         # Calculate environmental factors
         nutrient_factor = min(2.0, (N + P + K) / 150)  # Normalized nutrient availability
         
-        # Temperature factor - crop specific
-        if crop_lower == 'pomegranate':
-            if 15 <= temperature <= 30:  # Ideal for pomegranate
-                temp_factor = 1.0
-            elif 10 <= temperature < 15 or 30 < temperature <= 35:  # Tolerable
-                temp_factor = 0.8
-            else:  # Outside tolerable range
-                temp_factor = 0.5
-        else:
-            # Default temperature factor for other crops
-            if 20 <= temperature <= 30:
-                temp_factor = 1.0
-            elif temperature < 20:
-                temp_factor = 0.7 + (temperature / 30)
-            else:
-                temp_factor = max(0.5, 1.2 - (temperature / 50))
-        
-        # Humidity factor - crop specific
-        if crop_lower == 'pomegranate':
-            if 35 <= humidity <= 70:  # Ideal for pomegranate
-                humidity_factor = 1.0
-            elif 30 <= humidity < 35 or 70 < humidity <= 80:  # Tolerable
-                humidity_factor = 0.8
-            else:  # Outside tolerable range
-                humidity_factor = 0.6
-        else:
-            # Default humidity factor for other crops
-            humidity_factor = min(1.0, humidity / 80)
+        # Temperature and humidity factors (crop-specific bands from crop_overrides)
+        temp_factor = profile.temperature_factor(temperature)
+        humidity_factor = profile.humidity_factor(humidity)
         
         # pH factor
         if 6.0 <= ph <= 7.5:
@@ -192,7 +275,7 @@ class CropRecommendationSystem:
             ph_factor = max(0.6, 1.0 - abs(ph - 6.75) / 3.25)
         
         # Rainfall factor
-        optimal_rainfall = self.crop_data.get(crop_lower, {}).get('water_need', 800)
+        optimal_rainfall = profile.water_need
         if rainfall < optimal_rainfall * 0.5:
             rainfall_factor = 0.5
         elif rainfall > optimal_rainfall * 2:
@@ -209,8 +292,8 @@ class CropRecommendationSystem:
             rainfall_factor * 0.10
         )
         
-        # Add realistic variation
-        variation = random.uniform(0.85, 1.15)
+        # Add realistic variation (reproducible per input and crop)
+        variation = yield_jitter.uniform_one((N, P, K, temperature, humidity, ph, rainfall), crop, 0.85, 1.15)
         predicted_yield = base_yield * yield_multiplier * variation
         
         return max(100, predicted_yield)
@@ -219,15 +302,10 @@ class CropRecommendationSystem:
                                      temperature: float, humidity: float, ph: float, rainfall: float) -> float:
         """Calculate sustainability score (1-10)."""
         
-        crop_lower = crop.lower()
+        profile = self.compiled_rules.profile(crop)
         
         # Water efficiency score
-        if crop_lower in self.crop_data:
-            water_need = self.crop_data[crop_lower]['water_need']
-        else:
-            water_need = 800
-        
-        water_score = max(1, min(10, 10 - (water_need / 250)))
+        water_score = max(1, min(10, 10 - (profile.water_need / 250)))
         
         # Fertilizer efficiency score (lower N requirement = higher score)
         fertilizer_score = max(1, min(10, 10 - (N / 15)))
@@ -235,20 +313,8 @@ class CropRecommendationSystem:
         # pH adaptability score
         ph_score = max(1, min(10, 10 - abs(ph - 7.0) * 1.5))
         
-        # Climate resilience score - crop specific
-        climate_score = 5.0
-        
-        # Special handling for pomegranate
-        if crop_lower == 'pomegranate':
-            if 15 <= temperature <= 30 and 35 <= humidity <= 70:  # Pomegranate's preferred range
-                climate_score = 9.0
-            elif 10 <= temperature <= 35 and 30 <= humidity <= 80:  # Tolerable range
-                climate_score = 7.0
-        # General climate scoring for other crops
-        elif 20 <= temperature <= 30 and 60 <= humidity <= 80:
-            climate_score = 8.0
-        elif 15 <= temperature <= 35 and 40 <= humidity <= 90:
-            climate_score = 6.5
+        # Climate resilience score - crop specific tiers from crop_overrides
+        climate_score = profile.climate_score(temperature, humidity)
         
         # Rainfall efficiency
         if 400 <= rainfall <= 1200:
@@ -274,15 +340,8 @@ class CropRecommendationSystem:
         """Main crop recommendation function."""
         
         try:
-            # Calculate suitability for all crops
-            crop_scores = {}
-            for crop in self.crop_rules.keys():
-                score = self.calculate_crop_suitability(crop, N, P, K, temperature, humidity, ph, rainfall)
-                crop_scores[crop] = score
-            
-            # Get best crop
-            best_crop = max(crop_scores, key=crop_scores.get)
-            confidence = crop_scores[best_crop]
+            # Best crop from the (cached) suitability ranking
+            best_crop, confidence = self.rank_crops(N, P, K, temperature, humidity, ph, rainfall, 1)[0]
             
             # Calculate yield and sustainability
             predicted_yield = self.predict_yield(best_crop, N, P, K, temperature, humidity, ph, rainfall)
@@ -299,33 +358,28 @@ class CropRecommendationSystem:
         except Exception as e:
             return {'error': f"Error in prediction: {str(e)}"}
     
+    def describe_crop(self, crop: str, score: float, values: Sequence[float],
+                      details: Sequence[str] = DETAIL_FIELDS) -> Dict:
+        """Recommendation entry for one ranked crop.
+        
+        Only the estimates named in details (see DETAIL_FIELDS) are computed.
+        """
+        recommendation = {'crop': crop, 'suitability_score': round(score, 3)}
+        if 'predicted_yield_kg_per_ha' in details:
+            recommendation['predicted_yield_kg_per_ha'] = round(self.predict_yield(crop, *values), 2)
+        if 'sustainability_score' in details:
+            recommendation['sustainability_score'] = round(self.calculate_sustainability_score(crop, *values), 2)
+        return recommendation
+    
     def get_top_recommendations(self, N: float, P: float, K: float, temperature: float,
-                              humidity: float, ph: float, rainfall: float, top_n: int = 5) -> List[Dict]:
+                              humidity: float, ph: float, rainfall: float, top_n: int = 5,
+                              details: Sequence[str] = DETAIL_FIELDS) -> List[Dict]:
         """Get top N crop recommendations."""
         
-        recommendations = []
-        
-        # Calculate scores for all crops
-        crop_scores = {}
-        for crop in self.crop_rules.keys():
-            score = self.calculate_crop_suitability(crop, N, P, K, temperature, humidity, ph, rainfall)
-            crop_scores[crop] = score
-        
-        # Sort by score
-        sorted_crops = sorted(crop_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        for crop, score in sorted_crops[:top_n]:
-            yield_pred = self.predict_yield(crop, N, P, K, temperature, humidity, ph, rainfall)
-            sustainability = self.calculate_sustainability_score(crop, N, P, K, temperature, humidity, ph, rainfall)
-            
-            recommendations.append({
-                'crop': crop,
-                'suitability_score': round(score, 3),
-                'predicted_yield_kg_per_ha': round(yield_pred, 2),
-                'sustainability_score': round(sustainability, 2)
-            })
-        
-        return recommendations
+        # Suitability ranking is cached; yield variation is a function of the input
+        values = (N, P, K, temperature, humidity, ph, rainfall)
+        return [self.describe_crop(crop, score, values, details)
+                for crop, score in self.rank_crops(*values, top_n)]
     
     def validate_input(self, N: float, P: float, K: float, temperature: float,
                       humidity: float, ph: float, rainfall: float) -> Dict:
@@ -365,17 +419,48 @@ def get_crop_alternatives(N, P, K, temperature, humidity, ph, rainfall, top_n=5)
     """Get alternative crop recommendations."""
     return crop_system.get_top_recommendations(N, P, K, temperature, humidity, ph, rainfall, top_n)
 
-def comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall):
-    """Complete analysis with validation and alternatives."""
+# Identical analyses that are in flight at the same time run only once
+analysis_flight = SingleFlight('comprehensive_analysis')
+
+def comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall, top_k=4,
+                           primary_details=DETAIL_FIELDS, alternative_details=DETAIL_FIELDS):
+    """Complete analysis with validation and alternatives.
+    
+    Only the best 1 + top_k crops are selected, and yield and
+    sustainability are computed only where primary_details /
+    alternative_details name them. Concurrent calls with the same inputs
+    and options share one computation (and one result dict, which callers
+    must not modify).
+    """
+    key = request_key((N, P, K, temperature, humidity, ph, rainfall), crop_system) + (
+        top_k, frozenset(primary_details), frozenset(alternative_details))
+    return analysis_flight.do(key, _comprehensive_analysis, N, P, K, temperature, humidity, ph, rainfall,
+                              top_k, primary_details, alternative_details)[0]
+
+def _comprehensive_analysis(N, P, K, temperature, humidity, ph, rainfall, top_k=4,
+                            primary_details=DETAIL_FIELDS, alternative_details=DETAIL_FIELDS):
+    """All crops are scored once; the primary recommendation is the top entry
+    and the alternatives are the next top_k."""
     
-    validation = crop_system.validate_input(N, P, K, temperature, humidity, ph, rainfall)
-    primary = crop_system.recommend_crop(N, P, K, temperature, humidity, ph, rainfall)
-    alternatives = crop_system.get_top_recommendations(N, P, K, temperature, humidity, ph, rainfall, 5)
+    values = (N, P, K, temperature, humidity, ph, rainfall)
+    validation = crop_system.validate_input(*values)
+    try:
+        ranked = crop_system.rank_crops(*values, 1 + top_k)
+        best = crop_system.describe_crop(*ranked[0], values, primary_details)
+        primary = {'crop': best['crop'], 'confidence_score': best['suitability_score']}
+        primary.update((detail, best[detail]) for detail in DETAIL_FIELDS if detail in best)
+        primary['model_accuracy'] = crop_system.model_accuracy
+        # Exclude the primary recommendation
+        alternatives = [crop_system.describe_crop(crop, score, values, alternative_details)
+                        for crop, score in ranked[1:]]
+    except Exception as e:
+        primary = {'error': f"Error in prediction: {str(e)}"}
+        alternatives = []
     
     return {
         'input_validation': validation,
         'primary_recommendation': primary,
-        'alternative_crops': alternatives[1:],  # Exclude the primary recommendation
+        'alternative_crops': alternatives,
         'system_info': {
             'model_type': 'Rule-based ML System',
             'accuracy': crop_system.model_accuracy,
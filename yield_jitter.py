@@ -0,0 +1,93 @@
+# SIH 2025 - Deterministic Yield Jitter
+# Counter-based "random" variation keyed on (input, crop), so equal requests get equal answers
+
+import hashlib
+import os
+import struct
+from functools import lru_cache
+import numpy as np
+
+# Changing the seed changes every variation; results are stable for a given seed
+DEFAULT_SEED = int(os.environ.get('YIELD_JITTER_SEED', 2025))
+
+# Independent streams for the different quantities drawn per (input, crop)
+YIELD_STREAM = 0
+SUSTAINABILITY_STREAM = 1
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MIX1 = 0xBF58476D1CE4E5B9
+MIX2 = 0x94D049BB133111EB
+
+
+def _mix(z):
+    """SplitMix64 finalizer on a Python int."""
+    z = ((z ^ (z >> 30)) * MIX1) & MASK64
+    z = ((z ^ (z >> 27)) * MIX2) & MASK64
+    return z ^ (z >> 31)
+
+
+def _mix_array(z):
+    """SplitMix64 finalizer on a uint64 array (multiplication wraps mod 2**64)."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(MIX1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(MIX2)
+    return z ^ (z >> np.uint64(31))
+
+
+@lru_cache(maxsize=1024)
+def crop_key(crop):
+    """64-bit key for a crop name (stable across processes, unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(str(crop).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class YieldJitter:
+    """Reproducible variation factors for yield and sustainability estimates.
+
+    A draw is a pure function of (seed, input values, crop, stream): the
+    input's float64 bit patterns are folded through SplitMix64, combined
+    with the crop key and stream counter, and mapped to [0, 1). Nothing is
+    shared between threads, and uniform() draws a whole (rows x crops)
+    block in one vectorized pass that matches uniform_one() exactly.
+    """
+
+    def __init__(self, seed=DEFAULT_SEED):
+        self.seed = int(seed) & MASK64
+
+    def input_key(self, features):
+        """Key for one sample (sequence of floats)."""
+        values = [float(v) + 0.0 for v in features]  # -0.0 -> 0.0
+        key = self.seed
+        for bits in struct.unpack(f'<{len(values)}Q', struct.pack(f'<{len(values)}d', *values)):
+            key = _mix(key ^ bits)
+        return key
+
+    def input_keys(self, samples):
+        """Keys for a (rows x features) batch."""
+        bits = (np.atleast_2d(np.asarray(samples, dtype=np.float64)) + 0.0).view(np.uint64)
+        keys = np.full(len(bits), self.seed, dtype=np.uint64)
+        for j in range(bits.shape[1]):
+            keys = _mix_array(keys ^ bits[:, j])
+        return keys
+
+    def unit_one(self, features, crop, stream=YIELD_STREAM):
+        counter = (self.input_key(features) ^ crop_key(crop)) + (stream + 1) * GOLDEN_GAMMA
+        return (_mix(counter & MASK64) >> 11) * 2.0 ** -53
+
+    def unit(self, samples, crops, stream=YIELD_STREAM):
+        """(rows x crops) draws in [0, 1); a single sample gives a 1-D array."""
+        keys = self.input_keys(samples)
+        crops = np.array([crop_key(crop) for crop in crops], dtype=np.uint64)
+        counter = (keys[:, None] ^ crops[None, :]) + np.uint64(((stream + 1) * GOLDEN_GAMMA) & MASK64)
+        draws = (_mix_array(counter) >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+        return draws[0] if np.ndim(samples) == 1 else draws
+
+    def uniform_one(self, features, crop, low, high, stream=YIELD_STREAM):
+        """Drop-in for random.uniform(low, high) for one (input, crop)."""
+        return low + (high - low) * self.unit_one(features, crop, stream)
+
+    def uniform(self, samples, crops, low, high, stream=YIELD_STREAM):
+        return low + (high - low) * self.unit(samples, crops, stream)
+
+
+# Shared default (stateless, so safe to use from any thread)
+yield_jitter = YieldJitter()